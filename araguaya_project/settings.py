@@ -3,13 +3,15 @@
 import os
 from pathlib import Path
 import dj_database_url
-from dotenv import load_dotenv
-
-# Carrega o .env apenas em ambiente local.
-load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Carrega o .env apenas em ambiente local. Em produção (sem o arquivo) o python-dotenv nem
+# é importado, o que encurta a inicialização de cada worker.
+if (BASE_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR / '.env')
+
 # --- CONFIGURAÇÕES DE SEGURANÇA ESSENCIAIS ---
 
 # A SECRET_KEY DEVE vir do ambiente. Se não vier, o app não inicia.
@@ -54,9 +56,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Mede banco, templates e storage de cada requisição (cabeçalho Server-Timing e logs).
+    # Fica em primeiro para que o tempo total inclua todos os outros middlewares.
+    'core.middleware.ServerTimingMiddleware',
+    # Comprime HTML e JSON em brotli/gzip (as páginas em cache já guardam a versão comprimida).
+    'core.middleware.CompressaoMiddleware',
     'django.middleware.security.SecurityMiddleware',
     # Whitenoise é excelente para servir arquivos estáticos de forma eficiente
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # (versão que também roda sem threads no modo ASGI, ver core.middleware).
+    'core.middleware.WhiteNoiseAssincrono',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -68,7 +76,8 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'araguaya_project.urls'
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Igual ao backend padrão do Django, mas mede o tempo de renderização (Server-Timing).
+        'BACKEND': 'core.desempenho.DjangoTemplatesMedido',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -77,6 +86,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                # 'textos' e 'config' em todos os templates, guardados na memória do processo.
+                'core.context_processors.conteudo_do_site',
             ],
         },
     },
@@ -90,12 +101,184 @@ DATABASE_URL = os.environ.get('DATABASE_URL')
 if not DATABASE_URL:
     raise ValueError("A variável de ambiente DATABASE_URL não foi definida.")
 
-DATABASES = {
-    'default': dj_database_url.config(
-        default=DATABASE_URL,
-        conn_max_age=600,
-        ssl_require=True # Forçar SSL é uma boa prática de segurança
+# Gerenciamento das conexões com o PostgreSQL:
+# - padrão (workers síncronos): conexões persistentes por 10 minutos, testadas antes de
+#   cada requisição (CONN_HEALTH_CHECKS), para que uma conexão derrubada pelo servidor
+#   não vire erro 500;
+# - DB_POOL=True (padrão no modo ASGI): pool de conexões do psycopg 3 em cada worker. No
+#   ASGI as consultas rodam em várias threads, e conexões persistentes por thread não
+#   seriam reaproveitadas. O pool não combina com CONN_MAX_AGE, que fica em 0.
+DB_POOL = os.environ.get('DB_POOL', str(os.environ.get('SERVIDOR_MODO', 'wsgi').lower() == 'asgi')).lower() == 'true'
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '10'))
+
+
+def configurar_banco(url, **extras):
+    # Forçar SSL é uma boa prática de segurança (o SQLite, usado localmente e nos testes, não tem SSL)
+    sqlite = url.startswith('sqlite')
+    pool = DB_POOL and not sqlite
+    banco = dj_database_url.parse(
+        url,
+        conn_max_age=0 if pool else 600,
+        conn_health_checks=not pool,
+        ssl_require=not sqlite,
+        **extras,
     )
+    if pool:
+        banco.setdefault('OPTIONS', {})['pool'] = {'min_size': 1, 'max_size': DB_POOL_MAX, 'timeout': 10}
+    return banco
+
+
+DATABASES = {
+    'default': configurar_banco(DATABASE_URL),
+}
+
+# Réplica de leitura (opcional): as views públicas que só leem do banco (home e APIs de
+# sementes) consultam a réplica; o admin, as cotações e todas as escritas ficam no
+# principal. Ver core/roteamento.py.
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+if DATABASE_REPLICA_URL:
+    # Nos testes a réplica aponta para o banco de teste principal.
+    DATABASES['replica'] = configurar_banco(DATABASE_REPLICA_URL, test_options={'MIRROR': 'default'})
+
+DATABASE_ROUTERS = ['core.roteamento.RoteadorDeLeitura']
+
+# Segundos após uma edição em que as leituras continuam no principal, enquanto a réplica
+# recebe a alteração (atraso máximo esperado da replicação).
+REPLICA_ATRASO_MAXIMO = int(os.environ.get('REPLICA_ATRASO_MAXIMO', '5'))
+
+
+# --- CACHE ---
+
+# O cache guarda as páginas renderizadas e a "versão do conteúdo" do site. Ele precisa
+# ser compartilhado entre os workers do Gunicorn para que uma edição no admin invalide
+# a página em todos eles: usa Redis se REDIS_URL for definida (requer o pacote 'redis')
+# e, caso contrário, um cache em disco, compartilhado pelos workers da mesma máquina.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHE_DIR = os.environ.get('CACHE_DIR', '/tmp/araguaya-cache')
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+        }
+    }
+
+# Páginas montadas (home, seções, APIs) e variações por query string ficam em caches
+# separados (ver core.cache.cache_de_paginas): consultas inventadas por um visitante
+# (?ids=..., buscas) só despejam outras consultas, nunca a home. No Redis são prefixos do
+# mesmo servidor, e as consultas expiram antes (ver TEMPO_CACHE_CONSULTA em core/cache.py).
+CACHE_PAGINAS = 'paginas'
+CACHE_CONSULTAS = 'consultas'
+if REDIS_URL:
+    CACHES[CACHE_PAGINAS] = {**CACHES['default'], 'KEY_PREFIX': 'paginas'}
+    CACHES[CACHE_CONSULTAS] = {**CACHES['default'], 'KEY_PREFIX': 'consultas'}
+else:
+    CACHES[CACHE_PAGINAS] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'paginas'),
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+    CACHES[CACHE_CONSULTAS] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'consultas'),
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+
+
+# --- LIMITES DE USO DA API ---
+
+# As rotas da API recusam com 429 quem passa do limite de requisições (por IP e no total),
+# com 413 corpos grandes demais e com 409 o mesmo envio repetido (ver core/limites.py).
+# Os contadores ficam no cache 'limites': no Redis, compartilhados pelos workers; sem ele,
+# na memória de cada worker (o cache em disco seria lento demais para cada requisição).
+LIMITES_ATIVOS = os.environ.get('LIMITES_ATIVOS', 'True').lower() == 'true'
+LIMITES_CACHE = 'limites'
+CACHES['limites'] = {**CACHES['default'], 'KEY_PREFIX': 'limites'} if REDIS_URL else {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'limites',
+    'OPTIONS': {'MAX_ENTRIES': 10000},
+}
+# Quantos proxies reversos repassam as requisições (o Railway usa um): o IP do visitante é
+# lido do X-Forwarded-For que eles preenchem. 0 usa o REMOTE_ADDR.
+PROXIES_REVERSOS = int(os.environ.get('PROXIES_REVERSOS', '1' if RAILWAY_STATIC_URL else '0'))
+
+
+# --- CDN ---
+
+# As páginas e a API de sementes saem com Cache-Control para a CDN (s-maxage,
+# stale-while-revalidate) e com as chaves do conteúdo que mostram (Surrogate-Key/Cache-Tag).
+# Cada edição no admin purga da CDN as chaves afetadas pelo CDN_PURGADOR. Purgadores em
+# core/cdn.py: NenhumPurgador (sem CDN), CloudflarePurgador, FastlyPurgador e RegistroPurgador (testes).
+CDN_PURGADOR = os.environ.get('CDN_PURGADOR', 'core.cdn.NenhumPurgador')
+CDN_CLOUDFLARE_ZONA = os.environ.get('CDN_CLOUDFLARE_ZONA', '')
+CDN_CLOUDFLARE_TOKEN = os.environ.get('CDN_CLOUDFLARE_TOKEN', '')
+CDN_FASTLY_SERVICO = os.environ.get('CDN_FASTLY_SERVICO', '')
+CDN_FASTLY_TOKEN = os.environ.get('CDN_FASTLY_TOKEN', '')
+# Tempo (segundos) que a CDN guarda as respostas. Sem purga, as edições só aparecem depois
+# dele, então o padrão é curto; com um purgador, pode ser longo.
+CDN_S_MAXAGE = int(os.environ.get('CDN_S_MAXAGE', '60' if CDN_PURGADOR == 'core.cdn.NenhumPurgador' else str(60 * 60 * 24)))
+CDN_STALE_WHILE_REVALIDATE = int(os.environ.get('CDN_STALE_WHILE_REVALIDATE', '60'))
+CDN_STALE_IF_ERROR = int(os.environ.get('CDN_STALE_IF_ERROR', str(60 * 60 * 24)))
+
+
+# --- SOLICITAÇÕES DE COTAÇÃO ---
+
+# As cotações são gravadas no banco e enviadas pelo worker 'python manage.py processar_cotacoes'.
+# Backends disponíveis em core/cotacoes.py: ConsoleBackend, ArquivoBackend e EmailBackend.
+COTACAO_BACKEND = os.environ.get('COTACAO_BACKEND', 'core.cotacoes.ConsoleBackend')
+COTACAO_ARQUIVO = os.environ.get('COTACAO_ARQUIVO', BASE_DIR / 'cotacoes.jsonl')
+COTACAO_EMAIL_DESTINO = os.environ.get('COTACAO_EMAIL_DESTINO', '')
+
+
+# --- PLANO DE PLANTIO (IA) ---
+
+# O botão "Gerar Plano de Plantio" chama /api/plano-plantio/, que consulta a API de IA pelo
+# servidor e guarda os planos pelo prompt (nomes atuais da semente, clima, solo e objetivo).
+# Backends disponíveis em core/plano_plantio.py: GeminiBackend e FalsoBackend (plano fixo,
+# para desenvolvimento).
+# Sem chave, o FalsoBackend só entra com DEBUG ligado ou se escolhido em PLANO_BACKEND;
+# fora disso o backend fica vazio e a API responde 503, em vez de planos fixos em produção.
+PLANO_GEMINI_API_KEY = os.environ.get('PLANO_GEMINI_API_KEY', '')
+PLANO_GEMINI_MODELO = os.environ.get('PLANO_GEMINI_MODELO', 'gemini-2.5-flash-preview-05-20')
+PLANO_BACKEND = os.environ.get(
+    'PLANO_BACKEND',
+    'core.plano_plantio.GeminiBackend' if PLANO_GEMINI_API_KEY
+    else 'core.plano_plantio.FalsoBackend' if DEBUG
+    else '',
+)
+PLANO_CACHE_TAMANHO = int(os.environ.get('PLANO_CACHE_TAMANHO', '1000'))  # planos na memória de cada processo
+PLANO_CACHE_TTL = int(os.environ.get('PLANO_CACHE_TTL', str(60 * 60 * 24 * 7)))  # segundos
+
+
+# --- MONITORAMENTO DE DESEMPENHO ---
+
+# O ServerTimingMiddleware envia o cabeçalho Server-Timing (db, template, storage, total) em
+# todas as respostas, e registra no logger 'core.desempenho':
+# - em WARNING, toda requisição mais lenta que DESEMPENHO_LIMITE_LENTO_MS, com as consultas SQL;
+# - em INFO, uma linha JSON por requisição (ative com DESEMPENHO_LOG_NIVEL=INFO).
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'True').lower() == 'true'
+DESEMPENHO_LIMITE_LENTO_MS = int(os.environ.get('DESEMPENHO_LIMITE_LENTO_MS', '500'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.desempenho': {
+            'handlers': ['console'],
+            'level': os.environ.get('DESEMPENHO_LOG_NIVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -113,11 +296,42 @@ STATIC_ROOT = BASE_DIR / 'staticfiles' # Pasta onde o collectstatic irá juntar
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
-# Adiciona o storage do Whitenoise para servir arquivos comprimidos e cacheados
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Imagens responsivas: cada upload gera versões redimensionadas em AVIF/WebP/JPEG (depois
+# do commit), e o template passa a usá-las (srcset/image-set). Imagens ainda sem versões
+# saem no tamanho original; para gerá-las, 'python manage.py gerar_derivados'.
+IMAGENS_RESPONSIVAS = os.environ.get('IMAGENS_RESPONSIVAS', 'True').lower() == 'true'
+
+# Home exportada: 'python manage.py exportar_home' grava a home pronta (com versões gzip e
+# brotli) em EXPORTACAO_DIR; depois da primeira exportação, ela é regravada após cada
+# edição no admin, com ou sem HOME_EXPORTADA. A pasta pode ser publicada em qualquer host
+# estático/CDN (sincronize-a depois das edições); com HOME_EXPORTADA=True, o próprio site também
+# serve a home a partir desses arquivos, sem banco nem template. As URLs de mídia precisam
+# ser públicas (URLs assinadas do GCS expirariam dentro do HTML exportado).
+HOME_EXPORTADA = os.environ.get('HOME_EXPORTADA', 'False').lower() == 'true'
+EXPORTACAO_DIR = os.environ.get('EXPORTACAO_DIR', BASE_DIR / 'exportado')
 
 # Mídia (Uploads) - Configuração para Google Cloud Storage (se aplicável)
 # ... sua configuração do django-storages para GCS continua aqui ...
 
+# O storage de mídia é envolvido pelo StorageMedido, que mede cada chamada (ex: geração de
+# URLs no GCS) no Server-Timing e guarda as URLs geradas na memória do processo. Para usar
+# o GCS, troque 'backend' por 'storages.backends.gcloud.GoogleCloudStorage' e passe as
+# opções dele em 'opcoes'. Para simular URLs assinadas sem o GCS, use
+# MEDIA_STORAGE_BACKEND=core.storage.StorageAssinadoFalso.
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.StorageMedido',
+        'OPTIONS': {
+            'backend': os.environ.get('MEDIA_STORAGE_BACKEND', 'django.core.files.storage.FileSystemStorage'),
+        },
+    },
+    # Storage do Whitenoise: arquivos comprimidos e com hash no nome, servidos com cache
+    # "para sempre" (o nome muda a cada alteração). Ver core.storage.EstaticosComManifest.
+    'staticfiles': {
+        'BACKEND': 'core.storage.EstaticosComManifest',
+    },
+}
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
@@ -0,0 +1,21 @@
+// assets/tailwind.config.js
+// Usado pelo 'python manage.py construir_assets'. As cores devem ficar iguais às do
+// tailwind.config inline de templates/index.html (usado enquanto os assets não são gerados).
+module.exports = {
+    content: [
+        './templates/**/*.html',
+        './core/templatetags/*.py',
+    ],
+    theme: {
+        extend: {
+            colors: {
+                'brand-green': '#2c5b3c',
+                'brand-green-light': '#4a7c59',
+                'brand-green-dark': '#1e3c28',
+                'brand-gold': '#d4af37',
+                'brand-light-gray': '#f8f9fa',
+                'brand-dark-gray': '#333333',
+            }
+        }
+    }
+}
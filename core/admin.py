@@ -1,6 +1,15 @@
 # core/admin.py
-from django.contrib import admin
-from .models import ConteudoTexto, HeroSlide, Semente, Diferencial, FAQ, ConfiguracoesGerais, ItemNavegacao,  ImagemSobreNos
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from .catalogo import EXPORTADORES, FORMATOS_CATALOGO, ErroImportacao, importar_catalogo
+from .models import ConteudoTexto, HeroSlide, Semente, Diferencial, FAQ, ConfiguracoesGerais, ItemNavegacao,  ImagemSobreNos, SolicitacaoCotacao, CaracteristicaCultivo
 
 @admin.register(ConteudoTexto)
 class ConteudoTextoAdmin(admin.ModelAdmin):
@@ -13,11 +22,18 @@ class HeroSlideAdmin(admin.ModelAdmin):
     list_display = ('titulo', 'subtitulo', 'ordem')
     list_editable = ('ordem',)
 
+class ImportarCatalogoForm(forms.Form):
+    arquivo = forms.FileField(help_text="Arquivo exportado pela ação \"Exportar\" da lista de sementes, editado em uma planilha.")
+    formato = forms.ChoiceField(choices=[(formato, formato.upper()) for formato in FORMATOS_CATALOGO])
+    simular = forms.BooleanField(required=False, help_text="Só valida o arquivo, sem gravar nada.")
+
 @admin.register(Semente)
 class SementeAdmin(admin.ModelAdmin):
     list_display = ('nome', 'tipo', 'proteina_bruta', 'tolerancia_seca')
     list_filter = ('tipo',)
     search_fields = ('nome', 'nome_cientifico')
+    filter_horizontal = ('caracteristicas',)
+    actions = ['exportar_csv', 'exportar_jsonl']
     fieldsets = (
         ('Informações Principais', {
             'fields': ('nome', 'tipo', 'nome_cientifico', 'imagem', 'paragrafo_descricao')
@@ -30,8 +46,66 @@ class SementeAdmin(admin.ModelAdmin):
                 'producao_materia_seca', 'consorciacao', 'pragas', 'adubacao_formacao'
             ),
         }),
+        ('Recomendação', {
+            'fields': ('caracteristicas', 'aparece_na_comparacao'),
+        }),
     )
 
+    def exportar(self, queryset, formato):
+        response = StreamingHttpResponse(EXPORTADORES[formato](queryset), content_type=FORMATOS_CATALOGO[formato])
+        response['Content-Disposition'] = f'attachment; filename="catalogo-sementes.{formato}"'
+        return response
+
+    @admin.action(description="Exportar as sementes selecionadas (CSV)")
+    def exportar_csv(self, request, queryset):
+        return self.exportar(queryset, 'csv')
+
+    @admin.action(description="Exportar as sementes selecionadas (JSON Lines)")
+    def exportar_jsonl(self, request, queryset):
+        return self.exportar(queryset, 'jsonl')
+
+    def get_urls(self):
+        return [
+            path('importar/', self.admin_site.admin_view(self.importar_view), name='core_semente_importar'),
+        ] + super().get_urls()
+
+    def importar_view(self, request):
+        """
+        Importa um catálogo inteiro (CSV ou JSON Lines, no formato da exportação) de uma vez,
+        em vez de cadastrar as sementes uma a uma. As imagens precisam já estar no storage;
+        para enviá-las junto, use o comando importar_catalogo com --imagens.
+        """
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            return redirect('admin:core_semente_changelist')
+        form = ImportarCatalogoForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            arquivo = io.TextIOWrapper(form.cleaned_data['arquivo'].file, encoding='utf-8-sig', newline='')
+            try:
+                resultado = importar_catalogo(arquivo, form.cleaned_data['formato'], simular=form.cleaned_data['simular'])
+            except ErroImportacao as erro:
+                for linha, mensagem in erro.erros:
+                    messages.error(request, f"Linha {linha}: {mensagem}")
+            else:
+                resumo = f"{resultado['criadas']} sementes criadas e {resultado['atualizadas']} atualizadas."
+                if form.cleaned_data['simular']:
+                    messages.info(request, f"Simulação sem erros: {resumo} Nada foi gravado.")
+                else:
+                    messages.success(request, f"Catálogo importado: {resumo}")
+                    return redirect('admin:core_semente_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': "Importar catálogo de sementes",
+            'form': form,
+        }
+        return TemplateResponse(request, 'admin/core/semente/importar.html', context)
+
+@admin.register(CaracteristicaCultivo)
+class CaracteristicaCultivoAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'categoria', 'slug')
+    list_filter = ('categoria',)
+    prepopulated_fields = {'slug': ('nome',)}
+
 @admin.register(Diferencial)
 class DiferencialAdmin(admin.ModelAdmin):
     list_display = ('titulo', 'icone', 'ordem')
@@ -59,4 +133,16 @@ class ConfiguracoesGeraisAdmin(admin.ModelAdmin):
 @admin.register(ItemNavegacao)
 class ItemNavegacaoAdmin(admin.ModelAdmin):
     list_display = ('texto', 'link', 'ordem')
-    list_editable = ('ordem',)
\ No newline at end of file
+    list_editable = ('ordem',)
+
+@admin.register(SolicitacaoCotacao)
+class SolicitacaoCotacaoAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'contato', 'produto', 'criada_em', 'status', 'tentativas')
+    list_filter = ('status', 'produto')
+    search_fields = ('nome', 'contato', 'mensagem')
+    readonly_fields = ('criada_em', 'tentativas', 'enviada_em', 'ultimo_erro')
+    actions = ['reenviar']
+
+    @admin.action(description="Reenviar as solicitações selecionadas")
+    def reenviar(self, request, queryset):
+        queryset.update(status=SolicitacaoCotacao.Status.PENDENTE, tentativas=0, proxima_tentativa_em=timezone.now())
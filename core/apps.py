@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Conecta os sinais que invalidam o cache quando o conteúdo muda.
+        from . import signals  # noqa: F401
+
+        # Mede as consultas de todas as conexões no Server-Timing (ver core.middleware).
+        from django.db.backends.signals import connection_created
+        from .desempenho import instrumentar_conexao
+        connection_created.connect(instrumentar_conexao, dispatch_uid='core.instrumentar_conexao')
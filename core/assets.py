@@ -0,0 +1,140 @@
+# core/assets.py
+
+import functools
+import re
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+# Versões fixas das bibliotecas de front-end baixadas pelo 'construir_assets'.
+LUCIDE_VERSAO = '0.460.0'
+LENIS_VERSAO = '1.0.42'
+
+URL_ICONE = 'https://unpkg.com/lucide-static@{versao}/icons/{nome}.svg'
+URL_LENIS = 'https://unpkg.com/@studio-freight/lenis@{versao}/dist/lenis.min.js'
+URL_FONTES = 'https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap'
+
+# Só os alfabetos usados em português são baixados.
+SUBCONJUNTOS_FONTES = ('latin', 'latin-ext')
+
+# Arquivos gerados, relativos à pasta de estáticos (STATICFILES_DIRS).
+CSS_SITE = 'css/site.css'
+SPRITE_ICONES = 'icones/sprite.svg'
+LENIS_JS = 'vendor/lenis.min.js'
+PASTA_FONTES = 'fontes'
+
+# Um navegador "moderno" no User-Agent faz o Google Fonts responder com WOFF2.
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+
+# Atributos padrão dos ícones do Lucide (traço de 2px na cor do texto).
+ATRIBUTOS_ICONE = (
+    'viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" '
+    'stroke-linecap="round" stroke-linejoin="round"'
+)
+
+RE_ICONE_TEMPLATE = re.compile(r"""{%\s*icone\s+["']([a-z0-9-]+)["']""")
+RE_CONTEUDO_SVG = re.compile(r'<svg[^>]*>(.*)</svg>', re.S)
+RE_BLOCO_FONTE = re.compile(r'/\*\s*([\w-]+)\s*\*/\s*(@font-face\s*{[^}]*})')
+RE_URL_CSS = re.compile(r'url\(([^)]+)\)')
+RE_SIMBOLO = re.compile(r'<symbol id="([^"]+)"')
+
+
+def baixar(url: str) -> bytes:
+    requisicao = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(requisicao, timeout=30) as resposta:
+        return resposta.read()
+
+
+def icones_dos_templates() -> set:
+    """
+    Ícones usados com {% icone "nome" %} nos templates do projeto.
+    """
+    icones = set()
+    for pasta in settings.TEMPLATES[0]['DIRS']:
+        for arquivo in Path(pasta).rglob('*.html'):
+            icones.update(RE_ICONE_TEMPLATE.findall(arquivo.read_text(encoding='utf-8')))
+    return icones
+
+
+def icones_usados() -> list:
+    """
+    Ícones que entram no sprite: os fixos dos templates mais os escolhidos no admin (Diferencial.icone).
+    """
+    from .models import Diferencial
+
+    icones = icones_dos_templates()
+    icones.update(icone.strip() for icone in Diferencial.objects.values_list('icone', flat=True) if icone.strip())
+    return sorted(icones)
+
+
+def montar_sprite(svgs: dict) -> str:
+    """
+    Junta os SVGs do Lucide ({nome: conteúdo do arquivo .svg}) em um sprite com um <symbol> por ícone.
+    """
+    simbolos = []
+    for nome, svg in sorted(svgs.items()):
+        conteudo = RE_CONTEUDO_SVG.search(svg)
+        if not conteudo:
+            raise ValueError(f'SVG inválido para o ícone "{nome}".')
+        simbolos.append(f'<symbol id="{nome}" {ATRIBUTOS_ICONE}>{conteudo.group(1).strip()}</symbol>')
+    return '<svg xmlns="http://www.w3.org/2000/svg">' + ''.join(simbolos) + '</svg>\n'
+
+
+def fontes_locais(css_google: str) -> tuple:
+    """
+    Filtra o CSS do Google Fonts para SUBCONJUNTOS_FONTES e troca as URLs externas por
+    arquivos locais. Retorna (css, {nome do arquivo local: URL de origem}).
+
+    O CSS resultante fica em css/ e aponta para ../fontes/, então o collectstatic
+    (ManifestStaticFilesStorage) reescreve as URLs com o hash de cada arquivo.
+    """
+    arquivos = {}  # URL de origem -> nome local (fontes variáveis repetem a URL em cada peso)
+    por_subconjunto = defaultdict(int)
+    blocos = []
+    for subconjunto, bloco in RE_BLOCO_FONTE.findall(css_google):
+        if subconjunto not in SUBCONJUNTOS_FONTES:
+            continue
+
+        def trocar(match, subconjunto=subconjunto):
+            url = match.group(1).strip('\'"')
+            if url not in arquivos:
+                indice = por_subconjunto[subconjunto]
+                por_subconjunto[subconjunto] += 1
+                arquivos[url] = f'inter-{subconjunto}{f"-{indice}" if indice else ""}.woff2'
+            return f'url(../{PASTA_FONTES}/{arquivos[url]})'
+
+        blocos.append(RE_URL_CSS.sub(trocar, bloco))
+    return '\n'.join(blocos) + '\n', {nome: url for url, nome in arquivos.items()}
+
+
+@functools.cache
+def assets_construidos() -> bool:
+    """
+    Indica se o 'construir_assets' já gerou o CSS, os ícones e as fontes locais. Enquanto
+    não gerou (ex: logo após clonar o projeto), o site continua usando as CDNs.
+    """
+    if settings.DEBUG:
+        return finders.find(CSS_SITE) is not None
+    return staticfiles_storage.exists(CSS_SITE)
+
+
+@functools.cache
+def icones_do_sprite() -> frozenset:
+    """
+    Ícones presentes no sprite gerado. Um ícone escolhido no admin depois do último
+    'construir_assets' não está nele e sai pela CDN do Lucide (ver o {% icone %}).
+    """
+    try:
+        if settings.DEBUG:
+            caminho = finders.find(SPRITE_ICONES)
+            sprite = Path(caminho).read_text(encoding='utf-8') if caminho else ''
+        else:
+            with staticfiles_storage.open(SPRITE_ICONES) as arquivo:
+                sprite = arquivo.read().decode('utf-8')
+    except (OSError, ValueError):
+        sprite = ''
+    return frozenset(RE_SIMBOLO.findall(sprite))
@@ -0,0 +1,258 @@
+# core/benchmark.py
+
+import json
+import statistics
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .cache import incrementar_versao_conteudo
+from .models import (
+    FAQ,
+    ConfiguracoesGerais,
+    ConteudoTexto,
+    Diferencial,
+    HeroSlide,
+    ImagemSobreNos,
+    ItemNavegacao,
+    Semente,
+    SolicitacaoCotacao,
+)
+
+# Todo registro criado pelo benchmark começa com este prefixo, para poder ser removido depois.
+PREFIXO = 'Benchmark'
+
+TEXTO_LONGO = (
+    "Forrageira de alta produtividade, indicada para sistemas intensivos de pastejo rotacionado. "
+    "Apresenta boa tolerância à seca, rebrota vigorosa após o corte e excelente aceitação pelos animais. "
+) * 3
+
+CORPO_COTACAO = {
+    'nome': PREFIXO,
+    'contato': 'benchmark@araguaya.local',
+    'produto': 'Sementes de Pastagem',
+    'mensagem': 'Cotação de 50 sacos para entrega em 30 dias.',
+}
+
+
+def popular_banco(sementes=300, slides=12, diferenciais=6, faqs=40, textos=60, itens_navegacao=8, imagens_sobre_nos=12):
+    """
+    Cria um volume realista de conteúdo para o benchmark (centenas de sementes, dezenas de
+    slides, FAQs e textos). Os arquivos de imagem não precisam existir.
+    """
+    remover_dados()
+    config = ConfiguracoesGerais.objects.first() or ConfiguracoesGerais.objects.create(
+        imagem_fundo_dicas=f'config/{PREFIXO.lower()}.jpg',
+        mapa_url='https://www.google.com/maps/embed?pb=benchmark',
+        sobre_nos_p1=TEXTO_LONGO,
+    )
+
+    novas_sementes = []
+    for i in range(sementes):
+        semente = Semente(
+            nome=f'{PREFIXO} {i:04d}',
+            tipo=('Brachiaria', 'Panicum', 'Leguminosa', 'Andropogon')[i % 4],
+            nome_cientifico=f'Brachiaria brizantha cv. {PREFIXO} {i}',
+            imagem=f'sementes/{PREFIXO.lower()}-{i}.jpg',
+            paragrafo_descricao=TEXTO_LONGO,
+            origem='África', forma_crescimento='Touceira', altura='1,0 a 1,5 m',
+            utilizacao='Pastejo, feno e silagem', digestibilidade='Boa', palatabilidade='Ótima',
+            tolerancia_seca='Alta', tolerancia_frio='Média', proteina_bruta='10 a 12%',
+            producao_materia_seca='15 a 20 t/ha/ano', consorciacao='Estilosantes Campo Grande',
+            pragas='Resistente à cigarrinha', adubacao_formacao='60 kg/ha de P2O5',
+            aparece_na_comparacao=i < 4,
+        )
+        semente.preencher_campos_busca()
+        novas_sementes.append(semente)
+    Semente.objects.bulk_create(novas_sementes, batch_size=200)
+
+    HeroSlide.objects.bulk_create(
+        HeroSlide(titulo=f'{PREFIXO} slide {i}', subtitulo=TEXTO_LONGO[:200], imagem=f'hero_slides/{PREFIXO.lower()}-{i}.jpg', ordem=i)
+        for i in range(slides)
+    )
+    Diferencial.objects.bulk_create(
+        Diferencial(titulo=f'{PREFIXO} diferencial {i}', descricao=TEXTO_LONGO[:300], icone='leaf', ordem=i)
+        for i in range(diferenciais)
+    )
+    FAQ.objects.bulk_create(
+        FAQ(pergunta=f'{PREFIXO} pergunta {i}?', resposta=TEXTO_LONGO, ordem=i) for i in range(faqs)
+    )
+    ConteudoTexto.objects.bulk_create(
+        ConteudoTexto(chave=f'{PREFIXO.lower()}_texto_{i}', valor=TEXTO_LONGO[:200]) for i in range(textos)
+    )
+    ItemNavegacao.objects.bulk_create(
+        ItemNavegacao(texto=f'{PREFIXO} {i}', link=f'#secao-{i}', ordem=i) for i in range(itens_navegacao)
+    )
+    ImagemSobreNos.objects.bulk_create(
+        ImagemSobreNos(configuracao=config, imagem=f'sobre_nos_slides/{PREFIXO.lower()}-{i}.jpg', ordem=i)
+        for i in range(imagens_sobre_nos)
+    )
+    # bulk_create não dispara sinais: invalida o cache uma vez, no final.
+    incrementar_versao_conteudo()
+
+
+def remover_dados():
+    """
+    Remove tudo o que foi criado pelo benchmark.
+    """
+    Semente.objects.filter(nome__startswith=PREFIXO).delete()
+    HeroSlide.objects.filter(titulo__startswith=PREFIXO).delete()
+    Diferencial.objects.filter(titulo__startswith=PREFIXO).delete()
+    FAQ.objects.filter(pergunta__startswith=PREFIXO).delete()
+    ConteudoTexto.objects.filter(chave__startswith=PREFIXO.lower()).delete()
+    ItemNavegacao.objects.filter(texto__startswith=PREFIXO).delete()
+    ImagemSobreNos.objects.filter(imagem__contains=PREFIXO.lower()).delete()
+    SolicitacaoCotacao.objects.filter(nome=PREFIXO).delete()
+    ConfiguracoesGerais.objects.filter(imagem_fundo_dicas=f'config/{PREFIXO.lower()}.jpg').delete()
+
+
+def cenarios() -> dict:
+    """
+    Rotas medidas pelo benchmark: {nome: (método, caminho, corpo JSON ou None)}.
+    """
+    semente = Semente.objects.filter(nome__startswith=PREFIXO).first() or Semente.objects.first()
+    return {
+        'index_view': ('GET', '/', None),
+        'semente_api_view': ('GET', f'/api/semente/{semente.pk}/' if semente else '/api/semente/0/', None),
+        'solicitar_cotacao_api_view': ('POST', '/api/solicitar-cotacao/', CORPO_COTACAO),
+    }
+
+
+def _requisitar(client, metodo, caminho, corpo):
+    if metodo == 'POST':
+        return client.post(caminho, json.dumps(corpo), content_type='application/json')
+    return client.get(caminho)
+
+
+def medir_em_processo(metodo, caminho, corpo=None, repeticoes=20) -> dict:
+    """
+    Mede uma rota dentro do próprio processo (sem rede): consultas SQL com o cache frio e
+    quente, memória alocada por requisição (tracemalloc) e latência em milissegundos.
+
+    As medições usam caches próprios, vazios e em memória: o cache frio não depende de
+    esvaziar o Redis ou os arquivos de cache do ambiente medido.
+    """
+    client = Client()
+    # O benchmark repete o mesmo POST de um mesmo IP: sem desligar os limites de uso
+    # (core/limites.py), quase todas as requisições seriam recusadas.
+    with override_settings(ALLOWED_HOSTS=['*'], LIMITES_ATIVOS=False, CACHES=_caches_isolados()):
+        return _medir_em_processo(client, metodo, caminho, corpo, repeticoes)
+
+
+def _caches_isolados() -> dict:
+    """
+    Cópia de settings.CACHES em que o cache padrão e os de páginas e consultas apontam
+    para um LocMemCache novo, exclusivo desta medição.
+    """
+    execucao = uuid.uuid4().hex
+    isolados = dict(settings.CACHES)
+    for alias in ('default', settings.CACHE_PAGINAS, settings.CACHE_CONSULTAS):
+        isolados[alias] = {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f'benchmark-{execucao}-{alias}',
+        }
+    return isolados
+
+
+def _medir_em_processo(client, metodo, caminho, corpo, repeticoes):
+    with CaptureQueriesContext(connection) as queries:
+        _requisitar(client, metodo, caminho, corpo)
+    consultas_frio = len(queries)
+
+    with CaptureQueriesContext(connection) as queries:
+        _requisitar(client, metodo, caminho, corpo)
+    consultas_quente = len(queries)
+
+    tracemalloc.start()
+    try:
+        _requisitar(client, metodo, caminho, corpo)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        _requisitar(client, metodo, caminho, corpo)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    return {
+        'consultas_frio': consultas_frio,
+        'consultas_quente': consultas_quente,
+        'alocacao_kb': round(pico / 1024, 1),
+        'latencia_em_processo_ms': round(statistics.median(tempos), 3),
+    }
+
+
+def _percentil(valores, percentual):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, round(percentual / 100 * (len(ordenados) - 1)))
+    return ordenados[indice]
+
+
+def medir_sob_carga(url_base, metodo, caminho, corpo=None, requisicoes=500, concorrencia=8, timeout=30) -> dict:
+    """
+    Dispara `requisicoes` chamadas HTTP, `concorrencia` por vez, contra um servidor já
+    rodando em `url_base`. Retorna p50/p95/p99 em milissegundos, vazão e erros.
+    """
+    dados = json.dumps(corpo).encode() if corpo is not None else None
+
+    def chamar(_):
+        requisicao = urllib.request.Request(url_base + caminho, data=dados, method=metodo)
+        if dados is not None:
+            requisicao.add_header('Content-Type', 'application/json')
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+                resposta.read()
+                ok = resposta.status < 400
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return (time.perf_counter() - inicio) * 1000, ok
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        resultados = list(executor.map(chamar, range(requisicoes)))
+    duracao = time.perf_counter() - inicio
+
+    tempos = [tempo for tempo, _ in resultados]
+    return {
+        'requisicoes': requisicoes,
+        'concorrencia': concorrencia,
+        'erros': sum(1 for _, ok in resultados if not ok),
+        'p50_ms': round(_percentil(tempos, 50), 2),
+        'p95_ms': round(_percentil(tempos, 95), 2),
+        'p99_ms': round(_percentil(tempos, 99), 2),
+        'requisicoes_por_segundo': round(requisicoes / duracao, 1),
+    }
+
+
+def comparar_com_baseline(resultado: dict, baseline: dict, tolerancia: float = 0.25) -> list:
+    """
+    Compara um resultado com o baseline gravado e retorna a lista de regressões encontradas.
+
+    Consultas SQL não têm tolerância (qualquer consulta a mais é regressão); latência e
+    memória podem piorar até `tolerancia` (25% por padrão) antes de contar como regressão.
+    """
+    regressoes = []
+    for cenario, atual in resultado.get('cenarios', {}).items():
+        anterior = baseline.get('cenarios', {}).get(cenario)
+        if not anterior:
+            continue
+        for metrica in ('consultas_frio', 'consultas_quente'):
+            if metrica in anterior and atual.get(metrica, 0) > anterior[metrica]:
+                regressoes.append(f'{cenario}: {metrica} subiu de {anterior[metrica]} para {atual[metrica]}')
+        for metrica in ('alocacao_kb', 'p95_ms', 'p50_ms'):
+            if metrica in anterior and atual.get(metrica, 0) > anterior[metrica] * (1 + tolerancia):
+                regressoes.append(f'{cenario}: {metrica} subiu de {anterior[metrica]} para {atual[metrica]}')
+        if atual.get('erros'):
+            regressoes.append(f"{cenario}: {atual['erros']} requisições com erro")
+    return regressoes
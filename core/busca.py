@@ -0,0 +1,174 @@
+# core/busca.py
+
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F
+
+from .cache import cache_de_paginas, em_memoria_por_versao, obter_versao_conteudo
+from .models import Semente
+from .serializers import serializar_semente
+from .texto import tokenizar
+
+# Consultas menores que isso não são executadas (a digitação ainda está no começo).
+TAMANHO_MINIMO_CONSULTA = 2
+
+# Por quanto tempo o resultado de uma consulta fica no cache compartilhado (no cache de
+# consultas, para que buscas inventadas não despejem as páginas).
+TEMPO_CACHE_BUSCA = 60 * 10
+
+# Peso de cada grupo de campos no ranking: nome/nome científico/tipo valem mais que a descrição.
+PESO_PRINCIPAL = 3
+PESO_TEXTO = 1
+
+# Similaridade mínima (em trigramas) para aceitar uma palavra parecida quando nenhuma
+# palavra começa com o termo digitado (ex: 'brachiara' -> 'brachiaria').
+SIMILARIDADE_MINIMA = 0.45
+
+
+def usar_postgres() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def vetor_de_busca():
+    return (
+        SearchVector('busca_principal', weight='A', config='simple')
+        + SearchVector('busca_texto', weight='B', config='simple')
+    )
+
+
+def atualizar_vetor_busca(pks) -> None:
+    """
+    Recalcula o vetor de busca (PostgreSQL) das sementes indicadas, em um único UPDATE.
+    Os campos busca_principal/busca_texto já foram preenchidos no save.
+    """
+    if usar_postgres():
+        Semente.objects.filter(pk__in=list(pks)).update(vetor_busca=vetor_de_busca())
+
+
+def _trigramas(palavra: str) -> set:
+    palavra = f'  {palavra} '
+    return {palavra[i:i + 3] for i in range(len(palavra) - 2)}
+
+
+class IndiceBusca:
+    """
+    Índice invertido em memória, usado quando o banco não é PostgreSQL (desenvolvimento e testes).
+
+    Guarda as palavras em uma lista ordenada (busca por prefixo com bisect), a lista de
+    sementes de cada palavra com seu peso, e os trigramas de cada palavra para tolerar
+    erros de digitação.
+    """
+
+    def __init__(self, sementes):
+        self.sementes = sementes
+        self.postings = defaultdict(dict)  # palavra -> {posição da semente: peso}
+        for posicao, semente in enumerate(sementes):
+            for texto, peso in ((semente.busca_principal, PESO_PRINCIPAL), (semente.busca_texto, PESO_TEXTO)):
+                for palavra in texto.split():
+                    atual = self.postings[palavra].get(posicao, 0)
+                    self.postings[palavra][posicao] = max(atual, peso)
+        self.palavras = sorted(self.postings)
+        self.trigramas = defaultdict(set)
+        for palavra in self.palavras:
+            for trigrama in _trigramas(palavra):
+                self.trigramas[trigrama].add(palavra)
+
+    @classmethod
+    def construir(cls):
+        return cls(list(Semente.objects.only('id', 'nome', 'nome_cientifico', 'tipo', 'imagem', 'busca_principal', 'busca_texto')))
+
+    def _palavras_com_prefixo(self, termo: str) -> list:
+        inicio = bisect_left(self.palavras, termo)
+        encontradas = []
+        for palavra in self.palavras[inicio:]:
+            if not palavra.startswith(termo):
+                break
+            encontradas.append(palavra)
+        return encontradas
+
+    def _palavras_parecidas(self, termo: str) -> list:
+        trigramas = _trigramas(termo)
+        contagem = defaultdict(int)
+        for trigrama in trigramas:
+            for palavra in self.trigramas.get(trigrama, ()):
+                contagem[palavra] += 1
+        return [
+            palavra for palavra, comuns in contagem.items()
+            if comuns / (len(trigramas) + len(_trigramas(palavra)) - comuns) >= SIMILARIDADE_MINIMA
+        ]
+
+    def _pontuar_termo(self, termo: str) -> dict:
+        pontos = {}
+        palavras = self._palavras_com_prefixo(termo)
+        fator = 1.0
+        if not palavras:
+            palavras = self._palavras_parecidas(termo)
+            fator = 0.5
+        for palavra in palavras:
+            # Palavra inteira vale mais que só o começo dela.
+            bonus = 1.0 if palavra == termo else 0.7
+            for posicao, peso in self.postings[palavra].items():
+                pontos[posicao] = max(pontos.get(posicao, 0), peso * bonus * fator)
+        return pontos
+
+    def buscar(self, termos: list, limite: int) -> list:
+        """
+        Retorna as sementes que contêm todos os termos (por prefixo), da mais relevante para a menos.
+        """
+        total = None
+        for termo in termos:
+            pontos = self._pontuar_termo(termo)
+            if total is None:
+                total = pontos
+            else:
+                total = {posicao: total[posicao] + valor for posicao, valor in pontos.items() if posicao in total}
+            if not total:
+                return []
+        ordenadas = sorted(total.items(), key=lambda item: (-item[1], item[0]))
+        return [self.sementes[posicao] for posicao, _ in ordenadas[:limite]]
+
+
+@em_memoria_por_versao
+def obter_indice_busca() -> IndiceBusca:
+    return IndiceBusca.construir()
+
+
+def _buscar_no_postgres(termos: list, limite: int) -> list:
+    # Os termos já estão normalizados (só [a-z0-9]), então podem ir direto para o tsquery.
+    consulta = SearchQuery(' & '.join(f'{termo}:*' for termo in termos), search_type='raw', config='simple')
+    return list(
+        Semente.objects
+        .filter(vetor_busca=consulta)
+        .annotate(relevancia=SearchRank(F('vetor_busca'), consulta))
+        .order_by('-relevancia', 'nome')[:limite]
+    )
+
+
+def buscar_sementes(consulta: str, limite: int = 10) -> list:
+    """
+    Busca sementes por nome, nome científico, tipo, descrição, consorciação e pragas.
+
+    A busca ignora acentos e maiúsculas e aceita o começo das palavras ("brach" encontra
+    "Brachiaria"). Retorna uma lista de dicts prontos para a API; os resultados ficam em
+    cache por versão do conteúdo, então consultas repetidas (ex: a mesma letra digitada
+    por vários visitantes) não voltam ao banco.
+    """
+    termos = tokenizar(consulta)
+    if len(''.join(termos)) < TAMANHO_MINIMO_CONSULTA:
+        return []
+
+    chave = f"core:busca:{obter_versao_conteudo()}:{limite}:{'+'.join(termos)}"
+    consultas = cache_de_paginas(com_query=True)
+    resultado = consultas.get(chave)
+    if resultado is None:
+        if usar_postgres():
+            sementes = _buscar_no_postgres(termos, limite)
+        else:
+            sementes = obter_indice_busca().buscar(termos, limite)
+        campos = ('id', 'nome', 'nome_cientifico', 'tipo', 'imagem_url')
+        resultado = [serializar_semente(semente, campos) for semente in sementes]
+        consultas.set(chave, resultado, TEMPO_CACHE_BUSCA)
+    return resultado
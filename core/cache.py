@@ -0,0 +1,444 @@
+# core/cache.py
+
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .cdn import CHAVE_SITE, purgar_na_borda
+from .compressao import versoes_comprimidas
+
+logger = logging.getLogger(__name__)
+
+# A "versão do conteúdo" é um carimbo de tempo (em milissegundos) da última alteração
+# feita pelo admin. Toda página em cache guarda a versão com que foi montada: basta
+# trocá-la para que todas as páginas antigas sejam remontadas, sem apagar uma por uma.
+CHAVE_VERSAO_CONTEUDO = 'core:versao_conteudo'
+
+# Tempo máximo que uma página renderizada fica no cache, mesmo sem nenhuma edição.
+TEMPO_CACHE_PAGINA = 60 * 60 * 24
+
+# As variações por query string (filtros da API) ficam menos tempo guardadas: são muitas
+# e cada uma é pouco pedida.
+TEMPO_CACHE_CONSULTA = 60 * 60
+
+# Enquanto um worker remonta uma página, os outros servem a versão anterior dela. A trava
+# expira sozinha depois desse tempo, caso o worker morra no meio da reconstrução.
+TEMPO_TRAVA_RECONSTRUCAO = 30
+
+# Quando nem a versão anterior existe, os outros workers esperam até esse tempo (em
+# segundos) pela página que está sendo montada, antes de montá-la eles mesmos.
+ESPERA_MAXIMA_RECONSTRUCAO = 3
+
+# Refresh antecipado probabilístico ("XFetch"): perto de expirar, cada requisição tem uma
+# chance crescente de remontar a página antes da hora. Valores maiores antecipam mais.
+BETA_REFRESH_ANTECIPADO = 1.0
+
+
+def obter_versao_conteudo() -> int:
+    """
+    Retorna a versão atual do conteúdo do site, criando uma nova se o cache estiver vazio.
+    """
+    versao = cache.get(CHAVE_VERSAO_CONTEUDO)
+    if versao is None:
+        # Cache vazio (deploy, reinício ou despejo): começa uma versão nova a partir de agora.
+        versao = int(time.time() * 1000)
+        cache.add(CHAVE_VERSAO_CONTEUDO, versao, timeout=None)
+        versao = cache.get(CHAVE_VERSAO_CONTEUDO, versao)
+    return versao
+
+
+async def aobter_versao_conteudo() -> int:
+    """
+    Versão assíncrona de obter_versao_conteudo(), para as views async.
+    """
+    versao = await cache.aget(CHAVE_VERSAO_CONTEUDO)
+    if versao is None:
+        versao = int(time.time() * 1000)
+        await cache.aadd(CHAVE_VERSAO_CONTEUDO, versao, timeout=None)
+        versao = await cache.aget(CHAVE_VERSAO_CONTEUDO, versao)
+    return versao
+
+
+def incrementar_versao_conteudo() -> int:
+    """
+    Gera uma nova versão do conteúdo, invalidando todas as páginas em cache.
+    """
+    atual = cache.get(CHAVE_VERSAO_CONTEUDO) or 0
+    # A versão nunca volta para trás, mesmo com duas edições no mesmo milissegundo.
+    nova = max(int(time.time() * 1000), atual + 1)
+    cache.set(CHAVE_VERSAO_CONTEUDO, nova, timeout=None)
+    return nova
+
+
+def em_memoria_por_versao(func=None, *, ttl=None):
+    """
+    Decorator que guarda o resultado de `func()` na memória do processo até a versão do
+    conteúdo mudar. Serve para estruturas caras de montar e baratas de consultar (índices,
+    textos do site), que não valem a ida ao cache compartilhado a cada requisição.
+
+    Com `ttl` (em segundos), o valor também é refeito depois desse tempo, mesmo sem mudança
+    de versão: uma rede de segurança para alterações feitas por fora do admin (SQL direto,
+    loaddata), que não disparam os sinais.
+
+    A função decorada ganha o método `limpar()` para descartar o valor guardado.
+    Uso: @em_memoria_por_versao ou @em_memoria_por_versao(ttl=300)
+    """
+    if func is None:
+        return lambda func: em_memoria_por_versao(func, ttl=ttl)
+
+    guardado = None  # (versão, validade, valor)
+    lock = threading.Lock()
+
+    def _valido(atual, versao) -> bool:
+        return atual is not None and atual[0] == versao and (atual[1] is None or time.monotonic() < atual[1])
+
+    @wraps(func)
+    def _wrapped():
+        nonlocal guardado
+        versao = obter_versao_conteudo()
+        atual = guardado
+        if _valido(atual, versao):
+            return atual[2]
+        with lock:
+            # Outra thread pode ter reconstruído o valor enquanto esperávamos o lock.
+            if not _valido(guardado, versao):
+                validade = time.monotonic() + ttl if ttl is not None else None
+                guardado = (versao, validade, func())
+            return guardado[2]
+
+    def limpar():
+        nonlocal guardado
+        guardado = None
+
+    _wrapped.limpar = limpar
+    return _wrapped
+
+
+def cache_de_paginas(com_query: bool = False):
+    """
+    Cache das páginas montadas pelo cache_por_versao. As variações por query string ficam
+    em um cache separado: como qualquer visitante pode inventar query strings, enchê-lo
+    não despeja a home nem as outras páginas principais.
+    """
+    return caches[settings.CACHE_CONSULTAS if com_query else settings.CACHE_PAGINAS]
+
+
+def limpar_caches() -> None:
+    """
+    Esvazia o cache padrão e os de páginas e consultas (os contadores de limites ficam).
+    """
+    for alias in dict.fromkeys(('default', settings.CACHE_PAGINAS, settings.CACHE_CONSULTAS)):
+        caches[alias].clear()
+
+
+def _assinatura_query(request, parametros=None) -> str:
+    """
+    Resumo curto e estável da query string (a ordem dos parâmetros não importa). Com
+    `parametros`, só eles entram no resumo, sem os espaços nas pontas dos valores:
+    parâmetros desconhecidos (?utm_source=..., ?x=123) não criam entradas novas.
+    """
+    itens = [
+        (chave, valor.strip()) for chave in sorted(request.GET)
+        if parametros is None or chave in parametros
+        for valor in request.GET.getlist(chave)
+    ]
+    itens = [(chave, valor) for chave, valor in itens if valor or parametros is None]
+    if not itens:
+        return ''
+    query = '&'.join(f'{chave}={valor}' for chave, valor in itens)
+    return hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def _etag(nome: str, request, args, kwargs, versao: int) -> str:
+    partes = [nome, *(str(valor) for valor in args), *(str(valor) for valor in kwargs.values())]
+    if request.GET:
+        partes.append(_assinatura_query(request))
+    return '-'.join(partes + [str(versao)])
+
+
+def _expirou_ou_antecipou(expira_em: float, duracao: float) -> bool:
+    # Sorteio do XFetch: quanto mais cara a página (duracao) e mais perto de expirar, mais
+    # provável remontá-la agora. 1 - random() fica em (0, 1], evitando log(0).
+    return time.time() - duracao * BETA_REFRESH_ANTECIPADO * math.log(1.0 - random.random()) >= expira_em
+
+
+def cache_por_versao(nome: str, variar_por_query=()):
+    """
+    Decorator que guarda a resposta renderizada pela view, junto com a versão do conteúdo
+    usada para montá-la.
+
+    Só respostas GET/HEAD com status 200 são guardadas. Por padrão a query string é
+    ignorada: a home não depende dela, e links de campanha (?utm_source=...) devem cair
+    no mesmo cache. Views que filtram pela query string listam os parâmetros que usam em
+    `variar_por_query` (ex: ('fields', 'ids')); só eles entram na chave, e essas entradas
+    ficam no cache de consultas (ver cache_de_paginas).
+
+    Depois de uma edição no admin, só um worker remonta a página (trava no cache); os
+    outros continuam servindo a versão anterior até ela ficar pronta, em vez de irem
+    todos ao banco ao mesmo tempo.
+
+    Funciona com views síncronas e assíncronas (async def); nas assíncronas o cache é
+    acessado pela API async do Django (aget/aset), sem bloquear o event loop.
+
+    As versões comprimidas (brotli/gzip) da página são geradas quando ela é montada e
+    guardadas na mesma entrada: o CompressaoMiddleware só escolhe a que o cliente aceita.
+    """
+    def decorator(view_func):
+        def chave_da_pagina(request, args, kwargs) -> tuple:
+            """(cache onde a página fica, chave dela nesse cache, tempo que ela fica lá)"""
+            partes = [nome, *args, *kwargs.values()]
+            assinatura = _assinatura_query(request, variar_por_query) if variar_por_query else ''
+            if assinatura:
+                partes.append(assinatura)
+            # A entrada fica no cache além da validade, para poder ser servida (desatualizada)
+            # enquanto outro worker a remonta.
+            tempo = TEMPO_CACHE_CONSULTA if assinatura else TEMPO_CACHE_PAGINA * 2
+            return cache_de_paginas(bool(assinatura)), 'core:pagina:' + ':'.join(str(parte) for parte in partes), tempo
+
+        def atualizada(entrada, versao) -> bool:
+            return entrada is not None and entrada[0] == versao and not _expirou_ou_antecipou(entrada[3], entrada[4])
+
+        def entrada_para_cache(response, versao, inicio):
+            if response.status_code != 200 or response.streaming:
+                return None
+            # (versão, conteúdo, content type, expira em, tempo para montar, versões comprimidas)
+            response.comprimidos = versoes_comprimidas(response.content, response['Content-Type'])
+            return (
+                versao, response.content, response['Content-Type'], time.time() + TEMPO_CACHE_PAGINA,
+                time.time() - inicio, response.comprimidos,
+            )
+
+        def resposta_do_cache(request, entrada, versao_atual, args, kwargs):
+            versao, conteudo, content_type = entrada[:3]
+            response = HttpResponse(conteudo, content_type=content_type)
+            # Entradas gravadas antes das versões comprimidas existirem têm só 5 itens.
+            response.comprimidos = entrada[5] if len(entrada) > 5 else {}
+            if versao != versao_atual:
+                # Página da versão anterior: a ETag precisa ser a dela, senão o navegador
+                # guardaria o conteúdo antigo como se fosse o atual.
+                response['ETag'] = quote_etag(_etag(nome, request, args, kwargs, versao))
+            return response
+
+        def reconstruir(request, paginas, chave, tempo, versao, args, kwargs):
+            inicio = time.time()
+            response = view_func(request, *args, **kwargs)
+            entrada = entrada_para_cache(response, versao, inicio)
+            if entrada is not None:
+                paginas.set(chave, entrada, tempo)
+            return response
+
+        async def areconstruir(request, paginas, chave, tempo, versao, args, kwargs):
+            inicio = time.time()
+            response = await view_func(request, *args, **kwargs)
+            entrada = entrada_para_cache(response, versao, inicio)
+            if entrada is not None:
+                await paginas.aset(chave, entrada, tempo)
+            return response
+
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                # Mesmo fluxo da versão síncrona abaixo.
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+
+                paginas, chave, tempo = chave_da_pagina(request, args, kwargs)
+                versao = await aobter_versao_conteudo()
+                entrada = await paginas.aget(chave)
+                if atualizada(entrada, versao):
+                    return resposta_do_cache(request, entrada, versao, args, kwargs)
+
+                trava = chave + ':reconstruindo'
+                if await paginas.aadd(trava, 1, TEMPO_TRAVA_RECONSTRUCAO):
+                    try:
+                        return await areconstruir(request, paginas, chave, tempo, versao, args, kwargs)
+                    finally:
+                        await paginas.adelete(trava)
+
+                if entrada is not None:
+                    return resposta_do_cache(request, entrada, versao, args, kwargs)
+
+                limite = time.monotonic() + ESPERA_MAXIMA_RECONSTRUCAO
+                while time.monotonic() < limite:
+                    await asyncio.sleep(0.05)
+                    entrada = await paginas.aget(chave)
+                    if entrada is not None and entrada[0] == versao:
+                        return resposta_do_cache(request, entrada, versao, args, kwargs)
+                return await areconstruir(request, paginas, chave, tempo, versao, args, kwargs)
+            return _wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            paginas, chave, tempo = chave_da_pagina(request, args, kwargs)
+            versao = obter_versao_conteudo()
+            entrada = paginas.get(chave)
+            if atualizada(entrada, versao):
+                return resposta_do_cache(request, entrada, versao, args, kwargs)
+
+            trava = chave + ':reconstruindo'
+            if paginas.add(trava, 1, TEMPO_TRAVA_RECONSTRUCAO):
+                try:
+                    return reconstruir(request, paginas, chave, tempo, versao, args, kwargs)
+                finally:
+                    paginas.delete(trava)
+
+            if entrada is not None:
+                # Outro worker já está remontando a página: serve a que temos.
+                return resposta_do_cache(request, entrada, versao, args, kwargs)
+
+            # Ninguém tem a página ainda: espera o worker que está montando.
+            limite = time.monotonic() + ESPERA_MAXIMA_RECONSTRUCAO
+            while time.monotonic() < limite:
+                time.sleep(0.05)
+                entrada = paginas.get(chave)
+                if entrada is not None and entrada[0] == versao:
+                    return resposta_do_cache(request, entrada, versao, args, kwargs)
+            return reconstruir(request, paginas, chave, tempo, versao, args, kwargs)
+        return _wrapped_view
+    return decorator
+
+
+def condicional_por_versao(nome: str):
+    """
+    Decorator de GET condicional (ETag) baseado na versão do conteúdo.
+
+    A ETag combina o nome da view, os argumentos da URL, a query string (se houver) e a
+    versão do conteúdo, por exemplo "semente-12-1724300000000". Quando o navegador manda
+    If-None-Match ainda válido, a resposta 304 sai direto do cache, sem executar a view e
+    sem consultar o banco.
+
+    Não há Last-Modified: ele tem resolução de um segundo, e duas edições no mesmo segundo
+    fariam uma revalidação só por If-Modified-Since (comum em CDNs) receber um 304 antigo.
+    """
+    def responder(request, response, etag):
+        if request.method in ('GET', 'HEAD'):
+            response.headers.setdefault('ETag', etag)
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                etag = quote_etag(_etag(nome, request, args, kwargs, await aobter_versao_conteudo()))
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return responder(request, response, etag)
+            return _wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            etag = quote_etag(_etag(nome, request, args, kwargs, obter_versao_conteudo()))
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return responder(request, response, etag)
+        return _wrapped_view
+    return decorator
+
+
+# --- AQUECIMENTO APÓS EDIÇÕES ---
+# Funções registradas com @aquecer_apos_alteracao são chamadas logo depois que uma edição
+# de conteúdo é confirmada no banco, no próprio processo que fez a edição (o admin). Assim
+# as páginas mais acessadas já estão montadas quando o próximo visitante chegar.
+
+_aquecedores = []
+_alteracoes = threading.local()
+
+
+def aquecer_apos_alteracao(func):
+    _aquecedores.append(func)
+    return func
+
+
+def aquecer_cache() -> None:
+    for aquecedor in _aquecedores:
+        try:
+            aquecedor()
+        except Exception:
+            logger.warning('Falha ao aquecer o cache com %s', aquecedor.__name__, exc_info=True)
+
+
+def requisicao_interna(caminho: str) -> HttpRequest:
+    """
+    Requisição GET "de mentira", usada para chamar views durante o aquecimento do cache.
+    """
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = caminho
+    request.META = {'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'REQUEST_METHOD': 'GET', 'PATH_INFO': caminho}
+    return request
+
+
+def antes_do_aquecimento(func) -> None:
+    """
+    Agenda `func` para depois do commit, mas antes de as páginas serem remontadas (ex: os
+    derivados de uma imagem nova, que as páginas remontadas já devem usar). Fora de uma
+    transação, `func` roda na hora.
+    """
+    conexao = transaction.get_connection()
+    if not conexao.in_atomic_block:
+        func()
+        return
+    if not conexao.run_on_commit:
+        # Nada pendente: o que sobrou na lista é de transações desfeitas.
+        _alteracoes.antes = []
+    _alteracoes.antes = getattr(_alteracoes, 'antes', []) + [func]
+    transaction.on_commit(_executar_antes_do_aquecimento)
+
+
+def _executar_antes_do_aquecimento() -> None:
+    pendentes, _alteracoes.antes = getattr(_alteracoes, 'antes', []), []
+    for func in pendentes:
+        try:
+            func()
+        except Exception:
+            logger.warning('Falha ao executar %s após o commit', func, exc_info=True)
+
+
+def _alteracao_confirmada() -> None:
+    _executar_antes_do_aquecimento()
+    # Várias alterações na mesma transação (ex: um formulário do admin com inlines)
+    # agendam vários callbacks; só o primeiro faz o trabalho.
+    if getattr(_alteracoes, 'processadas', 0) == _alteracoes.registradas:
+        return
+    _alteracoes.processadas = _alteracoes.registradas
+    chaves, _alteracoes.chaves = _alteracoes.chaves, set()
+    # Nova versão após o commit: descarta páginas que outro worker tenha remontado
+    # durante a transação, ainda com os dados antigos.
+    incrementar_versao_conteudo()
+    aquecer_cache()
+    # Por último, com as páginas já remontadas aqui, a CDN descarta as cópias antigas.
+    purgar_na_borda(chaves)
+
+
+def registrar_alteracao_de_conteudo(chaves=(CHAVE_SITE,)) -> None:
+    """
+    Chamada pelos sinais dos modelos de conteúdo. Gera uma nova versão na hora (o próprio
+    processo já vê a mudança) e outra depois do commit, seguida do aquecimento do cache e
+    da purga na CDN das `chaves` afetadas (ver core.cdn.cache_na_borda).
+    """
+    incrementar_versao_conteudo()
+    _alteracoes.registradas = getattr(_alteracoes, 'registradas', 0) + 1
+    if not transaction.get_connection().run_on_commit or not hasattr(_alteracoes, 'chaves'):
+        # Nenhuma alteração pendente: chaves que sobraram são de transações desfeitas. (Com
+        # um antes_do_aquecimento já agendado, esta thread pode nunca ter registrado chaves.)
+        _alteracoes.chaves = set()
+    _alteracoes.chaves.update(chaves)
+    transaction.on_commit(_alteracao_confirmada)
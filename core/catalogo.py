@@ -0,0 +1,427 @@
+# core/catalogo.py
+
+import csv
+import io
+import json
+import logging
+import os
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+
+from .busca import atualizar_vetor_busca
+from .cache import antes_do_aquecimento, registrar_alteracao_de_conteudo
+from .cdn import CHAVE_SITE
+from .imagens import derivados_habilitados, gerar_derivados_da_instancia
+from .models import CaracteristicaCultivo, Semente
+
+logger = logging.getLogger(__name__)
+
+# Colunas do arquivo de catálogo, na ordem em que são exportadas. `imagem` é o caminho do
+# arquivo no storage de mídia e `caracteristicas` a lista "categoria:slug" separada por "|".
+CAMPOS_CATALOGO = (
+    'id',
+    'nome',
+    'tipo',
+    'nome_cientifico',
+    'imagem',
+    'paragrafo_descricao',
+    'origem',
+    'forma_crescimento',
+    'altura',
+    'utilizacao',
+    'digestibilidade',
+    'palatabilidade',
+    'tolerancia_seca',
+    'tolerancia_frio',
+    'proteina_bruta',
+    'producao_materia_seca',
+    'consorciacao',
+    'pragas',
+    'adubacao_formacao',
+    'aparece_na_comparacao',
+    'caracteristicas',
+)
+
+SEPARADOR_CARACTERISTICAS = '|'
+
+# Campos de texto simples, validados pelas regras do próprio modelo (tamanho, obrigatório).
+CAMPOS_TEXTO = tuple(
+    campo for campo in CAMPOS_CATALOGO if campo not in ('id', 'imagem', 'aparece_na_comparacao', 'caracteristicas')
+)
+
+# Campos que uma semente nova precisa ter preenchidos no arquivo.
+CAMPOS_OBRIGATORIOS = ('nome', 'tipo', 'nome_cientifico', 'imagem', 'paragrafo_descricao')
+
+VALORES_VERDADEIROS = {'1', 'true', 'sim', 's', 'yes', 'x'}
+VALORES_FALSOS = {'', '0', 'false', 'nao', 'não', 'n', 'no'}
+
+# Erros listados antes de a importação desistir de ler o resto do arquivo.
+MAX_ERROS_IMPORTACAO = 50
+
+# A partir desse número de sementes atualizadas, a importação purga o site inteiro na CDN
+# em vez de uma chave por semente (a Cloudflare aceita até 30 tags por chamada).
+MAX_CHAVES_PURGA = 30
+
+# Sementes lidas do banco (e enviadas ao cliente) por vez. Cada lote sai como uma parte da
+# resposta: grande o bastante para a compressão render, pequeno para não pesar na memória.
+TAMANHO_LOTE = 500
+
+FORMATOS_CATALOGO = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def linha_do_catalogo(semente: Semente) -> dict:
+    linha = {campo: getattr(semente, campo) for campo in CAMPOS_CATALOGO if campo not in ('imagem', 'caracteristicas')}
+    linha['imagem'] = semente.imagem.name or ''
+    linha['caracteristicas'] = SEPARADOR_CARACTERISTICAS.join(
+        f'{caracteristica.categoria}:{caracteristica.slug}' for caracteristica in semente.caracteristicas.all()
+    )
+    return linha
+
+
+def _lotes(sementes, tamanho_lote: int):
+    lote = []
+    for semente in sementes.prefetch_related('caracteristicas').iterator(chunk_size=tamanho_lote):
+        lote.append(linha_do_catalogo(semente))
+        if len(lote) == tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def exportar_csv(sementes=None, tamanho_lote: int = TAMANHO_LOTE):
+    """
+    Gera o catálogo em CSV, um lote de sementes por parte (para StreamingHttpResponse ou
+    para gravar em arquivo). A primeira parte é o cabeçalho.
+    """
+    sementes = Semente.objects.all() if sementes is None else sementes
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=CAMPOS_CATALOGO)
+    escritor.writeheader()
+    yield buffer.getvalue()
+    for lote in _lotes(sementes, tamanho_lote):
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows(lote)
+        yield buffer.getvalue()
+
+
+def exportar_jsonl(sementes=None, tamanho_lote: int = TAMANHO_LOTE):
+    """
+    Gera o catálogo em JSON Lines (um objeto JSON por semente, um por linha): o arquivo
+    pode ser lido e importado linha a linha, sem carregá-lo inteiro.
+    """
+    sementes = Semente.objects.all() if sementes is None else sementes
+    for lote in _lotes(sementes, tamanho_lote):
+        yield ''.join(json.dumps(linha, ensure_ascii=False) + '\n' for linha in lote)
+
+
+async def partes_em_thread(partes):
+    """
+    Percorre um dos geradores acima fora do event loop, uma parte por vez: no modo ASGI a
+    StreamingHttpResponse precisa de um iterador assíncrono para não juntar tudo na memória.
+    """
+    proxima = sync_to_async(next)
+    while (parte := await proxima(partes, None)) is not None:
+        yield parte
+
+
+EXPORTADORES = {
+    'csv': exportar_csv,
+    'jsonl': exportar_jsonl,
+}
+
+
+# --- IMPORTAÇÃO ---
+
+class ErroImportacao(Exception):
+    """
+    O arquivo tem linhas inválidas; nada foi gravado. `erros` é a lista de
+    (número da linha, mensagem).
+    """
+    def __init__(self, erros):
+        self.erros = erros
+        super().__init__('; '.join(f'linha {linha}: {mensagem}' for linha, mensagem in erros))
+
+
+def ler_csv(arquivo):
+    # A linha 1 é o cabeçalho: a primeira semente está na linha 2.
+    for numero, linha in enumerate(csv.DictReader(arquivo), start=2):
+        yield numero, linha
+
+
+def ler_jsonl(arquivo):
+    for numero, texto in enumerate(arquivo, start=1):
+        if not texto.strip():
+            continue
+        try:
+            linha = json.loads(texto)
+        except ValueError:
+            raise ErroImportacao([(numero, 'JSON inválido.')])
+        if not isinstance(linha, dict):
+            raise ErroImportacao([(numero, 'Cada linha deve ser um objeto JSON.')])
+        yield numero, linha
+
+
+LEITORES = {
+    'csv': ler_csv,
+    'jsonl': ler_jsonl,
+}
+
+
+def _texto(valor) -> str:
+    return '' if valor is None else str(valor).strip()
+
+
+def _booleano(valor) -> bool:
+    if isinstance(valor, bool):
+        return valor
+    texto = _texto(valor).lower()
+    if texto in VALORES_VERDADEIROS:
+        return True
+    if texto in VALORES_FALSOS:
+        return False
+    raise ValueError(f'"{valor}" não é sim/não.')
+
+
+class _Importacao:
+    """
+    Estado de uma importação: os índices carregados uma vez no início (sementes existentes
+    e características) e o que já foi gravado, para as contagens e o trabalho pós-commit.
+    """
+    def __init__(self, pasta_imagens):
+        self.pasta_imagens = pasta_imagens
+        self.imagem_por_pk = dict(Semente.objects.values_list('pk', 'imagem'))
+        self.pks = set(self.imagem_por_pk)
+        self.pk_por_nome = dict(Semente.objects.values_list('nome', 'pk'))
+        self.caracteristicas = {
+            f'{categoria}:{slug}': pk
+            for pk, categoria, slug in CaracteristicaCultivo.objects.values_list('pk', 'categoria', 'slug')
+        }
+        self.nomes_no_arquivo = set()
+        self.pks_no_arquivo = set()
+        self.criadas = []
+        self.atualizadas = []
+        self.imagens_enviadas = []  # nomes no storage, apagados se a importação for desfeita
+        self.com_imagem_alterada = []  # sementes que precisam dos derivados da imagem nova
+        self._no_storage = {}  # caminho -> existe no storage de mídia
+
+    def validar(self, linha: dict) -> dict:
+        """
+        Converte uma linha do arquivo nos valores a gravar, ou levanta ValidationError com
+        todas as mensagens da linha. Colunas ausentes mantêm o valor atual da semente.
+        """
+        desconhecidas = set(linha) - set(CAMPOS_CATALOGO)
+        if desconhecidas:
+            raise ValidationError(f"Colunas desconhecidas: {', '.join(sorted(map(str, desconhecidas)))}.")
+
+        mensagens = []
+        valores = {}
+        for campo in CAMPOS_TEXTO:
+            if campo in linha:
+                try:
+                    valores[campo] = Semente._meta.get_field(campo).clean(_texto(linha[campo]), None)
+                except ValidationError as erro:
+                    mensagens += [f'{campo}: {mensagem}' for mensagem in erro.messages]
+
+        pk = None
+        if _texto(linha.get('id')):
+            try:
+                pk = int(_texto(linha['id']))
+            except ValueError:
+                mensagens.append('id: deve ser um número.')
+            else:
+                if pk not in self.pks:
+                    mensagens.append(f'id: a semente {pk} não existe.')
+        nome = valores.get('nome')
+        if pk is None and nome:
+            pk = self.pk_por_nome.get(nome)
+        if nome:
+            if nome in self.nomes_no_arquivo:
+                mensagens.append(f'nome: "{nome}" aparece mais de uma vez no arquivo.')
+            self.nomes_no_arquivo.add(nome)
+        if pk is not None:
+            # Pelo id ou pelo nome: duas linhas da mesma semente, e a última venceria.
+            if pk in self.pks_no_arquivo:
+                mensagens.append(f'A semente {pk} aparece mais de uma vez no arquivo.')
+            self.pks_no_arquivo.add(pk)
+
+        if 'aparece_na_comparacao' in linha:
+            try:
+                valores['aparece_na_comparacao'] = _booleano(linha['aparece_na_comparacao'])
+            except ValueError as erro:
+                mensagens.append(f'aparece_na_comparacao: {erro}')
+
+        if 'caracteristicas' in linha:
+            codigos = [codigo.strip() for codigo in _texto(linha['caracteristicas']).split(SEPARADOR_CARACTERISTICAS) if codigo.strip()]
+            desconhecidas = [codigo for codigo in codigos if codigo not in self.caracteristicas]
+            if desconhecidas:
+                mensagens.append(f"caracteristicas: não existem {', '.join(desconhecidas)}.")
+            valores['caracteristicas'] = [self.caracteristicas[codigo] for codigo in codigos if codigo in self.caracteristicas]
+
+        imagem = _texto(linha.get('imagem'))
+        if imagem:
+            arquivo_local = self.pasta_imagens and os.path.join(self.pasta_imagens, os.path.basename(imagem))
+            if arquivo_local and os.path.isfile(arquivo_local):
+                valores['arquivo_imagem'] = arquivo_local
+            elif imagem == self.imagem_por_pk.get(pk) or self.existe_no_storage(imagem):
+                valores['imagem'] = imagem
+            else:
+                mensagens.append(f'imagem: "{imagem}" não existe no storage de mídia nem na pasta de imagens.')
+
+        if pk is None:
+            # Campos presentes mas vazios já têm a mensagem da validação acima.
+            faltando = [
+                campo for campo in CAMPOS_OBRIGATORIOS
+                if (campo == 'imagem' and not imagem) or (campo != 'imagem' and campo not in linha)
+            ]
+            if faltando:
+                mensagens.append(f"Semente nova sem {', '.join(faltando)}.")
+
+        if mensagens:
+            raise ValidationError(mensagens)
+        valores['pk'] = pk
+        return valores
+
+    def existe_no_storage(self, nome: str) -> bool:
+        # Uma consulta ao storage (no GCS, uma chamada de rede) por caminho, mesmo que
+        # várias linhas usem a mesma imagem.
+        if nome not in self._no_storage:
+            self._no_storage[nome] = Semente._meta.get_field('imagem').storage.exists(nome)
+        return self._no_storage[nome]
+
+    def gravar(self, lote: list) -> None:
+        """
+        Grava um lote de linhas já validadas: um bulk_create para as sementes novas, um
+        bulk_update para as existentes e um insert para as características. Os sinais de
+        post_save não disparam; o que eles fariam é feito aqui, uma vez por lote.
+        """
+        existentes = Semente.objects.in_bulk([valores['pk'] for valores in lote if valores['pk'] is not None])
+        novas, alteradas, campos_alterados, caracteristicas = [], [], set(), []
+        for valores in lote:
+            semente = existentes[valores['pk']] if valores['pk'] is not None else Semente()
+            imagem_anterior = semente.imagem.name
+            for campo, valor in valores.items():
+                if campo in CAMPOS_TEXTO or campo in ('imagem', 'aparece_na_comparacao'):
+                    setattr(semente, campo, valor)
+                    campos_alterados.add(campo)
+            if 'arquivo_imagem' in valores:
+                campo_imagem = Semente._meta.get_field('imagem')
+                with open(valores['arquivo_imagem'], 'rb') as arquivo:
+                    nome = campo_imagem.storage.save(
+                        campo_imagem.generate_filename(semente, os.path.basename(valores['arquivo_imagem'])), File(arquivo),
+                    )
+                self.imagens_enviadas.append(nome)
+                semente.imagem = nome
+                campos_alterados.add('imagem')
+                self.com_imagem_alterada.append((semente, True))
+            elif semente.imagem.name != imagem_anterior:
+                self.com_imagem_alterada.append((semente, False))
+            semente.preencher_campos_busca()
+            (alteradas if semente.pk else novas).append(semente)
+            if 'caracteristicas' in valores:
+                caracteristicas.append((semente, valores['caracteristicas']))
+
+        Semente.objects.bulk_create(novas)
+        if alteradas and campos_alterados:
+            Semente.objects.bulk_update(alteradas, [*campos_alterados, 'busca_principal', 'busca_texto'])
+        for semente in novas:
+            self.pks.add(semente.pk)
+            self.pk_por_nome[semente.nome] = semente.pk
+
+        if caracteristicas:
+            Relacao = Semente.caracteristicas.through
+            Relacao.objects.filter(semente_id__in=[semente.pk for semente, _ in caracteristicas]).delete()
+            Relacao.objects.bulk_create(
+                Relacao(semente_id=semente.pk, caracteristicacultivo_id=pk)
+                for semente, pks in caracteristicas
+                for pk in pks
+            )
+
+        atualizar_vetor_busca([semente.pk for semente in novas + alteradas])
+        self.criadas += [semente.pk for semente in novas]
+        self.atualizadas += [semente.pk for semente in alteradas]
+
+    def apagar_imagens_enviadas(self) -> None:
+        storage = Semente._meta.get_field('imagem').storage
+        for nome in self.imagens_enviadas:
+            storage.delete(nome)
+
+    def gerar_derivados(self) -> None:
+        # Imagens enviadas agora são sempre regeradas (o arquivo pode ter o nome de um
+        # anterior); caminhos que já existiam no storage só se ainda não tiverem derivados.
+        if derivados_habilitados():
+            for semente, enviada in self.com_imagem_alterada:
+                gerar_derivados_da_instancia(semente, campos_novos=('imagem',) if enviada else ())
+
+    def chaves_alteradas(self) -> tuple:
+        # As mesmas chaves que os sinais registrariam (core.cdn.chaves_do_objeto); as
+        # sementes novas ainda não têm página própria na CDN.
+        if len(self.atualizadas) >= MAX_CHAVES_PURGA:
+            return (CHAVE_SITE,)
+        return ('sementes', *(f'semente-{pk}' for pk in self.atualizadas))
+
+
+def importar_catalogo(arquivo, formato: str = 'csv', pasta_imagens=None, tamanho_lote: int = TAMANHO_LOTE,
+                      simular: bool = False) -> dict:
+    """
+    Importa um arquivo de catálogo (texto, em CSV ou JSON Lines, com as colunas de
+    CAMPOS_CATALOGO) criando as sementes novas e atualizando as existentes, reconhecidas
+    pelo `id` ou, sem ele, pelo `nome`. Sementes que não estão no arquivo ficam como estão.
+
+    O arquivo é lido e validado linha a linha, e gravado em lotes de `tamanho_lote`, tudo
+    em uma única transação: se alguma linha for inválida, nada é gravado e ErroImportacao
+    traz os erros de todas elas. Com `simular=True`, valida e grava, mas desfaz no fim.
+
+    Com `pasta_imagens`, a imagem de cada linha é procurada nessa pasta (pelo nome do
+    arquivo) e enviada ao storage de mídia; sem arquivo local, a coluna `imagem` é tomada
+    como um caminho que já existe no storage (linhas com caminhos inexistentes são erros).
+    As sementes cuja imagem mudou ganham os derivados (core.imagens) depois do commit.
+
+    O cache e a CDN são invalidados uma única vez no fim, e não uma vez por semente.
+    Retorna {'criadas': n, 'atualizadas': n, 'imagens': n}.
+    """
+    importacao = _Importacao(pasta_imagens)
+    erros = []
+    try:
+        with transaction.atomic():
+            lote = []
+            for numero, linha in LEITORES[formato](arquivo):
+                try:
+                    lote.append(importacao.validar(linha))
+                except ValidationError as erro:
+                    erros += [(numero, mensagem) for mensagem in erro.messages]
+                    if len(erros) >= MAX_ERROS_IMPORTACAO:
+                        break
+                # Depois do primeiro erro, as linhas seguintes só são validadas.
+                if erros:
+                    lote = []
+                elif len(lote) >= tamanho_lote:
+                    importacao.gravar(lote)
+                    lote = []
+            if erros:
+                raise ErroImportacao(erros)
+            if lote:
+                importacao.gravar(lote)
+            if simular:
+                transaction.set_rollback(True)
+            elif importacao.criadas or importacao.atualizadas:
+                # Os derivados precisam existir antes de as páginas serem remontadas.
+                antes_do_aquecimento(importacao.gerar_derivados)
+                registrar_alteracao_de_conteudo(importacao.chaves_alteradas())
+    except Exception:
+        importacao.apagar_imagens_enviadas()
+        raise
+    if simular:
+        importacao.apagar_imagens_enviadas()
+    return {
+        'criadas': len(importacao.criadas),
+        'atualizadas': len(importacao.atualizadas),
+        'imagens': len(importacao.imagens_enviadas),
+    }
@@ -0,0 +1,162 @@
+# core/cdn.py
+
+import functools
+import logging
+import threading
+from functools import wraps
+
+import requests
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Chave presente em todas as respostas cacheáveis: purgá-la limpa o site inteiro da CDN
+# (ex: depois de um deploy que muda os templates).
+CHAVE_SITE = 'site'
+
+
+# --- POLÍTICA DE CACHE POR VIEW ---
+
+def cache_na_borda(*chaves, s_maxage=None, stale_while_revalidate=None, stale_if_error=None):
+    """
+    Decorator que permite à CDN guardar a resposta e diz de que conteúdo ela depende:
+
+    - Cache-Control: o navegador sempre revalida (max-age=0, com a ETag do
+      condicional_por_versao); a CDN guarda por `s_maxage` segundos e, depois disso, ainda
+      serve a cópia antiga por `stale_while_revalidate` segundos enquanto busca a nova, ou
+      por `stale_if_error` se o site estiver fora do ar;
+    - Surrogate-Key (Fastly) e Cache-Tag (Cloudflare): as `chaves` de conteúdo da resposta,
+      mais CHAVE_SITE. Aceitam os argumentos da URL, ex: 'semente-{semente_id}'.
+
+    Só respostas 200 e 304 de GET/HEAD recebem esses cabeçalhos. Os tempos não informados
+    vêm de settings (CDN_S_MAXAGE etc.). Quando o conteúdo muda, as chaves afetadas são
+    purgadas da CDN (ver purgar_na_borda).
+    """
+    def cabecalhos(request, response, kwargs):
+        if request.method not in ('GET', 'HEAD') or response.status_code not in (200, 304):
+            return response
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=0,
+            s_maxage=settings.CDN_S_MAXAGE if s_maxage is None else s_maxage,
+            stale_while_revalidate=(
+                settings.CDN_STALE_WHILE_REVALIDATE if stale_while_revalidate is None else stale_while_revalidate
+            ),
+            stale_if_error=settings.CDN_STALE_IF_ERROR if stale_if_error is None else stale_if_error,
+        )
+        nomes = [chave.format(**kwargs) for chave in chaves] + [CHAVE_SITE]
+        response['Surrogate-Key'] = ' '.join(nomes)
+        response['Cache-Tag'] = ','.join(nomes)
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                return cabecalhos(request, await view_func(request, *args, **kwargs), kwargs)
+            return _wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            return cabecalhos(request, view_func(request, *args, **kwargs), kwargs)
+        return _wrapped_view
+    return decorator
+
+
+def chaves_do_objeto(instance) -> tuple:
+    """
+    Chaves das respostas que mostram `instance` (um objeto de MODELOS_DE_CONTEUDO).
+    Sementes aparecem na home e nas APIs; características, em todas as respostas de
+    sementes; o resto do conteúdo (textos, slides, FAQ, configurações...) só na home.
+    """
+    from .models import CaracteristicaCultivo, Semente
+
+    if isinstance(instance, Semente):
+        return (f'semente-{instance.pk}', 'sementes')
+    if isinstance(instance, CaracteristicaCultivo):
+        return ('caracteristicas',)
+    return ('home',)
+
+
+# --- PURGADORES ---
+# Cada purgador recebe as chaves alteradas e pede à CDN para descartar as respostas que
+# as contêm. Se algo der errado, deve levantar uma exceção (registrada no log).
+
+class NenhumPurgador:
+    """
+    Sem CDN na frente do site: não faz nada.
+    """
+    def purgar(self, chaves: list) -> None:
+        pass
+
+
+class RegistroPurgador:
+    """
+    Guarda as chaves de cada purga em `purgados`, sem chamar nenhuma CDN. Para testes.
+    """
+    def __init__(self):
+        self.purgados = []
+        self._lock = threading.Lock()
+
+    def purgar(self, chaves: list) -> None:
+        with self._lock:
+            self.purgados.append(list(chaves))
+
+
+class CloudflarePurgador:
+    """
+    Purga por Cache-Tag na Cloudflare (CDN_CLOUDFLARE_ZONA e CDN_CLOUDFLARE_TOKEN).
+    """
+    def __init__(self):
+        self.sessao = requests.Session()
+
+    def purgar(self, chaves: list) -> None:
+        resposta = self.sessao.post(
+            f'https://api.cloudflare.com/client/v4/zones/{settings.CDN_CLOUDFLARE_ZONA}/purge_cache',
+            headers={'Authorization': f'Bearer {settings.CDN_CLOUDFLARE_TOKEN}'},
+            json={'tags': list(chaves)},
+            timeout=10,
+        )
+        resposta.raise_for_status()
+
+
+class FastlyPurgador:
+    """
+    Purga por Surrogate-Key na Fastly (CDN_FASTLY_SERVICO e CDN_FASTLY_TOKEN), com soft
+    purge: a cópia antiga ainda pode ser servida pelo stale-while-revalidate.
+    """
+    def __init__(self):
+        self.sessao = requests.Session()
+
+    def purgar(self, chaves: list) -> None:
+        resposta = self.sessao.post(
+            f'https://api.fastly.com/service/{settings.CDN_FASTLY_SERVICO}/purge',
+            headers={'Fastly-Key': settings.CDN_FASTLY_TOKEN, 'Surrogate-Key': ' '.join(chaves), 'Fastly-Soft-Purge': '1'},
+            timeout=10,
+        )
+        resposta.raise_for_status()
+
+
+@functools.cache
+def obter_purgador():
+    return import_string(settings.CDN_PURGADOR)()
+
+
+def purgar_na_borda(chaves) -> bool:
+    """
+    Purga as `chaves` da CDN. Uma falha não interrompe quem chamou (a edição já foi
+    salva): fica no log, e as respostas antigas expiram sozinhas em CDN_S_MAXAGE.
+    """
+    chaves = sorted(set(chaves))
+    if not chaves:
+        return True
+    try:
+        obter_purgador().purgar(chaves)
+    except Exception:
+        logger.warning('Falha ao purgar a CDN: %s', chaves, exc_info=True)
+        return False
+    return True
@@ -0,0 +1,68 @@
+# core/comparacao.py
+
+from django.utils.text import capfirst
+
+from .models import Semente
+from .serializers import serializar_semente
+
+# Linhas da tabela "Compare Nossas Soluções" da home: (campo da semente, rótulo).
+ATRIBUTOS_COMPARACAO = (
+    ('tolerancia_seca', 'Tolerância à Seca'),
+    ('proteina_bruta', 'Proteína Bruta'),
+    ('producao_materia_seca', 'Produção Matéria Seca'),
+    ('utilizacao', 'Uso Principal'),
+    ('pragas', 'Resistência a Pragas'),
+)
+
+# Campos que podem ser comparados pela API (?atributos=...).
+CAMPOS_COMPARAVEIS = (
+    'origem',
+    'forma_crescimento',
+    'altura',
+    'utilizacao',
+    'digestibilidade',
+    'palatabilidade',
+    'tolerancia_seca',
+    'tolerancia_frio',
+    'proteina_bruta',
+    'producao_materia_seca',
+    'consorciacao',
+    'pragas',
+    'adubacao_formacao',
+)
+
+# Máximo de sementes lado a lado em uma comparação pela API.
+MAX_SEMENTES_COMPARACAO = 6
+
+
+def atributos_por_campo(campos) -> tuple:
+    """
+    Monta a lista de atributos (campo, rótulo) a partir de nomes de campos. Usa o rótulo
+    da tabela da home quando existe e, senão, o verbose_name do modelo. Levanta KeyError
+    para campos que não podem ser comparados.
+    """
+    rotulos = dict(ATRIBUTOS_COMPARACAO)
+    atributos = []
+    for campo in campos:
+        if campo not in CAMPOS_COMPARAVEIS:
+            raise KeyError(campo)
+        atributos.append((campo, rotulos.get(campo) or capfirst(Semente._meta.get_field(campo).verbose_name)))
+    return tuple(atributos)
+
+
+def montar_matriz(sementes, atributos=ATRIBUTOS_COMPARACAO) -> dict:
+    """
+    Monta a tabela de comparação já no formato de exibição: uma coluna por semente e uma
+    linha por atributo, com os valores na mesma ordem das colunas.
+
+    {'sementes': [{'id', 'nome', 'imagem_url'}, ...],
+     'linhas': [{'campo', 'rotulo', 'valores': [...]}, ...]}
+    """
+    sementes = list(sementes)
+    return {
+        'sementes': [serializar_semente(semente, ('id', 'nome', 'imagem_url')) for semente in sementes],
+        'linhas': [
+            {'campo': campo, 'rotulo': rotulo, 'valores': [getattr(semente, campo) for semente in sementes]}
+            for campo, rotulo in atributos
+        ],
+    }
@@ -0,0 +1,120 @@
+# core/compressao.py
+
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Opcional: sem o pacote 'brotli' as respostas saem só em gzip.
+    brotli = None
+
+# Respostas menores que isso não compensam o cabeçalho e o custo da compressão.
+TAMANHO_MINIMO = 200
+
+# Tipos de conteúdo comprimidos; imagens e fontes já vêm comprimidas.
+TIPOS_COMPRIMIVEIS = (
+    'text/',
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+# Níveis usados em cada requisição (rápidos) e nas versões guardadas no cache junto com a
+# página, comprimidas uma vez por versão do conteúdo (mais lentos, arquivos menores).
+NIVEL_GZIP = 6
+QUALIDADE_BROTLI = 5
+NIVEL_GZIP_CACHE = 9
+QUALIDADE_BROTLI_CACHE = 9
+
+
+def codificacoes_disponiveis() -> tuple:
+    # Da preferida para a menos preferida.
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def comprimivel(content_type: str) -> bool:
+    return content_type.split(';')[0].strip().lower().startswith(TIPOS_COMPRIMIVEIS)
+
+
+def escolher_codificacao(accept_encoding: str, disponiveis=None):
+    """
+    A melhor codificação aceita pelo cliente (cabeçalho Accept-Encoding, com os pesos q=),
+    ou None se ele não aceita nenhuma das `disponiveis` (por padrão, as que este processo
+    sabe comprimir; em ordem de preferência).
+    """
+    pesos = {}
+    for parte in accept_encoding.split(','):
+        nome, _, parametros = parte.partition(';')
+        peso = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith('q='):
+            try:
+                peso = float(parametros[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nome.strip().lower()] = peso
+    if disponiveis is None:
+        disponiveis = codificacoes_disponiveis()
+    disponiveis = [nome for nome in disponiveis if pesos.get(nome, pesos.get('*', 0)) > 0]
+    return max(disponiveis, key=lambda nome: pesos.get(nome, pesos.get('*', 0)), default=None)
+
+
+def comprimir(conteudo: bytes, codificacao: str, para_cache: bool = False) -> bytes:
+    if codificacao == 'br':
+        return brotli.compress(conteudo, quality=QUALIDADE_BROTLI_CACHE if para_cache else QUALIDADE_BROTLI)
+    return gzip.compress(conteudo, compresslevel=NIVEL_GZIP_CACHE if para_cache else NIVEL_GZIP, mtime=0)
+
+
+def versoes_comprimidas(conteudo: bytes, content_type: str) -> dict:
+    """
+    Todas as versões comprimidas de uma resposta que vai para o cache: {codificação: bytes}.
+    Vazio se o tipo não é comprimível ou o conteúdo é pequeno demais.
+    """
+    if len(conteudo) < TAMANHO_MINIMO or not comprimivel(content_type):
+        return {}
+    return {codificacao: comprimir(conteudo, codificacao, para_cache=True) for codificacao in codificacoes_disponiveis()}
+
+
+class _Compressor:
+    """
+    Comprime uma resposta em partes (StreamingHttpResponse): cada parte recebida sai
+    comprimida assim que possível, sem juntar o conteúdo inteiro na memória.
+    """
+    def __init__(self, codificacao: str):
+        if codificacao == 'br':
+            self._brotli = brotli.Compressor(quality=QUALIDADE_BROTLI)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def parte(self, dados) -> bytes:
+        if isinstance(dados, str):
+            dados = dados.encode()
+        if self._brotli is not None:
+            return self._brotli.process(dados) + self._brotli.flush()
+        return self._zlib.compress(dados) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def fim(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def comprimir_partes(partes, codificacao: str):
+    compressor = _Compressor(codificacao)
+    for dados in partes:
+        comprimido = compressor.parte(dados)
+        if comprimido:
+            yield comprimido
+    yield compressor.fim()
+
+
+async def acomprimir_partes(partes, codificacao: str):
+    compressor = _Compressor(codificacao)
+    async for dados in partes:
+        comprimido = compressor.parte(dados)
+        if comprimido:
+            yield comprimido
+    yield compressor.fim()
@@ -0,0 +1,32 @@
+# core/conteudo.py
+
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from .cache import em_memoria_por_versao
+from .models import ConfiguracoesGerais, ConteudoTexto
+
+# Tempo máximo (em segundos) que os textos e as configurações ficam na memória do processo,
+# mesmo sem nenhuma edição no admin.
+TEMPO_MAXIMO_EM_MEMORIA = 60 * 5
+
+
+@em_memoria_por_versao(ttl=TEMPO_MAXIMO_EM_MEMORIA)
+def obter_textos() -> Mapping[str, str]:
+    """
+    Todos os textos editáveis do site ({chave: valor}), guardados na memória do processo
+    até a próxima edição no admin. O dict retornado é compartilhado e somente leitura.
+    """
+    return MappingProxyType(dict(ConteudoTexto.objects.values_list('chave', 'valor')))
+
+
+@em_memoria_por_versao(ttl=TEMPO_MAXIMO_EM_MEMORIA)
+def obter_configuracoes() -> Optional[ConfiguracoesGerais]:
+    """
+    As Configurações Gerais do site (com as imagens do "Sobre Nós" já carregadas), ou None
+    se ainda não foram cadastradas. Guardadas na memória do processo até a próxima edição.
+    """
+    try:
+        return ConfiguracoesGerais.objects.prefetch_related('imagens_sobre_nos').get()
+    except ConfiguracoesGerais.DoesNotExist:
+        return None
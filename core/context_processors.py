@@ -0,0 +1,16 @@
+# core/context_processors.py
+
+from django.utils.functional import SimpleLazyObject
+
+from .conteudo import obter_configuracoes, obter_textos
+
+
+def conteudo_do_site(request) -> dict:
+    """
+    Disponibiliza `textos` e `config` em todos os templates. Os valores só são buscados se
+    o template os usar (páginas do admin, por exemplo, não usam).
+    """
+    return {
+        'textos': SimpleLazyObject(obter_textos),
+        'config': SimpleLazyObject(obter_configuracoes),
+    }
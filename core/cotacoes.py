@@ -0,0 +1,141 @@
+# core/cotacoes.py
+
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import send_mail
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import SolicitacaoCotacao
+
+logger = logging.getLogger(__name__)
+
+# Quantas vezes uma solicitação é tentada antes de ser marcada como "falhou".
+MAX_TENTATIVAS = 8
+
+# Espera entre tentativas: 30s, 1min, 2min, 4min... limitada a 1 hora.
+ESPERA_INICIAL = timedelta(seconds=30)
+ESPERA_MAXIMA = timedelta(hours=1)
+
+# Tempo em que uma solicitação fica "reservada" para o worker que a pegou. Se o worker
+# morrer no meio do envio, ela volta para a fila depois desse prazo.
+RESERVA = timedelta(minutes=5)
+
+
+# --- BACKENDS DE ENVIO ---
+# Cada backend recebe uma solicitação e a entrega para a equipe comercial.
+# Se algo der errado, o backend deve levantar uma exceção: a solicitação volta para a fila.
+
+class ConsoleBackend:
+    """
+    Imprime a solicitação no console (comportamento original do site).
+    """
+    def enviar(self, solicitacao: SolicitacaoCotacao) -> None:
+        print("--- NOVA SOLICITAÇÃO DE COTAÇÃO ---")
+        print(f"Nome: {solicitacao.nome}")
+        print(f"Contato: {solicitacao.contato}")
+        print(f"Produto: {solicitacao.produto}")
+        print(f"Mensagem: {solicitacao.mensagem}")
+        print("------------------------------------")
+
+
+class ArquivoBackend:
+    """
+    Grava cada solicitação como uma linha JSON em COTACAO_ARQUIVO. Útil em testes e em desenvolvimento.
+    """
+    def enviar(self, solicitacao: SolicitacaoCotacao) -> None:
+        linha = {
+            'id': solicitacao.pk,
+            'nome': solicitacao.nome,
+            'contato': solicitacao.contato,
+            'produto': solicitacao.produto,
+            'mensagem': solicitacao.mensagem,
+            'criada_em': solicitacao.criada_em.isoformat(),
+        }
+        with open(settings.COTACAO_ARQUIVO, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps(linha, ensure_ascii=False) + '\n')
+
+
+class EmailBackend:
+    """
+    Envia a solicitação por e-mail para COTACAO_EMAIL_DESTINO, usando o EMAIL_BACKEND do Django.
+    Sem destino configurado, recusa-se a ser criado: as solicitações ficariam na fila até falhar.
+    """
+    def __init__(self):
+        if not settings.COTACAO_EMAIL_DESTINO:
+            raise ImproperlyConfigured('COTACAO_BACKEND é o EmailBackend, mas COTACAO_EMAIL_DESTINO está vazio.')
+
+    def enviar(self, solicitacao: SolicitacaoCotacao) -> None:
+        send_mail(
+            subject=f"Nova solicitação de cotação - {solicitacao.nome}",
+            message=(
+                f"Nome: {solicitacao.nome}\n"
+                f"Contato: {solicitacao.contato}\n"
+                f"Produto: {solicitacao.produto}\n"
+                f"Mensagem: {solicitacao.mensagem}\n"
+            ),
+            from_email=None,
+            recipient_list=[settings.COTACAO_EMAIL_DESTINO],
+        )
+
+
+def obter_backend():
+    return import_string(settings.COTACAO_BACKEND)()
+
+
+# --- FILA ---
+
+def calcular_espera(tentativas: int) -> timedelta:
+    return min(ESPERA_INICIAL * (2 ** (tentativas - 1)), ESPERA_MAXIMA)
+
+
+def reservar_lote(tamanho: int) -> list:
+    """
+    Pega até `tamanho` solicitações pendentes cuja hora de tentar já chegou.
+
+    No PostgreSQL, o SELECT ... FOR UPDATE SKIP LOCKED garante que dois workers nunca
+    peguem a mesma solicitação; a reserva é gravada antes do envio, fora da transação,
+    para que uma entrega lenta não segure o lock.
+    """
+    agora = timezone.now()
+    with transaction.atomic():
+        lote = list(
+            SolicitacaoCotacao.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=SolicitacaoCotacao.Status.PENDENTE, proxima_tentativa_em__lte=agora)
+            .order_by('proxima_tentativa_em')[:tamanho]
+        )
+        SolicitacaoCotacao.objects.filter(pk__in=[s.pk for s in lote]).update(proxima_tentativa_em=agora + RESERVA)
+    return lote
+
+
+def processar_lote(tamanho: int = 20, backend=None) -> tuple:
+    """
+    Envia um lote de solicitações pendentes. Retorna (enviadas, com_erro).
+    """
+    backend = backend or obter_backend()
+    enviadas = com_erro = 0
+    for solicitacao in reservar_lote(tamanho):
+        solicitacao.tentativas += 1
+        try:
+            backend.enviar(solicitacao)
+        except Exception as erro:
+            com_erro += 1
+            logger.warning('Falha ao enviar a cotação %s (tentativa %s)', solicitacao.pk, solicitacao.tentativas, exc_info=True)
+            solicitacao.ultimo_erro = f'{type(erro).__name__}: {erro}'
+            if solicitacao.tentativas >= MAX_TENTATIVAS:
+                solicitacao.status = SolicitacaoCotacao.Status.FALHOU
+            else:
+                solicitacao.proxima_tentativa_em = timezone.now() + calcular_espera(solicitacao.tentativas)
+        else:
+            enviadas += 1
+            solicitacao.status = SolicitacaoCotacao.Status.ENVIADA
+            solicitacao.enviada_em = timezone.now()
+            solicitacao.ultimo_erro = ''
+        solicitacao.save(update_fields=['tentativas', 'status', 'proxima_tentativa_em', 'enviada_em', 'ultimo_erro'])
+    return enviadas, com_erro
@@ -0,0 +1,98 @@
+# core/desempenho.py
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates, Template
+
+# Quantas consultas SQL de cada requisição são guardadas para o log de requisições lentas.
+MAX_CONSULTAS_AMOSTRA = 50
+
+
+class Metricas:
+    """
+    Tempos acumulados de uma requisição, por categoria ('db', 'template', 'storage').
+    """
+    __slots__ = ('inicio', 'tempos', 'contagens', 'consultas')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.tempos = defaultdict(float)  # categoria -> segundos
+        self.contagens = defaultdict(int)  # categoria -> chamadas
+        self.consultas = []  # (sql, milissegundos), até MAX_CONSULTAS_AMOSTRA
+
+    def registrar(self, categoria: str, duracao: float) -> None:
+        self.tempos[categoria] += duracao
+        self.contagens[categoria] += 1
+
+    def total(self) -> float:
+        return time.perf_counter() - self.inicio
+
+
+# Métricas da requisição atual (definidas pelo ServerTimingMiddleware). Fora de uma
+# requisição (comandos, worker de cotações) é None e nada é medido.
+metricas_atuais = ContextVar('metricas_atuais', default=None)
+
+
+@contextmanager
+def medir(categoria: str):
+    """
+    Soma o tempo do bloco à categoria indicada nas métricas da requisição atual.
+    """
+    metricas = metricas_atuais.get()
+    if metricas is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        metricas.registrar(categoria, time.perf_counter() - inicio)
+
+
+def medir_consulta(execute, sql, params, many, context):
+    """
+    Wrapper de execução do banco (connection.execute_wrapper) que mede cada consulta.
+    """
+    metricas = metricas_atuais.get()
+    if metricas is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duracao = time.perf_counter() - inicio
+        metricas.registrar('db', duracao)
+        if len(metricas.consultas) < MAX_CONSULTAS_AMOSTRA:
+            metricas.consultas.append((sql, round(duracao * 1000, 2)))
+
+
+def instrumentar_conexao(sender, connection, **kwargs):
+    """
+    Receptor do sinal connection_created: instala medir_consulta em cada conexão aberta.
+    No modo ASGI o ORM assíncrono consulta o banco a partir de outras threads, cada uma
+    com a sua conexão, então o wrapper não pode ser instalado só pelo middleware.
+    """
+    if medir_consulta not in connection.execute_wrappers:
+        # No início da lista: connection.execute_wrapper() remove sempre o último wrapper.
+        connection.execute_wrappers.insert(0, medir_consulta)
+
+
+# --- TEMPLATES ---
+# Backend de templates igual ao padrão do Django, mas que mede o tempo de renderização.
+# Só o template principal é medido: os {% include %} já estão dentro desse tempo.
+
+class TemplateMedido(Template):
+    def render(self, context=None, request=None):
+        with medir('template'):
+            return super().render(context, request)
+
+
+class DjangoTemplatesMedido(DjangoTemplates):
+    def from_string(self, template_code):
+        return TemplateMedido(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TemplateMedido(super().get_template(template_name).template, self)
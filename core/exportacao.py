@@ -0,0 +1,208 @@
+# core/exportacao.py
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import reverse
+from django.utils.http import parse_etags, quote_etag
+
+try:
+    import brotli
+except ImportError:  # Opcional: sem o pacote 'brotli' só a versão gzip é gerada.
+    brotli = None
+
+from .cache import requisicao_interna
+from .compressao import escolher_codificacao
+
+MANIFESTO = 'manifest.json'
+
+# Quantas versões antigas da home ficam no disco (para quem ainda tem a página anterior
+# aberta ou em um cache intermediário).
+VERSOES_MANTIDAS = 2
+
+# Codificações geradas, da preferida para a menos preferida: (nome no Accept-Encoding, extensão).
+CODIFICACOES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def pasta_exportacao() -> Path:
+    return Path(settings.EXPORTACAO_DIR)
+
+
+def comprimir(conteudo: bytes) -> dict:
+    """
+    Versões comprimidas do conteúdo: {extensão: bytes}.
+    """
+    versoes = {'.gz': gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        versoes['.br'] = brotli.compress(conteudo, quality=11)
+    return versoes
+
+
+def _gravar(caminho: Path, conteudo: bytes) -> None:
+    # Grava em um arquivo temporário e troca de uma vez: quem estiver lendo nunca vê um
+    # arquivo pela metade.
+    descritor, temporario = tempfile.mkstemp(dir=caminho.parent, prefix='.tmp-')
+    with os.fdopen(descritor, 'wb') as arquivo:
+        arquivo.write(conteudo)
+    os.chmod(temporario, 0o644)
+    os.replace(temporario, caminho)
+
+
+def exportar_home(destino=None) -> dict:
+    """
+    Renderiza a home e grava na pasta de exportação (settings.EXPORTACAO_DIR):
+
+    - home-<hash>.html, com .gz e .br: nome com a impressão digital do conteúdo, que pode
+      ser servido com cache "para sempre";
+    - index.html, com .gz e .br: o mesmo conteúdo, para hosts estáticos que servem a raiz;
+    - manifest.json: o arquivo atual, a versão do conteúdo e a data da exportação.
+
+    As seções carregadas sob demanda (core.views.FRAGMENTOS_DA_HOME) vão embutidas no HTML:
+    a página exportada funciona sozinha em qualquer host estático, sem /fragmentos/.
+
+    Retorna o manifesto. Se o conteúdo não mudou desde a última exportação, nada é regravado.
+    """
+    from .views import index_view
+
+    pasta = Path(destino) if destino else pasta_exportacao()
+    pasta.mkdir(parents=True, exist_ok=True)
+
+    response = async_to_sync(index_view)(requisicao_interna('/'))
+    if response.status_code != 200:
+        raise RuntimeError(f'A home respondeu com status {response.status_code}.')
+    conteudo = embutir_fragmentos(response.content)
+    impressao = hashlib.sha256(conteudo).hexdigest()[:12]
+    arquivo = f'home-{impressao}.html'
+
+    anterior = ler_manifesto(pasta)
+    if anterior and anterior['hash'] == impressao and (pasta / arquivo).exists():
+        return anterior
+
+    comprimidos = comprimir(conteudo)
+    for nome in (arquivo, 'index.html'):
+        _gravar(pasta / nome, conteudo)
+        for extensao, dados in comprimidos.items():
+            _gravar(pasta / f'{nome}{extensao}', dados)
+
+    manifesto = {
+        'arquivo': arquivo,
+        'hash': impressao,
+        'versao': response.get('ETag', '').strip('"'),
+        'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'codificacoes': sorted(comprimidos),
+    }
+    _gravar(pasta / MANIFESTO, json.dumps(manifesto, ensure_ascii=False, indent=2).encode())
+    _remover_versoes_antigas(pasta)
+    return manifesto
+
+
+def embutir_fragmentos(conteudo: bytes) -> bytes:
+    """
+    Troca cada seção vazia da home (<section ... data-fragmento="/fragmentos/x/">) pelo
+    HTML do fragmento. Sem o data-fragmento, o JavaScript da página não busca a seção.
+    """
+    from .views import FRAGMENTOS_DA_HOME, fragmento_view
+
+    for nome in FRAGMENTOS_DA_HOME:
+        url = reverse('fragmento', args=[nome])
+        response = async_to_sync(fragmento_view)(requisicao_interna(url), nome=nome)
+        if response.status_code != 200:
+            raise RuntimeError(f'O fragmento {nome} respondeu com status {response.status_code}.')
+        vazia = f' data-fragmento="{url}"></section>'.encode()
+        if vazia not in conteudo:
+            raise RuntimeError(f'A seção do fragmento {nome} não foi encontrada na home.')
+        conteudo = conteudo.replace(vazia, b'>' + response.content + b'</section>')
+    return conteudo
+
+
+def _remover_versoes_antigas(pasta: Path) -> None:
+    versoes = sorted(pasta.glob('home-*.html'), key=lambda caminho: caminho.stat().st_mtime, reverse=True)
+    for antiga in versoes[VERSOES_MANTIDAS:]:
+        for caminho in (antiga, *(Path(f'{antiga}{extensao}') for _, extensao in CODIFICACOES)):
+            caminho.unlink(missing_ok=True)
+
+
+def ler_manifesto(pasta=None):
+    try:
+        return json.loads(((pasta or pasta_exportacao()) / MANIFESTO).read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+# Home exportada guardada na memória do processo: (mtime do manifesto, hash, {extensão: bytes}).
+_exportada = None
+
+
+def _carregar_exportada():
+    """
+    Lê a home exportada do disco só quando o manifesto muda (um os.stat por requisição).
+    Retorna None enquanto nada foi exportado.
+    """
+    global _exportada
+    caminho = pasta_exportacao() / MANIFESTO
+    try:
+        modificado = caminho.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    atual = _exportada
+    if atual is not None and atual[0] == modificado:
+        return atual
+    manifesto = ler_manifesto()
+    if manifesto is None:
+        return None
+    pasta = pasta_exportacao()
+    try:
+        versoes = {'': (pasta / manifesto['arquivo']).read_bytes()}
+    except FileNotFoundError:
+        return None
+    for _, extensao in CODIFICACOES:
+        comprimido = pasta / f"{manifesto['arquivo']}{extensao}"
+        if comprimido.exists():
+            versoes[extensao] = comprimido.read_bytes()
+    _exportada = (modificado, manifesto['hash'], versoes)
+    return _exportada
+
+
+def resposta_exportada(request, exportada) -> HttpResponse:
+    _, impressao, versoes = exportada
+    etag = quote_etag(f'home-{impressao}')
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    extensoes = {nome: extensao for nome, extensao in CODIFICACOES if extensao in versoes}
+    codificacao = escolher_codificacao(request.META.get('HTTP_ACCEPT_ENCODING', ''), tuple(extensoes))
+    extensao = extensoes.get(codificacao, '')
+    response = HttpResponse(versoes[extensao], content_type='text/html; charset=utf-8')
+    if codificacao:
+        response['Content-Encoding'] = codificacao
+    response['Vary'] = 'Accept-Encoding'
+    response['ETag'] = etag
+    return response
+
+
+def servir_home_exportada(view_func):
+    """
+    Com settings.HOME_EXPORTADA ligado, a home sai direto dos arquivos exportados (já
+    comprimidos), sem banco, template ou cache. Enquanto nada foi exportado, cai na view normal.
+    """
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        if settings.HOME_EXPORTADA and request.method in ('GET', 'HEAD'):
+            # Só um os.stat por requisição (fora do loop de eventos): os arquivos são relidos
+            # apenas quando mudam.
+            exportada = await sync_to_async(_carregar_exportada)()
+            if exportada is not None:
+                return resposta_exportada(request, exportada)
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
@@ -0,0 +1,235 @@
+# core/imagens.py
+
+import logging
+import posixpath
+from collections import defaultdict
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+from .cache import em_memoria_por_versao
+from .models import ConfiguracoesGerais, DerivadosImagem, HeroSlide, ImagemSobreNos, Semente
+
+logger = logging.getLogger(__name__)
+
+# Larguras (em pixels) geradas para cada imagem enviada pelo admin.
+LARGURAS_DERIVADOS = (480, 960, 1440, 1920)
+
+# Formatos modernos gerados para cada largura, do mais leve para o mais pesado.
+# O AVIF só é gerado se o Pillow instalado tiver suporte a ele.
+FORMATOS_MODERNOS = [
+    ('avif', 'AVIF', 'image/avif'),
+    ('webp', 'WEBP', 'image/webp'),
+]
+FORMATOS_MODERNOS = [formato for formato in FORMATOS_MODERNOS if features.check(formato[0])]
+
+# Qualidade de compressão usada em cada formato.
+QUALIDADE = {'AVIF': 55, 'WEBP': 78, 'JPEG': 80}
+
+# Campos de imagem que recebem derivados, por modelo.
+CAMPOS_DE_IMAGEM = {
+    HeroSlide: ('imagem',),
+    Semente: ('imagem',),
+    ImagemSobreNos: ('imagem',),
+    ConfiguracoesGerais: ('logo_principal', 'logo_secundario', 'imagem_fundo_dicas'),
+}
+
+# Pasta (dentro do storage de mídia) onde os derivados são gravados.
+PASTA_DERIVADOS = 'derivados'
+
+
+def formato_fallback(nome: str) -> tuple:
+    """
+    Formato "clássico" usado pelos navegadores sem AVIF/WebP.
+    PNGs continuam PNG para não perder a transparência (logos); o resto vira JPEG.
+    """
+    if nome.lower().endswith('.png'):
+        return ('png', 'PNG', 'image/png')
+    return ('jpg', 'JPEG', 'image/jpeg')
+
+
+def formatos_derivados(nome: str) -> list:
+    return FORMATOS_MODERNOS + [formato_fallback(nome)]
+
+
+def nome_derivado(nome: str, largura: int, extensao: str) -> str:
+    """
+    Caminho do derivado de `nome` na largura e formato pedidos.
+    Ex: 'sementes/marandu.jpg' -> 'derivados/sementes/marandu-960w.webp'
+    """
+    raiz, _ = posixpath.splitext(nome)
+    return f'{PASTA_DERIVADOS}/{raiz}-{largura}w.{extensao}'
+
+
+def derivados_habilitados() -> bool:
+    return getattr(settings, 'IMAGENS_RESPONSIVAS', True)
+
+
+def larguras_para(largura_original: int) -> list:
+    """
+    Larguras geradas para uma imagem: as de LARGURAS_DERIVADOS menores que ela e, se ela
+    for menor que a maior, a própria largura original (a imagem nunca é ampliada, e não
+    há duas cópias iguais em larguras diferentes).
+    """
+    larguras = [largura for largura in LARGURAS_DERIVADOS if largura < largura_original]
+    if largura_original <= LARGURAS_DERIVADOS[-1]:
+        larguras.append(largura_original)
+    return larguras
+
+
+@em_memoria_por_versao
+def larguras_geradas() -> dict:
+    """
+    {nome da imagem: larguras dos derivados}, lido do banco uma vez por versão do conteúdo.
+    """
+    return dict(DerivadosImagem.objects.values_list('nome', 'larguras'))
+
+
+def larguras_da_imagem(campo) -> list:
+    """
+    Larguras dos derivados que existem para a imagem; vazio se as imagens responsivas
+    estão desligadas ou os derivados ainda não foram gerados (o template usa o original).
+    """
+    if not campo or not derivados_habilitados():
+        return []
+    return larguras_geradas().get(campo.name, [])
+
+
+def largura_mais_proxima(larguras, largura: int) -> int:
+    # A menor largura que cobre a pedida; se nenhuma cobre, a maior que existe.
+    return min((opcao for opcao in larguras if opcao >= largura), default=max(larguras))
+
+
+def nomes_usados_nas_paginas(campo) -> list:
+    """
+    Arquivos cujas URLs os templates podem pedir para uma imagem: o original e os
+    derivados que existem.
+    """
+    return [campo.name] + [
+        nome_derivado(campo.name, largura, extensao)
+        for largura in larguras_da_imagem(campo)
+        for extensao, _, _ in formatos_derivados(campo.name)
+    ]
+
+
+def resolver_urls(campos, com_derivados: bool = True) -> None:
+    """
+    Gera de uma vez as URLs de todas as imagens (e derivados) que uma página vai exibir,
+    antes da renderização. Assim o storage (ver core.storage.StorageMedido) assina tudo
+    em lote, em vez de uma imagem por vez no meio do template.
+    """
+    por_storage = defaultdict(list)
+    for campo in campos:
+        if campo:
+            por_storage[campo.storage].extend(nomes_usados_nas_paginas(campo) if com_derivados else [campo.name])
+    for storage, nomes in por_storage.items():
+        if hasattr(storage, 'resolver_urls'):
+            storage.resolver_urls(nomes)
+
+
+def _preparar(imagem: Image.Image, formato: str) -> Image.Image:
+    """
+    Ajusta o modo de cor da imagem para o formato de destino.
+    """
+    if formato == 'JPEG' and imagem.mode != 'RGB':
+        return imagem.convert('RGB')
+    if formato in ('AVIF', 'WEBP') and imagem.mode not in ('RGB', 'RGBA'):
+        return imagem.convert('RGBA')
+    return imagem
+
+
+def _apagar_arquivos(storage, nome: str, larguras) -> None:
+    for largura in larguras:
+        for extensao, _, _ in formatos_derivados(nome):
+            storage.delete(nome_derivado(nome, largura, extensao))
+
+
+def gerar_derivados(campo, forcar: bool = False) -> list:
+    """
+    Gera (no mesmo storage do campo) as larguras e formatos de uma imagem e registra
+    quais larguras existem (DerivadosImagem).
+
+    `campo` é o FieldFile de um ImageField (ex: `semente.imagem`). Retorna a lista de
+    arquivos gravados. Imagens já registradas são puladas, a menos que `forcar` seja
+    verdadeiro: os sinais forçam quando um arquivo novo é enviado, mesmo que ele tenha o
+    nome do anterior (o GCS sobrescreve arquivos com o mesmo nome).
+    """
+    if not campo:
+        return []
+
+    storage = campo.storage
+    nome = campo.name
+    registro = DerivadosImagem.objects.filter(nome=nome).first()
+    if not forcar:
+        if registro is not None:
+            return []
+        # Derivados gerados antes do registro existir: sempre as quatro larguras.
+        if storage.exists(nome_derivado(nome, LARGURAS_DERIVADOS[-1], formato_fallback(nome)[0])):
+            DerivadosImagem.objects.create(nome=nome, larguras=list(LARGURAS_DERIVADOS))
+            return []
+
+    with storage.open(nome, 'rb') as arquivo:
+        original = Image.open(arquivo)
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    larguras = larguras_para(original.width)
+    gravados = []
+    for largura in larguras:
+        if largura < original.width:
+            altura = round(original.height * largura / original.width)
+            redimensionada = original.resize((largura, altura), Image.Resampling.LANCZOS)
+        else:
+            redimensionada = original
+
+        for extensao, formato, _ in formatos_derivados(nome):
+            buffer = BytesIO()
+            _preparar(redimensionada, formato).save(buffer, formato, quality=QUALIDADE.get(formato, 85), optimize=True)
+            destino = nome_derivado(nome, largura, extensao)
+            if storage.exists(destino):
+                storage.delete(destino)
+            gravados.append(storage.save(destino, ContentFile(buffer.getvalue())))
+
+    if registro is not None:
+        # Larguras que a imagem anterior (com o mesmo nome) tinha e a nova não tem.
+        _apagar_arquivos(storage, nome, set(registro.larguras) - set(larguras))
+    DerivadosImagem.objects.update_or_create(nome=nome, defaults={'larguras': larguras})
+    return gravados
+
+
+def apagar_derivados(campo) -> None:
+    """
+    Apaga os derivados de uma imagem que nenhum registro usa mais (ex: a semente foi
+    apagada). O original fica, como no resto do Django.
+    """
+    if not campo:
+        return
+    for modelo, nomes_campos in CAMPOS_DE_IMAGEM.items():
+        for nome_campo in nomes_campos:
+            if modelo.objects.filter(**{nome_campo: campo.name}).exists():
+                return
+    registro = DerivadosImagem.objects.filter(nome=campo.name).first()
+    if registro is not None:
+        _apagar_arquivos(campo.storage, campo.name, registro.larguras)
+        registro.delete()
+
+
+def gerar_derivados_da_instancia(instancia, forcar: bool = False, campos_novos=()) -> list:
+    """
+    Gera os derivados de todos os campos de imagem (ver CAMPOS_DE_IMAGEM) de uma instância;
+    os `campos_novos` (arquivos recém-enviados) são sempre regerados.
+    Erros (arquivo ausente, imagem corrompida) são registrados no log e não impedem o salvamento.
+    """
+    gravados = []
+    for nome_campo in CAMPOS_DE_IMAGEM[type(instancia)]:
+        campo = getattr(instancia, nome_campo)
+        try:
+            gravados += gerar_derivados(campo, forcar=forcar or nome_campo in campos_novos)
+        except FileNotFoundError:
+            # Comum em ambientes locais com uma cópia do banco mas sem os arquivos de mídia.
+            logger.info('Imagem %s não encontrada no storage; derivados não gerados.', campo.name)
+        except Exception:
+            logger.warning('Não foi possível gerar os derivados de %s', campo.name, exc_info=True)
+    return gravados
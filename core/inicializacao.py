@@ -0,0 +1,128 @@
+# core/inicializacao.py
+
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RE_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# Código rodado em um processo Python novo pelo perfil_de_inicializacao(): importa o
+# módulo WSGI (como o Gunicorn faz), opcionalmente aquece o processo e chama a aplicação
+# com a primeira requisição. Os tempos saem em JSON na última linha do stdout.
+SCRIPT_PERFIL = '''
+import io, json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+importado = time.perf_counter()
+aquecido = importado
+if {aquecer}:
+    from core.inicializacao import aquecer_processo
+    aquecer_processo()
+    aquecido = time.perf_counter()
+status = []
+environ = {{
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': {caminho!r}, 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+    'SERVER_PORT': '80', 'HTTP_HOST': 'localhost', 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+}}
+b''.join({modulo}.application(environ, lambda linha, cabecalhos, *args: status.append(linha)))
+fim = time.perf_counter()
+print(json.dumps({{
+    'importacao_ms': round((importado - inicio) * 1000, 1),
+    'aquecimento_ms': round((aquecido - importado) * 1000, 1),
+    'primeira_requisicao_ms': round((fim - aquecido) * 1000, 1),
+    'status': int(status[0].split()[0]),
+}}))
+'''
+
+
+def ler_importtime(saida: str) -> list:
+    """
+    Interpreta a saída de `python -X importtime` e retorna um item por módulo importado:
+    {'modulo', 'proprio_ms', 'acumulado_ms', 'nivel'}, na ordem em que terminaram de carregar.
+    """
+    modulos = []
+    for linha in saida.splitlines():
+        match = RE_IMPORTTIME.match(linha)
+        if match:
+            proprio, acumulado, recuo, modulo = match.groups()
+            modulos.append({
+                'modulo': modulo,
+                'proprio_ms': round(int(proprio) / 1000, 2),
+                'acumulado_ms': round(int(acumulado) / 1000, 2),
+                'nivel': (len(recuo) - 1) // 2,
+            })
+    return modulos
+
+
+def tempo_por_pacote(modulos: list) -> dict:
+    """
+    Soma o tempo próprio dos módulos por pacote de primeiro nível (django, PIL, core...),
+    do mais lento para o mais rápido.
+    """
+    pacotes = {}
+    for item in modulos:
+        pacote = item['modulo'].split('.')[0]
+        pacotes[pacote] = round(pacotes.get(pacote, 0) + item['proprio_ms'], 2)
+    return dict(sorted(pacotes.items(), key=lambda item: -item[1]))
+
+
+def perfil_de_inicializacao(modulo: str = 'araguaya_project.wsgi', aquecer: bool = False, caminho: str = '/') -> dict:
+    """
+    Sobe um processo Python novo, como um worker recém-criado, e mede o tempo de importar
+    `modulo` (um módulo WSGI, com `application`), de aquecer o processo (com `aquecer=True`) e da primeira requisição a
+    `caminho`, além do tempo de importação de cada módulo (-X importtime).
+    """
+    env = os.environ.copy()
+    env['ALLOWED_HOSTS'] = ','.join([*settings.ALLOWED_HOSTS, 'localhost'])
+    script = SCRIPT_PERFIL.format(modulo=modulo, aquecer=aquecer, caminho=caminho)
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if processo.returncode != 0:
+        erros = [linha for linha in processo.stderr.splitlines() if not linha.startswith('import time:')]
+        raise RuntimeError(erros[-1] if erros else 'Falha ao iniciar.')
+    resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+    resultado['modulos'] = ler_importtime(processo.stderr)
+    return resultado
+
+
+def aquecer_processo() -> None:
+    """
+    Deixa o processo pronto para atender: carrega as URLs (e com elas as views, o admin e
+    o Pillow), compila o template da home, monta os dados em memória (textos,
+    configurações, índices) e as páginas principais no cache compartilhado.
+
+    Chamado pelo Gunicorn no processo mestre (preload_app, ver gunicorn.conf.py): os
+    workers nascem por fork com tudo isso já pronto.
+    """
+    from django.template.loader import get_template
+    from django.urls import get_resolver
+
+    from .busca import obter_indice_busca, usar_postgres
+    from .cache import aquecer_cache
+    from .conteudo import obter_configuracoes, obter_textos
+    from .recomendacao import obter_indice
+
+    inicio = time.perf_counter()
+    get_resolver().url_patterns
+    get_template('index.html')
+    obter_textos()
+    obter_configuracoes()
+    obter_indice()
+    if not usar_postgres():
+        obter_indice_busca()
+    aquecer_cache()
+    logger.info('Processo aquecido em %.0f ms.', (time.perf_counter() - inicio) * 1000)
@@ -0,0 +1,304 @@
+# core/limites.py
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+# Limites usados pelas rotas da API: (capacidade do balde, fichas repostas por segundo).
+# A capacidade é a rajada aceita; a reposição, o ritmo sustentado.
+LIMITE_LEITURA_POR_IP = (120, 20)         # consultas ao catálogo, busca, recomendação
+LIMITE_COTACAO_POR_IP = (5, 1 / 60)       # 5 seguidas, depois 1 por minuto
+LIMITE_COTACAO_TOTAL = (60, 1)            # todas as origens juntas
+LIMITE_PLANO_POR_IP = (10, 1 / 10)
+LIMITE_PLANO_TOTAL = (30, 1)
+LIMITE_EXPORTACAO_POR_IP = (5, 1 / 30)    # exportação do catálogo inteiro
+
+# Maior corpo aceito nos POSTs da API (os formulários do site mandam poucas centenas de bytes).
+TAMANHO_MAXIMO_CORPO = 8 * 1024
+
+# Chaves guardadas na memória local quando o cache compartilhado está fora do ar.
+MAX_CHAVES_LOCAIS = 10000
+
+
+class MemoriaLocal:
+    """
+    Substituto mínimo do cache (get/set/add com validade) na memória do processo, usado
+    quando o cache compartilhado falha: os limites continuam valendo, por worker.
+    """
+
+    def __init__(self, tamanho=MAX_CHAVES_LOCAIS):
+        self.tamanho = tamanho
+        self._dados = OrderedDict()  # chave -> (valor, expira em)
+        self._lock = threading.Lock()
+
+    def get(self, chave, padrao=None):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None or item[1] <= time.monotonic():
+                self._dados.pop(chave, None)
+                return padrao
+            return item[0]
+
+    def set(self, chave, valor, timeout):
+        with self._lock:
+            self._dados[chave] = (valor, time.monotonic() + timeout)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho:
+                self._dados.popitem(last=False)
+
+    def add(self, chave, valor, timeout) -> bool:
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is not None and item[1] > time.monotonic():
+                return False
+        self.set(chave, valor, timeout)
+        return True
+
+    def delete(self, chave):
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+
+    # Mesma API assíncrona do cache do Django (ver _aexecutar); na memória nada bloqueia.
+    async def aget(self, chave, padrao=None):
+        return self.get(chave, padrao)
+
+    async def aset(self, chave, valor, timeout):
+        self.set(chave, valor, timeout)
+
+    async def aadd(self, chave, valor, timeout) -> bool:
+        return self.add(chave, valor, timeout)
+
+    async def adelete(self, chave):
+        self.delete(chave)
+
+
+memoria_local = MemoriaLocal()
+
+
+def _executar(operacao):
+    """
+    Roda `operacao(backend)` no cache de limites (settings.LIMITES_CACHE) e, se ele falhar
+    (ex: Redis fora do ar), na memória local.
+    """
+    try:
+        return operacao(caches[settings.LIMITES_CACHE])
+    except Exception:
+        logger.warning('Cache de limites indisponível; usando a memória local.', exc_info=True)
+        return operacao(memoria_local)
+
+
+async def _aexecutar(operacao):
+    """
+    Versão de _executar para as views async: `operacao(backend)` é uma corrotina que usa a
+    API assíncrona do cache (aget/aset/aadd/adelete).
+    """
+    try:
+        return await operacao(caches[settings.LIMITES_CACHE])
+    except Exception:
+        logger.warning('Cache de limites indisponível; usando a memória local.', exc_info=True)
+        return await operacao(memoria_local)
+
+
+def _repor_e_consumir(estado, agora, capacidade, por_segundo) -> tuple:
+    """
+    Balde de fichas: repõe as fichas pelo tempo passado e tenta gastar uma.
+    Retorna (novo estado, segundos até a próxima ficha; 0 se a requisição passou).
+    """
+    fichas, instante = estado if estado is not None else (capacidade, agora)
+    fichas = min(capacidade, fichas + (agora - instante) * por_segundo)
+    if fichas >= 1:
+        return (fichas - 1, agora), 0
+    return (fichas, agora), (1 - fichas) / por_segundo
+
+
+def consumir(chave: str, limite: tuple) -> float:
+    """
+    Gasta uma ficha do balde `chave`. Retorna 0 se havia ficha, ou quantos segundos faltam
+    para a próxima. Leitura e gravação não são atômicas: sob concorrência o limite é
+    aproximado, o que basta para conter rajadas.
+    """
+    capacidade, por_segundo = limite
+
+    def operacao(backend):
+        estado, espera = _repor_e_consumir(backend.get(chave), time.time(), capacidade, por_segundo)
+        # Depois de reposto por completo o balde não precisa mais ficar guardado.
+        backend.set(chave, estado, math.ceil(capacidade / por_segundo) + 1)
+        return espera
+
+    return _executar(operacao)
+
+
+async def aconsumir(chave: str, limite: tuple) -> float:
+    capacidade, por_segundo = limite
+
+    async def operacao(backend):
+        estado, espera = _repor_e_consumir(await backend.aget(chave), time.time(), capacidade, por_segundo)
+        await backend.aset(chave, estado, math.ceil(capacidade / por_segundo) + 1)
+        return espera
+
+    return await _aexecutar(operacao)
+
+
+def primeira_vez(chave: str, janela: int) -> bool:
+    return _executar(lambda backend: backend.add(chave, 1, janela))
+
+
+async def aprimeira_vez(chave: str, janela: int) -> bool:
+    return await _aexecutar(lambda backend: backend.aadd(chave, 1, janela))
+
+
+def esquecer(chave: str) -> None:
+    _executar(lambda backend: backend.delete(chave))
+
+
+async def aesquecer(chave: str) -> None:
+    await _aexecutar(lambda backend: backend.adelete(chave))
+
+
+def ip_do_cliente(request) -> str:
+    """
+    IP de quem fez a requisição. Atrás de PROXIES_REVERSOS proxies (ex: o do Railway), o IP
+    real é o que o último deles acrescentou ao X-Forwarded-For; os anteriores podem ser forjados.
+    """
+    proxies = settings.PROXIES_REVERSOS
+    if proxies:
+        encaminhados = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(encaminhados) >= proxies:
+            return encaminhados[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _recusar(status: int, mensagem: str, espera: float = 0) -> JsonResponse:
+    response = JsonResponse({'status': 'erro', 'mensagem': mensagem}, status=status)
+    if espera:
+        response['Retry-After'] = str(math.ceil(espera))
+    return response
+
+
+def limitar(nome: str, por_ip=None, total=None, tamanho_maximo=None, deduplicar=None):
+    """
+    Decorator de proteção das rotas da API, aplicado antes de qualquer leitura do corpo ou
+    consulta ao banco:
+
+    - `tamanho_maximo`: corpos maiores (em bytes) são recusados com 413 antes de serem lidos;
+    - `por_ip` / `total`: baldes de fichas (capacidade, fichas por segundo) por IP e para
+      todas as origens juntas; sem ficha, a resposta é 429 com Retry-After;
+    - `deduplicar`: POSTs com o mesmo corpo de um envio aceito (resposta 2xx) dentro dessa
+      janela (segundos) são recusados com 409, como um duplo clique ou um robô repetindo o envio.
+
+    Os baldes ficam no cache settings.LIMITES_CACHE, compartilhado entre os workers quando
+    é o Redis; nas views async, ele é usado pela API assíncrona do cache. Desligue tudo com LIMITES_ATIVOS=False (ex: no benchmark).
+    """
+    def verificar_tamanho(request):
+        if tamanho_maximo is not None and request.method in ('POST', 'PUT', 'PATCH'):
+            try:
+                tamanho = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                return _recusar(400, 'Tamanho da requisição inválido.')
+            if tamanho > tamanho_maximo:
+                return _recusar(413, 'Requisição muito grande.')
+        return None
+
+    def chave_do_corpo(request):
+        """
+        (recusa, chave de deduplicação do corpo): a chave é None quando a rota não deduplica.
+        """
+        if not deduplicar or request.method != 'POST':
+            return None, None
+        corpo = request.body
+        if tamanho_maximo is not None and len(corpo) > tamanho_maximo:
+            # Corpo sem Content-Length (transferência em partes).
+            return _recusar(413, 'Requisição muito grande.'), None
+        return None, f'core:limite:{nome}:corpo:{hashlib.sha256(corpo).hexdigest()[:32]}'
+
+    def verificar(request):
+        """
+        Retorna (resposta de recusa ou None, chave do corpo registrada ou None).
+        """
+        if not settings.LIMITES_ATIVOS:
+            return None, None
+        recusa = verificar_tamanho(request)
+        if recusa:
+            return recusa, None
+        if por_ip is not None:
+            espera = consumir(f'core:limite:{nome}:ip:{ip_do_cliente(request)}', por_ip)
+            if espera:
+                return _recusar(429, 'Muitas solicitações. Tente novamente em instantes.', espera), None
+        if total is not None:
+            espera = consumir(f'core:limite:{nome}:total', total)
+            if espera:
+                return _recusar(429, 'Serviço ocupado. Tente novamente em instantes.', espera), None
+        recusa, chave = chave_do_corpo(request)
+        if chave and not primeira_vez(chave, deduplicar):
+            return _recusar(409, 'Esta solicitação já foi enviada. Aguarde alguns instantes.'), None
+        return recusa, chave
+
+    async def averificar(request):
+        if not settings.LIMITES_ATIVOS:
+            return None, None
+        recusa = verificar_tamanho(request)
+        if recusa:
+            return recusa, None
+        if por_ip is not None:
+            espera = await aconsumir(f'core:limite:{nome}:ip:{ip_do_cliente(request)}', por_ip)
+            if espera:
+                return _recusar(429, 'Muitas solicitações. Tente novamente em instantes.', espera), None
+        if total is not None:
+            espera = await aconsumir(f'core:limite:{nome}:total', total)
+            if espera:
+                return _recusar(429, 'Serviço ocupado. Tente novamente em instantes.', espera), None
+        recusa, chave = chave_do_corpo(request)
+        if chave and not await aprimeira_vez(chave, deduplicar):
+            return _recusar(409, 'Esta solicitação já foi enviada. Aguarde alguns instantes.'), None
+        return recusa, chave
+
+    # O corpo é registrado antes da view, para que um envio simultâneo já seja recusado,
+    # mas só fica registrado se ela responder 2xx: um envio recusado (ex: dados inválidos)
+    # pode ser corrigido e reenviado, ou repetido depois de uma falha do servidor.
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                recusa, chave = await averificar(request)
+                if recusa:
+                    return recusa
+                sucesso = False
+                try:
+                    response = await view_func(request, *args, **kwargs)
+                    sucesso = 200 <= response.status_code < 300
+                    return response
+                finally:
+                    if chave and not sucesso:
+                        await aesquecer(chave)
+            return _wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            recusa, chave = verificar(request)
+            if recusa:
+                return recusa
+            sucesso = False
+            try:
+                response = view_func(request, *args, **kwargs)
+                sucesso = 200 <= response.status_code < 300
+                return response
+            finally:
+                if chave and not sucesso:
+                    esquecer(chave)
+        return _wrapped_view
+    return decorator
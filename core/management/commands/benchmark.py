@@ -0,0 +1,128 @@
+# core/management/commands/benchmark.py
+
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede p50/p95, consultas SQL e memória das rotas públicas sob carga em um Gunicorn local "
+        "e grava o resultado em JSON. Use um banco dedicado (DATABASE_URL) com --popular."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--popular', action='store_true', help="Cria dados realistas de benchmark antes de medir.")
+        parser.add_argument('--limpar', action='store_true', help="Remove os dados de benchmark ao final.")
+        parser.add_argument('--sementes', type=int, default=300, help="Quantidade de sementes criadas com --popular.")
+        parser.add_argument('--requisicoes', type=int, default=500, help="Requisições por rota no teste de carga.")
+        parser.add_argument('--concorrencia', type=int, default=16, help="Requisições simultâneas no teste de carga.")
+        parser.add_argument('--workers', type=int, default=2, help="Workers do Gunicorn.")
+        parser.add_argument(
+            '--modo',
+            choices=('wsgi', 'asgi'),
+            default='wsgi',
+            help="Workers síncronos (wsgi) ou do uvicorn (asgi), como em SERVIDOR_MODO no gunicorn.conf.py.",
+        )
+        parser.add_argument(
+            '--servidor',
+            default='gunicorn',
+            help="Comando do servidor (o --bind e o --workers são acrescentados automaticamente).",
+        )
+        parser.add_argument('--sem-carga', action='store_true', help="Só faz as medições em processo, sem subir o Gunicorn.")
+        parser.add_argument('--saida', default='benchmark.json', help="Arquivo JSON de saída.")
+        parser.add_argument('--baseline', help="JSON de um benchmark anterior; regressões fazem o comando falhar.")
+        parser.add_argument('--tolerancia', type=float, default=0.25, help="Piora aceita em latência/memória (0.25 = 25%%).")
+
+    def handle(self, *args, **options):
+        if options['modo'] == 'asgi' and not options['sem_carga'] and importlib.util.find_spec('uvicorn_worker') is None:
+            raise CommandError("O modo asgi precisa do uvicorn e do uvicorn-worker (pip install -r requirements.txt).")
+        if options['popular']:
+            self.stdout.write(f"Populando o banco com {options['sementes']} sementes...")
+            benchmark.popular_banco(sementes=options['sementes'])
+
+        resultado = {
+            'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': sys.version.split()[0],
+            'servidor': options['servidor'],
+            'modo': options['modo'],
+            'workers': options['workers'],
+            'cenarios': {},
+        }
+        cenarios = benchmark.cenarios()
+        for nome, (metodo, caminho, corpo) in cenarios.items():
+            self.stdout.write(f"Medindo {nome} em processo...")
+            resultado['cenarios'][nome] = benchmark.medir_em_processo(metodo, caminho, corpo)
+
+        if not options['sem_carga']:
+            porta = self._porta_livre()
+            servidor = self._iniciar_servidor(options['servidor'], porta, options['workers'], options['modo'])
+            try:
+                for nome, (metodo, caminho, corpo) in cenarios.items():
+                    self.stdout.write(f"Carga em {nome} ({options['requisicoes']} requisições, {options['concorrencia']} simultâneas)...")
+                    carga = benchmark.medir_sob_carga(
+                        f'http://127.0.0.1:{porta}', metodo, caminho, corpo,
+                        requisicoes=options['requisicoes'], concorrencia=options['concorrencia'],
+                    )
+                    # Vazão de cada worker: o número que muda entre os modos wsgi e asgi.
+                    carga['requisicoes_por_segundo_por_worker'] = round(carga['requisicoes_por_segundo'] / options['workers'], 1)
+                    resultado['cenarios'][nome].update(carga)
+            finally:
+                servidor.terminate()
+                servidor.wait(timeout=30)
+
+        if options['limpar']:
+            benchmark.remover_dados()
+
+        Path(options['saida']).write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding='utf-8')
+        for nome, metricas in resultado['cenarios'].items():
+            self.stdout.write(f"{nome}: {json.dumps(metricas, ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}."))
+
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text(encoding='utf-8'))
+            regressoes = benchmark.comparar_com_baseline(resultado, baseline, options['tolerancia'])
+            if regressoes:
+                raise CommandError("Regressões de desempenho:\n" + '\n'.join(regressoes))
+            self.stdout.write(self.style.SUCCESS("Nenhuma regressão em relação ao baseline."))
+
+    def _porta_livre(self) -> int:
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def _iniciar_servidor(self, comando, porta, workers, modo='wsgi'):
+        env = os.environ.copy()
+        env['ALLOWED_HOSTS'] = ','.join([*settings.ALLOWED_HOSTS, '127.0.0.1'])
+        env['SERVIDOR_MODO'] = modo
+        env['LIMITES_ATIVOS'] = 'False'
+        processo = subprocess.Popen(
+            [*comando.split(), '--bind', f'127.0.0.1:{porta}', '--workers', str(workers)],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        # Espera o servidor aceitar conexões (e aquece a primeira requisição).
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if processo.poll() is not None:
+                raise CommandError(f"O servidor encerrou ao iniciar: {comando}")
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{porta}/', timeout=2).read()
+                return processo
+            except OSError:
+                time.sleep(0.2)
+        processo.terminate()
+        raise CommandError("O servidor não respondeu em 30 segundos.")
@@ -0,0 +1,88 @@
+# core/management/commands/construir_assets.py
+
+import shlex
+import subprocess
+import tempfile
+from pathlib import Path
+from urllib.error import URLError
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from core import assets
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera os arquivos de front-end servidos pelo próprio site (CSS do Tailwind só com as classes "
+        "usadas, sprite com os ícones do Lucide em uso, fontes Inter e Lenis) na pasta de estáticos. "
+        "Rode antes do collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tailwind',
+            default='npx --yes tailwindcss@3.4.17',
+            help="Comando do Tailwind CLI (ex: o binário standalone './tailwindcss-linux-x64').",
+        )
+        parser.add_argument(
+            '--icones-dir',
+            help="Pasta com os SVGs do Lucide (ex: node_modules/lucide-static/icons). Sem ela, os ícones são baixados.",
+        )
+
+    def handle(self, *args, **options):
+        self.saida = Path(settings.STATICFILES_DIRS[0])
+        self.icones(options['icones_dir'])
+        css_fontes = self.fontes()
+        self.css(options['tailwind'], css_fontes)
+        self.gravar(assets.LENIS_JS, assets.baixar(assets.URL_LENIS.format(versao=assets.LENIS_VERSAO)))
+        self.stdout.write(self.style.SUCCESS(
+            f"Assets gerados em {self.saida}. Rode 'python manage.py collectstatic' para publicá-los."
+        ))
+
+    def gravar(self, caminho: str, conteudo: bytes) -> None:
+        destino = self.saida / caminho
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        destino.write_bytes(conteudo)
+        self.stdout.write(f"  {caminho} ({len(conteudo) / 1024:.1f} KB)")
+
+    def icones(self, pasta) -> None:
+        try:
+            nomes = assets.icones_usados()
+        except DatabaseError:
+            self.stderr.write("Banco indisponível: o sprite terá só os ícones fixos dos templates.")
+            nomes = sorted(assets.icones_dos_templates())
+
+        svgs = {}
+        for nome in nomes:
+            try:
+                if pasta:
+                    svgs[nome] = (Path(pasta) / f'{nome}.svg').read_text(encoding='utf-8')
+                else:
+                    svgs[nome] = assets.baixar(assets.URL_ICONE.format(versao=assets.LUCIDE_VERSAO, nome=nome)).decode()
+            except (OSError, URLError) as erro:
+                raise CommandError(f'Ícone "{nome}" não encontrado no Lucide {assets.LUCIDE_VERSAO}: {erro}')
+        self.gravar(assets.SPRITE_ICONES, assets.montar_sprite(svgs).encode())
+
+    def fontes(self) -> str:
+        css, arquivos = assets.fontes_locais(assets.baixar(assets.URL_FONTES).decode())
+        for nome, url in arquivos.items():
+            self.gravar(f'{assets.PASTA_FONTES}/{nome}', assets.baixar(url))
+        return css
+
+    def css(self, tailwind: str, css_fontes: str) -> None:
+        with tempfile.TemporaryDirectory() as pasta:
+            gerado = Path(pasta) / 'site.css'
+            comando = [
+                *shlex.split(tailwind),
+                '--config', str(settings.BASE_DIR / 'assets' / 'tailwind.config.js'),
+                '--input', str(settings.BASE_DIR / 'assets' / 'css' / 'site.css'),
+                '--output', str(gerado),
+                '--minify',
+            ]
+            try:
+                subprocess.run(comando, cwd=settings.BASE_DIR, check=True)
+            except (OSError, subprocess.CalledProcessError) as erro:
+                raise CommandError(f"Falha ao rodar o Tailwind CLI ({tailwind}): {erro}")
+            self.gravar(assets.CSS_SITE, (css_fontes + gerado.read_text(encoding='utf-8')).encode())
@@ -0,0 +1,31 @@
+# core/management/commands/exportar_catalogo.py
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalogo import EXPORTADORES, TAMANHO_LOTE
+
+
+class Command(BaseCommand):
+    help = "Exporta o catálogo de sementes em CSV ou JSON Lines, lendo o banco em lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', nargs='?', help="Arquivo de destino (padrão: saída padrão).")
+        parser.add_argument('--formato', choices=list(EXPORTADORES), help="Formato (padrão: pela extensão, ou CSV).")
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help=f"Sementes lidas por vez (padrão: {TAMANHO_LOTE}).")
+
+    def handle(self, *args, **options):
+        destino = options['arquivo']
+        formato = options['formato'] or (os.path.splitext(destino)[1].lstrip('.').lower() if destino else 'csv')
+        if formato not in EXPORTADORES:
+            raise CommandError(f"Formato desconhecido: use --formato ({', '.join(EXPORTADORES)}).")
+
+        partes = EXPORTADORES[formato](tamanho_lote=options['lote'])
+        if destino is None:
+            for parte in partes:
+                self.stdout.write(parte, ending='')
+            return
+        with open(destino, 'w', encoding='utf-8', newline='') as arquivo:
+            arquivo.writelines(partes)
+        self.stdout.write(self.style.SUCCESS(f"Catálogo exportado em {destino}."))
@@ -0,0 +1,32 @@
+# core/management/commands/exportar_home.py
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exportacao import brotli, exportar_home
+
+
+class Command(BaseCommand):
+    help = (
+        "Grava a home renderizada (com versões gzip e brotli) na pasta EXPORTACAO_DIR, para ser "
+        "servida como arquivo estático. Com HOME_EXPORTADA=True ela é regravada após cada edição."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destino', help="Pasta de destino (padrão: settings.EXPORTACAO_DIR).")
+
+    def handle(self, *args, **options):
+        if getattr(getattr(default_storage, 'interno', default_storage), 'querystring_auth', False):
+            self.stderr.write(self.style.WARNING(
+                "O storage de mídia gera URLs assinadas: as imagens da home exportada deixarão "
+                "de carregar quando elas expirarem."
+            ))
+        if brotli is None:
+            self.stderr.write(self.style.WARNING("Pacote 'brotli' não instalado: só a versão gzip será gerada."))
+        try:
+            manifesto = exportar_home(options['destino'])
+        except RuntimeError as erro:
+            raise CommandError(str(erro))
+        self.stdout.write(self.style.SUCCESS(
+            f"Home exportada em {manifesto['arquivo']} ({', '.join(manifesto['codificacoes'])})."
+        ))
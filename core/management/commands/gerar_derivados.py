@@ -0,0 +1,29 @@
+# core/management/commands/gerar_derivados.py
+
+from django.core.management.base import BaseCommand
+
+from core.cache import incrementar_versao_conteudo
+from core.imagens import CAMPOS_DE_IMAGEM, gerar_derivados_da_instancia
+
+
+class Command(BaseCommand):
+    help = "Gera as versões redimensionadas (AVIF/WebP/JPEG) das imagens já enviadas pelo admin."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forcar',
+            action='store_true',
+            help="Regera os derivados mesmo das imagens que já foram processadas.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for modelo in CAMPOS_DE_IMAGEM:
+            for instancia in modelo.objects.iterator():
+                gravados = gerar_derivados_da_instancia(instancia, forcar=options['forcar'])
+                if gravados:
+                    self.stdout.write(f'{modelo._meta.verbose_name} "{instancia}": {len(gravados)} arquivos gerados.')
+                total += len(gravados)
+        # As páginas em cache foram montadas sem os derivados novos: remonta com eles.
+        incrementar_versao_conteudo()
+        self.stdout.write(self.style.SUCCESS(f'Concluído: {total} derivados gerados.'))
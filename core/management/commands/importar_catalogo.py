@@ -0,0 +1,53 @@
+# core/management/commands/importar_catalogo.py
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalogo import LEITORES, TAMANHO_LOTE, ErroImportacao, importar_catalogo
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa o catálogo de sementes de um arquivo CSV ou JSON Lines (o mesmo formato do "
+        "exportar_catalogo): cria as sementes novas e atualiza as existentes, em uma só transação."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Arquivo .csv ou .jsonl.")
+        parser.add_argument('--formato', choices=list(LEITORES), help="Formato do arquivo (padrão: pela extensão).")
+        parser.add_argument(
+            '--imagens',
+            help="Pasta com as imagens das sementes, procuradas pelo nome do arquivo da coluna 'imagem'.",
+        )
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help=f"Sementes gravadas por vez (padrão: {TAMANHO_LOTE}).")
+        parser.add_argument('--simular', action='store_true', help="Valida o arquivo inteiro sem gravar nada.")
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or os.path.splitext(options['arquivo'])[1].lstrip('.').lower()
+        if formato not in LEITORES:
+            raise CommandError(f"Formato desconhecido: use --formato ({', '.join(LEITORES)}).")
+        if options['imagens'] and not os.path.isdir(options['imagens']):
+            raise CommandError(f"Pasta de imagens não encontrada: {options['imagens']}")
+
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                resultado = importar_catalogo(
+                    arquivo, formato, pasta_imagens=options['imagens'], tamanho_lote=options['lote'],
+                    simular=options['simular'],
+                )
+        except OSError as erro:
+            raise CommandError(str(erro))
+        except ErroImportacao as erro:
+            for linha, mensagem in erro.erros:
+                self.stderr.write(f"Linha {linha}: {mensagem}")
+            raise CommandError(f"{len(erro.erros)} erros no arquivo; nada foi gravado.")
+
+        resumo = (
+            f"{resultado['criadas']} sementes criadas, {resultado['atualizadas']} atualizadas, "
+            f"{resultado['imagens']} imagens enviadas."
+        )
+        if options['simular']:
+            self.stdout.write(self.style.SUCCESS(f"Simulação sem erros: {resumo} Nada foi gravado."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Catálogo importado: {resumo}"))
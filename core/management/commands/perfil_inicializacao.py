@@ -0,0 +1,50 @@
+# core/management/commands/perfil_inicializacao.py
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.inicializacao import perfil_de_inicializacao, tempo_por_pacote
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a inicialização de um worker novo: tempo de importação de cada módulo, "
+        "aquecimento e primeira requisição, com e sem o aquecimento do gunicorn.conf.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modulo', default='araguaya_project.wsgi', help="Módulo importado pelo servidor.")
+        parser.add_argument('--caminho', default='/', help="Caminho da primeira requisição.")
+        parser.add_argument('--top', type=int, default=25, help="Quantos módulos mais lentos listar.")
+        parser.add_argument('--saida', help="Grava o resultado completo (com todos os módulos) em JSON.")
+
+    def handle(self, *args, **options):
+        resultados = {}
+        for nome, aquecer in (('sem_aquecimento', False), ('com_aquecimento', True)):
+            try:
+                resultados[nome] = perfil_de_inicializacao(options['modulo'], aquecer=aquecer, caminho=options['caminho'])
+            except RuntimeError as erro:
+                raise CommandError(f"Falha ao medir {options['modulo']}: {erro}")
+
+        frio = resultados['sem_aquecimento']
+        modulos = frio['modulos']
+        self.stdout.write(f"Importação de {options['modulo']}: {frio['importacao_ms']} ms ({len(modulos)} módulos)")
+        self.stdout.write(f"\nMódulos mais lentos (tempo próprio / acumulado, ms):")
+        for item in sorted(modulos, key=lambda item: -item['proprio_ms'])[:options['top']]:
+            self.stdout.write(f"  {item['proprio_ms']:>8.1f} {item['acumulado_ms']:>9.1f}  {item['modulo']}")
+        self.stdout.write(f"\nPor pacote (ms):")
+        for pacote, tempo in list(tempo_por_pacote(modulos).items())[:10]:
+            self.stdout.write(f"  {tempo:>8.1f}  {pacote}")
+
+        self.stdout.write('\nPrimeira requisição de um worker novo:')
+        for nome, resultado in resultados.items():
+            self.stdout.write(
+                f"  {nome}: {resultado['primeira_requisicao_ms']} ms "
+                f"(aquecimento: {resultado['aquecimento_ms']} ms, status {resultado['status']})"
+            )
+
+        if options['saida']:
+            Path(options['saida']).write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}."))
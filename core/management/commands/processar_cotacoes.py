@@ -0,0 +1,44 @@
+# core/management/commands/processar_cotacoes.py
+
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core.cotacoes import obter_backend, processar_lote
+
+
+class Command(BaseCommand):
+    help = "Worker que envia as solicitações de cotação pendentes, com novas tentativas em caso de erro."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=20, help="Quantas solicitações enviar por vez (padrão: 20).")
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5,
+            help="Segundos de espera quando a fila está vazia (padrão: 5).",
+        )
+        parser.add_argument('--uma-vez', action='store_true', help="Processa a fila até esvaziar e encerra.")
+
+    def handle(self, *args, **options):
+        # Configuração inválida: o worker não começa, em vez de esgotar as tentativas da fila.
+        try:
+            backend = obter_backend()
+        except ImproperlyConfigured as erro:
+            raise CommandError(str(erro)) from erro
+        self.stdout.write("Processando solicitações de cotação...")
+        try:
+            while True:
+                close_old_connections()
+                enviadas, com_erro = processar_lote(options['lote'], backend)
+                if enviadas or com_erro:
+                    self.stdout.write(f"{enviadas} enviadas, {com_erro} com erro.")
+                    continue
+                if options['uma_vez']:
+                    break
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS("Worker de cotações encerrado."))
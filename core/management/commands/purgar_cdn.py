@@ -0,0 +1,20 @@
+# core/management/commands/purgar_cdn.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cdn import CHAVE_SITE, purgar_na_borda
+
+
+class Command(BaseCommand):
+    help = (
+        "Purga respostas da CDN pelas chaves de conteúdo (ex: home, sementes, semente-12). "
+        "Sem chaves, purga o site inteiro: rode depois de um deploy que muda os templates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('chaves', nargs='*', default=[CHAVE_SITE], help="Chaves a purgar (padrão: site).")
+
+    def handle(self, *args, **options):
+        if not purgar_na_borda(options['chaves']):
+            raise CommandError("Falha ao purgar a CDN (detalhes no log).")
+        self.stdout.write(self.style.SUCCESS(f"Purgado: {' '.join(options['chaves'])}."))
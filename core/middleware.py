@@ -0,0 +1,202 @@
+# core/middleware.py
+
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .compressao import TAMANHO_MINIMO, acomprimir_partes, comprimir, comprimir_partes, comprimivel, escolher_codificacao
+from .desempenho import Metricas, metricas_atuais
+
+logger = logging.getLogger('core.desempenho')
+
+# Nome e descrição de cada categoria no cabeçalho Server-Timing.
+CATEGORIAS_SERVER_TIMING = (
+    ('db', 'consultas'),
+    ('template', 'renderizações'),
+    ('storage', 'chamadas ao storage'),
+)
+
+
+class ServerTimingMiddleware:
+    """
+    Mede cada requisição (banco de dados, renderização de templates, chamadas ao storage
+    de mídia e tempo total) e publica o resultado:
+
+    - no cabeçalho Server-Timing, visível na aba "Rede" do navegador;
+    - em uma linha JSON no logger 'core.desempenho' (nível INFO);
+    - com as consultas SQL, em nível WARNING, quando a requisição passa de DESEMPENHO_LIMITE_LENTO_MS.
+
+    Deve ser o primeiro middleware da lista, para que o tempo total inclua os demais.
+    Funciona tanto no modo WSGI quanto no ASGI: as consultas são medidas pelo wrapper que
+    core.desempenho.instrumentar_conexao instala em cada conexão, inclusive nas threads
+    usadas pelo ORM assíncrono.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        metricas = Metricas()
+        token = metricas_atuais.set(metricas)
+        try:
+            response = self.get_response(request)
+        finally:
+            metricas_atuais.reset(token)
+        return self.publicar(request, response, metricas)
+
+    async def __acall__(self, request):
+        metricas = Metricas()
+        token = metricas_atuais.set(metricas)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metricas_atuais.reset(token)
+        return self.publicar(request, response, metricas)
+
+    def publicar(self, request, response, metricas):
+        total_ms = metricas.total() * 1000
+        if getattr(settings, 'SERVER_TIMING', True):
+            response['Server-Timing'] = self.server_timing(metricas, total_ms, response.get('Server-Timing'))
+        self.registrar_log(request, response, metricas, total_ms)
+        return response
+
+    def server_timing(self, metricas, total_ms, anterior=None) -> str:
+        partes = [anterior] if anterior else []
+        for categoria, descricao in CATEGORIAS_SERVER_TIMING:
+            if metricas.contagens[categoria]:
+                partes.append(
+                    f'{categoria};dur={metricas.tempos[categoria] * 1000:.1f};'
+                    f'desc="{metricas.contagens[categoria]} {descricao}"'
+                )
+        partes.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(partes)
+
+    def registrar_log(self, request, response, metricas, total_ms) -> None:
+        lenta = total_ms >= getattr(settings, 'DESEMPENHO_LIMITE_LENTO_MS', 500)
+        # Montar o JSON custa caro: só é feito se a linha realmente for registrada.
+        if not lenta and not logger.isEnabledFor(logging.INFO):
+            return
+        dados = {
+            'metodo': request.method,
+            'caminho': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+        }
+        for categoria, _ in CATEGORIAS_SERVER_TIMING:
+            dados[f'{categoria}_ms'] = round(metricas.tempos[categoria] * 1000, 1)
+            dados[f'{categoria}_chamadas'] = metricas.contagens[categoria]
+        if lenta:
+            dados['consultas'] = [{'sql': sql, 'ms': ms} for sql, ms in metricas.consultas]
+            logger.warning('requisicao_lenta %s', json.dumps(dados, ensure_ascii=False))
+        else:
+            logger.info('requisicao %s', json.dumps(dados, ensure_ascii=False))
+
+
+class WhiteNoiseAssincrono(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware que também funciona no modo ASGI. O original é só síncrono: no
+    uvicorn, o Django o rodaria em uma thread, e toda requisição (não só as de arquivos
+    estáticos) ocuparia uma thread até a view terminar.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Em desenvolvimento o arquivo é procurado no disco a cada requisição.
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class CompressaoMiddleware:
+    """
+    Comprime as respostas dinâmicas (HTML, JSON, CSV...) em brotli ou gzip, conforme o
+    Accept-Encoding do cliente:
+
+    - páginas do cache_por_versao já trazem as versões comprimidas guardadas no cache
+      (atributo `comprimidos` da resposta), então são comprimidas uma vez por versão do
+      conteúdo, e não a cada requisição;
+    - as demais são comprimidas na hora;
+    - StreamingHttpResponse (ex: exportação do catálogo) é comprimida parte por parte.
+
+    Respostas que já têm Content-Encoding (arquivos do Whitenoise, home exportada) passam
+    direto. A ETag vira fraca (W/), como no GZipMiddleware do Django.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        return self.comprimir(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.comprimir(request, await self.get_response(request))
+
+    def comprimir(self, request, response):
+        if (
+            response.has_header('Content-Encoding')
+            or response.status_code in (204, 304)
+            or not comprimivel(response.get('Content-Type', ''))
+        ):
+            return response
+        if not response.streaming and len(response.content) < TAMANHO_MINIMO:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codificacao = escolher_codificacao(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codificacao is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acomprimir_partes(response.streaming_content, codificacao)
+            else:
+                response.streaming_content = comprimir_partes(response.streaming_content, codificacao)
+            del response['Content-Length']
+        else:
+            comprimido = getattr(response, 'comprimidos', {}).get(codificacao)
+            if comprimido is None:
+                comprimido = comprimir(response.content, codificacao)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response['Content-Length'] = str(len(comprimido))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = codificacao
+        return response
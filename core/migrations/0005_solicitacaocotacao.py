@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_remove_configuracoesgerais_logo_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolicitacaoCotacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200)),
+                ('contato', models.CharField(help_text='Email ou telefone informado pelo cliente.', max_length=200)),
+                ('produto', models.CharField(blank=True, max_length=200)),
+                ('mensagem', models.TextField(blank=True)),
+                ('criada_em', models.DateTimeField(auto_now_add=True, verbose_name='Recebida em')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviada', 'Enviada'), ('falhou', 'Falhou')], default='pendente', max_length=20)),
+                ('tentativas', models.PositiveIntegerField(default=0)),
+                ('proxima_tentativa_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima tentativa em')),
+                ('enviada_em', models.DateTimeField(blank=True, null=True, verbose_name='Enviada em')),
+                ('ultimo_erro', models.TextField(blank=True, verbose_name='Último erro')),
+            ],
+            options={
+                'verbose_name': 'Solicitação de Cotação',
+                'verbose_name_plural': 'Solicitações de Cotação',
+                'ordering': ['-criada_em'],
+                'indexes': [models.Index(fields=['status', 'proxima_tentativa_em'], name='core_solici_status_00b3c1_idx')],
+            },
+        ),
+    ]
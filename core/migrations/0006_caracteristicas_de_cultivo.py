@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:39
+
+from django.db import migrations, models
+
+# Opções que já existiam no seletor "Encontrar Semente Ideal" do template.
+CARACTERISTICAS_INICIAIS = [
+    ('clima', 'tropical', 'Tropical'),
+    ('clima', 'subtropical', 'Subtropical'),
+    ('clima', 'semiarido', 'Semiárido'),
+    ('solo', 'argiloso', 'Argiloso'),
+    ('solo', 'arenoso', 'Arenoso'),
+    ('solo', 'misto', 'Misto'),
+    ('objetivo', 'pastoreio', 'Pastoreio'),
+    ('objetivo', 'feno', 'Feno'),
+    ('objetivo', 'silagem', 'Silagem'),
+]
+
+
+def criar_caracteristicas(apps, schema_editor):
+    CaracteristicaCultivo = apps.get_model('core', 'CaracteristicaCultivo')
+    for categoria, slug, nome in CARACTERISTICAS_INICIAIS:
+        CaracteristicaCultivo.objects.get_or_create(categoria=categoria, slug=slug, defaults={'nome': nome})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_solicitacaocotacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaracteristicaCultivo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(choices=[('clima', 'Clima'), ('solo', 'Tipo de Solo'), ('objetivo', 'Objetivo do Plantio')], max_length=20)),
+                ('slug', models.SlugField(help_text="Identificador usado na busca (ex: 'semiarido'). Não altere.")),
+                ('nome', models.CharField(help_text="Nome exibido no seletor de sementes (ex: 'Semiárido').", max_length=50)),
+            ],
+            options={
+                'verbose_name': 'Característica de Cultivo',
+                'verbose_name_plural': 'Características de Cultivo',
+                'ordering': ['categoria', 'nome'],
+                'constraints': [models.UniqueConstraint(fields=('categoria', 'slug'), name='caracteristica_unica_por_categoria')],
+            },
+        ),
+        migrations.AddField(
+            model_name='semente',
+            name='caracteristicas',
+            field=models.ManyToManyField(blank=True, help_text="Climas, solos e objetivos para os quais a semente é recomendada no seletor 'Encontrar Semente Ideal'.", related_name='sementes', to='core.caracteristicacultivo', verbose_name='Características de Cultivo'),
+        ),
+        migrations.RunPython(criar_caracteristicas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:40
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+from core.texto import normalizar
+
+
+def preencher_busca(apps, schema_editor):
+    Semente = apps.get_model('core', 'Semente')
+    for semente in Semente.objects.all():
+        semente.busca_principal = normalizar(semente.nome, semente.nome_cientifico, semente.tipo)
+        semente.busca_texto = normalizar(semente.paragrafo_descricao, semente.consorciacao, semente.pragas)
+        semente.save(update_fields=['busca_principal', 'busca_texto'])
+
+    if schema_editor.connection.vendor == 'postgresql':
+        Semente.objects.update(vetor_busca=(
+            SearchVector('busca_principal', weight='A', config='simple')
+            + SearchVector('busca_texto', weight='B', config='simple')
+        ))
+
+
+# O índice GIN só existe no PostgreSQL; nos outros bancos a busca usa o índice em memória.
+def criar_indice_gin(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE INDEX core_semente_vetor_busca_gin ON core_semente USING gin (vetor_busca)')
+
+
+def remover_indice_gin(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS core_semente_vetor_busca_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_caracteristicas_de_cultivo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='semente',
+            name='busca_principal',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='semente',
+            name='busca_texto',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='semente',
+            name='vetor_busca',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice_gin, remover_indice_gin),
+    ]
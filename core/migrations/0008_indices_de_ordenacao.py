@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_busca_de_sementes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='caracteristicacultivo',
+            index=models.Index(fields=['categoria', 'nome'], name='core_caract_categoria_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='diferencial',
+            index=models.Index(fields=['ordem'], name='core_diferencial_ordem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(fields=['ordem'], name='core_faq_ordem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='heroslide',
+            index=models.Index(fields=['ordem'], name='core_heroslide_ordem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imagemsobrenos',
+            index=models.Index(fields=['configuracao', 'ordem'], name='core_imagemsobrenos_ordem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemnavegacao',
+            index=models.Index(fields=['ordem'], name='core_itemnavegacao_ordem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='semente',
+            index=models.Index(fields=['nome'], name='core_semente_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='semente',
+            index=models.Index(condition=models.Q(('aparece_na_comparacao', True)), fields=['nome'], name='core_semente_comparacao_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_indices_de_ordenacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DerivadosImagem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(help_text='Caminho da imagem original no storage de mídia.', max_length=255, unique=True)),
+                ('larguras', models.JSONField(default=list)),
+                ('gerados_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Derivados de Imagem',
+                'verbose_name_plural': 'Derivados de Imagens',
+            },
+        ),
+    ]
@@ -1,6 +1,10 @@
 # core/models.py
 
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+
+from .texto import normalizar
 
 class ConteudoTexto(models.Model):
     chave = models.CharField(max_length=100, unique=True, help_text="Identificador único para o texto (ex: 'hero_titulo'). Não altere.")
@@ -23,10 +27,31 @@ class HeroSlide(models.Model):
         verbose_name = "Slide da Home"
         verbose_name_plural = "Slides da Home"
         ordering = ['ordem']
+        indexes = [models.Index(fields=['ordem'], name='core_heroslide_ordem_idx')]
 
     def __str__(self):
         return self.titulo
 
+class CaracteristicaCultivo(models.Model):
+    class Categoria(models.TextChoices):
+        CLIMA = 'clima', 'Clima'
+        SOLO = 'solo', 'Tipo de Solo'
+        OBJETIVO = 'objetivo', 'Objetivo do Plantio'
+
+    categoria = models.CharField(max_length=20, choices=Categoria.choices)
+    slug = models.SlugField(max_length=50, help_text="Identificador usado na busca (ex: 'semiarido'). Não altere.")
+    nome = models.CharField(max_length=50, help_text="Nome exibido no seletor de sementes (ex: 'Semiárido').")
+
+    class Meta:
+        verbose_name = "Característica de Cultivo"
+        verbose_name_plural = "Características de Cultivo"
+        ordering = ['categoria', 'nome']
+        constraints = [models.UniqueConstraint(fields=['categoria', 'slug'], name='caracteristica_unica_por_categoria')]
+        indexes = [models.Index(fields=['categoria', 'nome'], name='core_caract_categoria_nome_idx')]
+
+    def __str__(self):
+        return f"{self.get_categoria_display()}: {self.nome}"
+
 class Semente(models.Model):
     nome = models.CharField(max_length=100)
     tipo = models.CharField(max_length=50, help_text="Ex: Brachiaria, Panicum")
@@ -48,16 +73,41 @@ class Semente(models.Model):
     consorciacao = models.TextField(blank=True, verbose_name="Consorciação")
     pragas = models.TextField(blank=True)
     adubacao_formacao = models.TextField(blank=True, verbose_name="Adubação de Formação")
+    caracteristicas = models.ManyToManyField(CaracteristicaCultivo, blank=True, related_name='sementes', verbose_name="Características de Cultivo", help_text="Climas, solos e objetivos para os quais a semente é recomendada no seletor 'Encontrar Semente Ideal'.")
     aparece_na_comparacao = models.BooleanField(default=False, verbose_name="Aparece na tabela de comparação?", help_text="Marque esta opção para que a semente apareça na tabela 'Compare Nossas Soluções' na home. Recomenda-se marcar no máximo 4.")
 
+    # Campos de busca (preenchidos automaticamente no save, sem acentos e em minúsculas).
+    # O vetor_busca só é usado no PostgreSQL, onde tem um índice GIN.
+    busca_principal = models.TextField(blank=True, editable=False)
+    busca_texto = models.TextField(blank=True, editable=False)
+    vetor_busca = SearchVectorField(null=True, editable=False)
+
+    CAMPOS_BUSCA_PRINCIPAL = ('nome', 'nome_cientifico', 'tipo')
+    CAMPOS_BUSCA_TEXTO = ('paragrafo_descricao', 'consorciacao', 'pragas')
+
     class Meta:
         verbose_name = "Semente"
         verbose_name_plural = "Sementes"
         ordering = ['nome']
+        indexes = [
+            models.Index(fields=['nome'], name='core_semente_nome_idx'),
+            # Só as sementes da tabela de comparação, já na ordem em que aparecem.
+            models.Index(fields=['nome'], condition=models.Q(aparece_na_comparacao=True), name='core_semente_comparacao_idx'),
+        ]
 
     def __str__(self):
         return self.nome
 
+    def preencher_campos_busca(self):
+        self.busca_principal = normalizar(*(getattr(self, campo) for campo in self.CAMPOS_BUSCA_PRINCIPAL))
+        self.busca_texto = normalizar(*(getattr(self, campo) for campo in self.CAMPOS_BUSCA_TEXTO))
+
+    def save(self, *args, **kwargs):
+        self.preencher_campos_busca()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'busca_principal', 'busca_texto'}
+        super().save(*args, **kwargs)
+
 class Diferencial(models.Model):
     titulo = models.CharField(max_length=100)
     descricao = models.TextField()
@@ -68,6 +118,7 @@ class Diferencial(models.Model):
         verbose_name = "Diferencial"
         verbose_name_plural = "Diferenciais"
         ordering = ['ordem']
+        indexes = [models.Index(fields=['ordem'], name='core_diferencial_ordem_idx')]
 
     def __str__(self):
         return self.titulo
@@ -81,6 +132,7 @@ class FAQ(models.Model):
         verbose_name = "Pergunta Frequente (FAQ)"
         verbose_name_plural = "Perguntas Frequentes (FAQ)"
         ordering = ['ordem']
+        indexes = [models.Index(fields=['ordem'], name='core_faq_ordem_idx')]
 
     def __str__(self):
         return self.pergunta
@@ -125,6 +177,7 @@ class ItemNavegacao(models.Model):
         verbose_name = "Item de Navegação"
         verbose_name_plural = "Itens de Navegação"
         ordering = ['ordem']
+        indexes = [models.Index(fields=['ordem'], name='core_itemnavegacao_ordem_idx')]
 
     def __str__(self):
         return self.texto
@@ -137,4 +190,47 @@ class ImagemSobreNos(models.Model):
     class Meta:
         ordering = ['ordem']
         verbose_name = "Imagem da Seção Sobre Nós"
-        verbose_name_plural = "Imagens da Seção Sobre Nós"
\ No newline at end of file
+        verbose_name_plural = "Imagens da Seção Sobre Nós"
+        indexes = [models.Index(fields=['configuracao', 'ordem'], name='core_imagemsobrenos_ordem_idx')]
+
+class SolicitacaoCotacao(models.Model):
+    class Status(models.TextChoices):
+        PENDENTE = 'pendente', 'Pendente'
+        ENVIADA = 'enviada', 'Enviada'
+        FALHOU = 'falhou', 'Falhou'
+
+    nome = models.CharField(max_length=200)
+    contato = models.CharField(max_length=200, help_text="Email ou telefone informado pelo cliente.")
+    produto = models.CharField(max_length=200, blank=True)
+    mensagem = models.TextField(blank=True)
+    criada_em = models.DateTimeField(auto_now_add=True, verbose_name="Recebida em")
+
+    # Controle da fila de envio (preenchido pelo comando 'processar_cotacoes').
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDENTE)
+    tentativas = models.PositiveIntegerField(default=0)
+    proxima_tentativa_em = models.DateTimeField(default=timezone.now, verbose_name="Próxima tentativa em")
+    enviada_em = models.DateTimeField(null=True, blank=True, verbose_name="Enviada em")
+    ultimo_erro = models.TextField(blank=True, verbose_name="Último erro")
+
+    class Meta:
+        verbose_name = "Solicitação de Cotação"
+        verbose_name_plural = "Solicitações de Cotação"
+        ordering = ['-criada_em']
+        indexes = [models.Index(fields=['status', 'proxima_tentativa_em'])]
+
+    def __str__(self):
+        return f"{self.nome} ({self.contato})"
+
+class DerivadosImagem(models.Model):
+    # Registro das versões redimensionadas geradas para cada arquivo de imagem (ver
+    # core/imagens.py): os templates só apontam para as larguras que existem de fato.
+    nome = models.CharField(max_length=255, unique=True, help_text="Caminho da imagem original no storage de mídia.")
+    larguras = models.JSONField(default=list)
+    gerados_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Derivados de Imagem"
+        verbose_name_plural = "Derivados de Imagens"
+
+    def __str__(self):
+        return self.nome
@@ -0,0 +1,233 @@
+# core/plano_plantio.py
+
+import functools
+import hashlib
+import html
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as TempoEsgotado
+
+import requests
+from cachetools import TTLCache
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from .models import Semente
+from .recomendacao import CATEGORIAS, obter_indice
+
+logger = logging.getLogger(__name__)
+
+URL_GEMINI = 'https://generativelanguage.googleapis.com/v1beta/models/{modelo}:generateContent'
+
+# Tentativas de chamada à API de IA quando ela responde 429 (limite) ou 5xx, com espera
+# dobrando a cada tentativa (1s, 2s...).
+TENTATIVAS_API = 3
+ESPERA_INICIAL_API = 1.0
+
+# Tempo máximo que uma requisição espera pelo plano que outra requisição idêntica está gerando.
+ESPERA_MAXIMA_PLANO = 60
+
+PROMPT = (
+    "Você é um agrônomo especialista da empresa Araguaya Sementes. Um produtor rural no Brasil, "
+    "com as seguintes condições: clima '{clima}', tipo de solo '{solo}', e objetivo de plantio "
+    "'{objetivo}', selecionou a semente '{semente}'. Crie um plano de plantio simplificado e prático "
+    "em 3 etapas claras. Use uma linguagem direta e útil para o produtor. Formate a resposta em HTML "
+    "com um h5 para cada etapa e parágrafos para o texto. Exemplo: <h5>1. Preparo do Solo</h5><p>Texto da dica.</p>."
+)
+
+# Tags que o plano pode conter; todo o resto do HTML devolvido pela IA é escapado.
+TAGS_PERMITIDAS = ('h5', 'p', 'ul', 'ol', 'li', 'strong', 'em', 'br')
+RE_TAG_PERMITIDA = re.compile(r'&lt;(/?)(%s)\s*/?&gt;' % '|'.join(TAGS_PERMITIDAS), re.I)
+RE_CERCA_MARKDOWN = re.compile(r'^```(?:html)?\s*|\s*```$')
+
+
+class ErroPlanoPlantio(Exception):
+    """
+    A API de IA não conseguiu gerar o plano (fora do ar, limite de uso, resposta vazia).
+    """
+
+
+class PlanoIndisponivel(ErroPlanoPlantio):
+    """
+    O plano não pode ser gerado agora: nenhum backend configurado (PLANO_BACKEND vazio) ou
+    o pedido idêntico em andamento passou de ESPERA_MAXIMA_PLANO.
+    """
+
+
+# --- BACKENDS ---
+# Cada backend recebe o prompt e devolve o plano em HTML, ou levanta ErroPlanoPlantio.
+
+class GeminiBackend:
+    """
+    Gera o plano com a API do Gemini (PLANO_GEMINI_API_KEY e PLANO_GEMINI_MODELO).
+    """
+    def __init__(self):
+        self.sessao = requests.Session()
+
+    def gerar(self, prompt: str) -> str:
+        url = URL_GEMINI.format(modelo=settings.PLANO_GEMINI_MODELO)
+        payload = {'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]}
+        espera = ESPERA_INICIAL_API
+        for tentativa in range(1, TENTATIVAS_API + 1):
+            try:
+                resposta = self.sessao.post(
+                    url, params={'key': settings.PLANO_GEMINI_API_KEY}, json=payload, timeout=30,
+                )
+            except requests.RequestException as erro:
+                raise ErroPlanoPlantio(f'Falha de conexão com a API de IA: {erro}') from erro
+            if resposta.ok:
+                break
+            if (resposta.status_code == 429 or resposta.status_code >= 500) and tentativa < TENTATIVAS_API:
+                time.sleep(espera)
+                espera *= 2
+                continue
+            raise ErroPlanoPlantio(f'A API de IA respondeu com status {resposta.status_code}.')
+        try:
+            return resposta.json()['candidates'][0]['content']['parts'][0]['text']
+        except (ValueError, KeyError, IndexError) as erro:
+            raise ErroPlanoPlantio('Resposta da API de IA inválida ou vazia.') from erro
+
+
+class FalsoBackend:
+    """
+    Monta um plano fixo a partir do prompt, sem chamar nenhuma API. Conta as chamadas em
+    `chamadas` e pode demorar `latencia` segundos. Para testes e desenvolvimento sem chave.
+    """
+    def __init__(self, latencia=0.0):
+        self.latencia = latencia
+        self.chamadas = 0
+        self._lock = threading.Lock()
+
+    def gerar(self, prompt: str) -> str:
+        with self._lock:
+            self.chamadas += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+        semente = re.search(r"semente '([^']*)'", prompt).group(1)
+        return (
+            f'<h5>1. Preparo do Solo</h5><p>Corrija e adube o solo para a {semente}.</p>'
+            f'<h5>2. Plantio</h5><p>Semeie no início das chuvas.</p>'
+            f'<h5>3. Manejo</h5><p>Faça o primeiro pastejo quando a planta estiver estabelecida.</p>'
+        )
+
+
+def limpar_html(texto: str) -> str:
+    """
+    Deixa só as tags simples de TAGS_PERMITIDAS (sem atributos): o plano é inserido na
+    página com innerHTML, então nada vindo da IA pode virar script ou link.
+    """
+    texto = RE_CERCA_MARKDOWN.sub('', texto.strip())
+    return RE_TAG_PERMITIDA.sub(lambda match: f'<{match.group(1)}{match.group(2).lower()}>', html.escape(texto, quote=False))
+
+
+# --- PROXY COM CACHE ---
+
+class ProxyPlanoPlantio:
+    """
+    Intermediário entre o site e a API de IA. Os planos ficam guardados pelo prompt, que
+    traz os nomes atuais da semente e das características (renomeá-los no admin gera um
+    plano novo):
+
+    - na memória do processo, com no máximo `tamanho` planos (os menos usados saem primeiro)
+      e validade de `ttl` segundos;
+    - no cache compartilhado, pela mesma validade, para os outros workers.
+
+    Pedidos idênticos simultâneos esperam a mesma chamada à API em vez de fazer outra.
+    """
+
+    def __init__(self, backend, tamanho=1000, ttl=60 * 60 * 24):
+        self.backend = backend
+        self.ttl = ttl
+        self._planos = TTLCache(maxsize=tamanho, ttl=ttl)
+        self._em_andamento = {}  # chave -> Future
+        self._lock = threading.Lock()
+
+    def gerar(self, semente_id: int, clima: str, solo: str, objetivo: str) -> str:
+        chave = montar_prompt(semente_id, clima, solo, objetivo)
+        with self._lock:
+            plano = self._planos.get(chave)
+            if plano is not None:
+                return plano
+            futuro = self._em_andamento.get(chave)
+            dono = futuro is None
+            if dono:
+                futuro = self._em_andamento[chave] = Future()
+        if not dono:
+            try:
+                return futuro.result(timeout=ESPERA_MAXIMA_PLANO)
+            except TempoEsgotado:
+                raise PlanoIndisponivel('O plano idêntico em andamento demorou demais.') from None
+
+        try:
+            plano = self._gerar(chave)
+        except BaseException as erro:
+            futuro.set_exception(erro)
+            raise
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+        with self._lock:
+            self._planos[chave] = plano
+        futuro.set_result(plano)
+        return plano
+
+    def _gerar(self, prompt: str) -> str:
+        chave_cache = 'core:plano:' + hashlib.md5(prompt.encode(), usedforsecurity=False).hexdigest()
+        plano = cache.get(chave_cache)
+        if plano is None:
+            plano = limpar_html(self.backend.gerar(prompt))
+            cache.set(chave_cache, plano, self.ttl)
+        return plano
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._planos.clear()
+
+
+def normalizar_pedido(dados) -> tuple:
+    """
+    Valida o pedido {'semente', 'clima', 'solo', 'objetivo'} e devolve a chave normalizada
+    (id da semente, slug do clima, do solo e do objetivo). Critérios vazios viram 'todos'.
+    Levanta ValueError se algum valor não existir.
+    """
+    try:
+        semente_id = int(dados.get('semente'))
+    except (TypeError, ValueError):
+        raise ValueError('Semente inválida.')
+    opcoes = obter_indice().caracteristicas
+    criterios = []
+    for categoria in CATEGORIAS:
+        slug = str(dados.get(categoria) or 'todos').strip().lower()
+        if slug != 'todos' and slug not in {opcao['slug'] for opcao in opcoes[categoria]}:
+            raise ValueError(f'Valor inválido para {categoria}.')
+        criterios.append(slug)
+    return (semente_id, *criterios)
+
+
+def montar_prompt(semente_id: int, *slugs) -> str:
+    # Nomes lidos do índice de recomendação (em memória, refeito a cada versão do conteúdo).
+    indice = obter_indice()
+    semente = indice.por_pk.get(semente_id)
+    if semente is None:
+        raise Semente.DoesNotExist(semente_id)
+    nome = semente.nome
+    opcoes = indice.caracteristicas
+    nomes = {
+        categoria: next((opcao['nome'] for opcao in opcoes[categoria] if opcao['slug'] == slug), 'qualquer')
+        for categoria, slug in zip(CATEGORIAS, slugs)
+    }
+    return PROMPT.format(semente=nome, **nomes)
+
+
+@functools.cache
+def obter_proxy() -> ProxyPlanoPlantio:
+    if not settings.PLANO_BACKEND:
+        raise PlanoIndisponivel('Nenhum backend de plano de plantio configurado (PLANO_BACKEND).')
+    return ProxyPlanoPlantio(
+        import_string(settings.PLANO_BACKEND)(),
+        tamanho=settings.PLANO_CACHE_TAMANHO,
+        ttl=settings.PLANO_CACHE_TTL,
+    )
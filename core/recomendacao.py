@@ -0,0 +1,81 @@
+# core/recomendacao.py
+
+from .cache import em_memoria_por_versao
+from .models import CaracteristicaCultivo, Semente
+
+CATEGORIAS = [categoria for categoria, _ in CaracteristicaCultivo.Categoria.choices]
+
+
+class IndiceRecomendacao:
+    """
+    Índice invertido do seletor "Encontrar Semente Ideal".
+
+    Cada característica (ex: ('clima', 'tropical')) aponta para um bitset (um int do
+    Python) em que o bit `i` indica que a i-ésima semente, em ordem alfabética, tem
+    aquela característica. Uma busca é só um punhado de operações de bits, sem passar
+    por todas as sementes nem consultar o banco.
+    """
+
+    def __init__(self, sementes, caracteristicas, bitsets):
+        self.sementes = sementes              # lista de Semente, na ordem dos bits
+        self.por_pk = {semente.pk: semente for semente in sementes}
+        self.caracteristicas = caracteristicas  # {categoria: [{'slug', 'nome'}, ...]}
+        self.bitsets = bitsets                # {(categoria, slug): int}
+
+    @classmethod
+    def construir(cls):
+        sementes = list(Semente.objects.only('id', 'nome', 'utilizacao', 'imagem'))
+        posicoes = {semente.pk: posicao for posicao, semente in enumerate(sementes)}
+
+        caracteristicas = {categoria: [] for categoria in CATEGORIAS}
+        bitsets = {}
+        for categoria, slug, nome in CaracteristicaCultivo.objects.values_list('categoria', 'slug', 'nome'):
+            caracteristicas[categoria].append({'slug': slug, 'nome': nome})
+            bitsets[(categoria, slug)] = 0
+
+        ligacoes = Semente.caracteristicas.through.objects.values_list(
+            'semente_id', 'caracteristicacultivo__categoria', 'caracteristicacultivo__slug'
+        )
+        for semente_id, categoria, slug in ligacoes:
+            bitsets[(categoria, slug)] |= 1 << posicoes[semente_id]
+
+        return cls(sementes, caracteristicas, bitsets)
+
+    def recomendar(self, criterios: dict, limite: int = None) -> list:
+        """
+        Retorna [(semente, pontuação), ...] ordenado pela pontuação (quantos critérios a
+        semente atende) e depois pelo nome. `criterios` é um dict {categoria: slug}; sem
+        nenhum critério, todas as sementes são retornadas com pontuação 0.
+
+        Levanta KeyError se algum critério não existir no índice.
+        """
+        mascaras = [self.bitsets[(categoria, slug)] for categoria, slug in criterios.items()]
+        if not mascaras:
+            resultado = [(semente, 0) for semente in self.sementes]
+            return resultado[:limite] if limite else resultado
+
+        # Sementes que atendem a pelo menos um critério.
+        candidatas = 0
+        for mascara in mascaras:
+            candidatas |= mascara
+
+        resultado = []
+        while candidatas:
+            bit = candidatas & -candidatas
+            posicao = bit.bit_length() - 1
+            pontuacao = sum(1 for mascara in mascaras if mascara & bit)
+            resultado.append((posicao, pontuacao))
+            candidatas ^= bit
+
+        resultado.sort(key=lambda item: (-item[1], item[0]))
+        if limite:
+            resultado = resultado[:limite]
+        return [(self.sementes[posicao], pontuacao) for posicao, pontuacao in resultado]
+
+
+@em_memoria_por_versao
+def obter_indice() -> IndiceRecomendacao:
+    """
+    Índice de recomendação do processo atual, reconstruído quando o conteúdo muda.
+    """
+    return IndiceRecomendacao.construir()
@@ -0,0 +1,81 @@
+# core/roteamento.py
+
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from .cache import aobter_versao_conteudo, obter_versao_conteudo
+
+# Alias da réplica de leitura em settings.DATABASES (definida por DATABASE_REPLICA_URL).
+BANCO_REPLICA = 'replica'
+
+# Banco usado pelas leituras do contexto atual (requisição ou tarefa). None: o padrão do
+# Django, ou seja, o banco principal.
+banco_de_leitura = ContextVar('banco_de_leitura', default=None)
+
+
+def replica_configurada() -> bool:
+    return BANCO_REPLICA in connections.settings
+
+
+def _pode_usar_replica(versao: int) -> bool:
+    # Logo depois de uma edição a réplica pode ainda não ter recebido a alteração. Como a
+    # versão do conteúdo é o horário (em ms) da última edição, dentro dessa janela as
+    # leituras continuam no principal, e a página não é guardada em cache com dados antigos.
+    atraso = getattr(settings, 'REPLICA_ATRASO_MAXIMO', 5)
+    return time.time() * 1000 - versao >= atraso * 1000
+
+
+def ler_da_replica(view_func):
+    """
+    Decorator para views públicas que só leem do banco: as consultas feitas durante a view
+    vão para a réplica de leitura, quando existe uma. Deve ficar logo acima da view (abaixo
+    do cache_por_versao), para não custar nada quando a resposta sai do cache.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            if not replica_configurada() or not _pode_usar_replica(await aobter_versao_conteudo()):
+                return await view_func(request, *args, **kwargs)
+            token = banco_de_leitura.set(BANCO_REPLICA)
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                banco_de_leitura.reset(token)
+        return _wrapped_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if not replica_configurada() or not _pode_usar_replica(obter_versao_conteudo()):
+            return view_func(request, *args, **kwargs)
+        token = banco_de_leitura.set(BANCO_REPLICA)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            banco_de_leitura.reset(token)
+    return _wrapped_view
+
+
+class RoteadorDeLeitura:
+    """
+    Router de banco (settings.DATABASE_ROUTERS). Fora das views marcadas com
+    @ler_da_replica (admin, comandos, worker de cotações) tudo fica no banco principal;
+    escritas e migrações sempre vão para ele.
+    """
+
+    def db_for_read(self, model, **hints):
+        return banco_de_leitura.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # A réplica tem os mesmos dados do principal.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
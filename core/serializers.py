@@ -0,0 +1,39 @@
+# core/serializers.py
+
+from .models import Semente
+
+# Campos que a API de sementes expõe, na ordem em que aparecem no JSON.
+# O modal de detalhes do front-end usa todos eles.
+CAMPOS_SEMENTE = (
+    'id',
+    'nome',
+    'nome_cientifico',
+    'paragrafo_descricao',
+    'imagem_url',
+    'origem',
+    'forma_crescimento',
+    'altura',
+    'utilizacao',
+    'digestibilidade',
+    'palatabilidade',
+    'tolerancia_seca',
+    'tolerancia_frio',
+    'proteina_bruta',
+    'producao_materia_seca',
+    'consorciacao',
+    'pragas',
+    'adubacao_formacao',
+)
+
+
+def serializar_semente(semente: Semente, campos=CAMPOS_SEMENTE) -> dict:
+    """
+    Monta o dicionário de uma semente para a API, contendo apenas os `campos` pedidos.
+    """
+    data = {}
+    for campo in campos:
+        if campo == 'imagem_url':
+            data[campo] = semente.imagem.url if semente.imagem else ''
+        else:
+            data[campo] = getattr(semente, campo)
+    return data
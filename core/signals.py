@@ -0,0 +1,89 @@
+# core/signals.py
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from .busca import atualizar_vetor_busca
+from .cache import antes_do_aquecimento, registrar_alteracao_de_conteudo
+from .cdn import chaves_do_objeto
+from .imagens import CAMPOS_DE_IMAGEM, apagar_derivados, derivados_habilitados, gerar_derivados_da_instancia
+from .models import (
+    FAQ,
+    CaracteristicaCultivo,
+    ConfiguracoesGerais,
+    ConteudoTexto,
+    Diferencial,
+    HeroSlide,
+    ImagemSobreNos,
+    ItemNavegacao,
+    Semente,
+)
+
+# Modelos cujo conteúdo aparece no site. Qualquer alteração neles (pelo admin ou não)
+# gera uma nova versão do conteúdo e, com isso, invalida as páginas em cache; depois do
+# commit, as páginas principais são remontadas (ver core.cache.aquecer_cache).
+MODELOS_DE_CONTEUDO = (
+    ConteudoTexto,
+    HeroSlide,
+    Semente,
+    Diferencial,
+    FAQ,
+    ConfiguracoesGerais,
+    ItemNavegacao,
+    ImagemSobreNos,
+    CaracteristicaCultivo,
+)
+
+
+def imagens_enviadas(sender, instance, **kwargs):
+    # Antes do save, os arquivos recém-enviados ainda não foram gravados no storage: são
+    # eles que precisam de derivados novos, mesmo que o nome seja o do arquivo anterior.
+    instance._imagens_enviadas = {
+        nome for nome in CAMPOS_DE_IMAGEM[sender]
+        if getattr(instance, nome) and not getattr(instance, nome)._committed
+    }
+
+
+def imagem_salva(sender, instance, **kwargs):
+    # Gera as versões redimensionadas (AVIF/WebP/JPEG) das imagens depois do commit, fora
+    # da transação do admin, e antes de as páginas serem remontadas com elas. Imagens que
+    # já têm derivados são ignoradas, então salvar sem trocar a imagem é barato.
+    if derivados_habilitados():
+        campos_novos = getattr(instance, '_imagens_enviadas', set())
+        antes_do_aquecimento(lambda: gerar_derivados_da_instancia(instance, campos_novos=campos_novos))
+
+
+def imagem_apagada(sender, instance, **kwargs):
+    def apagar():
+        for nome in CAMPOS_DE_IMAGEM[sender]:
+            apagar_derivados(getattr(instance, nome))
+    antes_do_aquecimento(apagar)
+
+
+for modelo in CAMPOS_DE_IMAGEM:
+    pre_save.connect(imagens_enviadas, sender=modelo, dispatch_uid=f'imagens_enviadas_{modelo.__name__}')
+    post_save.connect(imagem_salva, sender=modelo, dispatch_uid=f'imagem_salva_{modelo.__name__}')
+    post_delete.connect(imagem_apagada, sender=modelo, dispatch_uid=f'imagem_apagada_{modelo.__name__}')
+
+
+def conteudo_alterado(sender, instance, **kwargs):
+    registrar_alteracao_de_conteudo(chaves_do_objeto(instance))
+
+
+def caracteristicas_alteradas(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        registrar_alteracao_de_conteudo(chaves_do_objeto(instance))
+
+
+for modelo in MODELOS_DE_CONTEUDO:
+    post_save.connect(conteudo_alterado, sender=modelo, dispatch_uid=f'conteudo_alterado_save_{modelo.__name__}')
+    post_delete.connect(conteudo_alterado, sender=modelo, dispatch_uid=f'conteudo_alterado_delete_{modelo.__name__}')
+
+m2m_changed.connect(caracteristicas_alteradas, sender=Semente.caracteristicas.through, dispatch_uid='caracteristicas_alteradas')
+
+
+def semente_salva(sender, instance, **kwargs):
+    # Mantém o vetor de busca do PostgreSQL em dia (nos outros bancos não faz nada).
+    atualizar_vetor_busca([instance.pk])
+
+
+post_save.connect(semente_salva, sender=Semente, dispatch_uid='semente_salva_busca')
@@ -0,0 +1,229 @@
+# core/storage.py
+
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils.module_loading import import_string
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .desempenho import medir
+
+# Por quanto tempo a URL de um arquivo público (sem assinatura) fica guardada na memória.
+TEMPO_URL_PUBLICA = 60 * 60
+
+# URLs assinadas (GCS com querystring_auth) são guardadas por essa fração da validade
+# delas, para nunca entregar ao navegador uma URL prestes a expirar.
+FRACAO_VALIDADE_URL_ASSINADA = 0.5
+
+# Quantas URLs ficam na memória de cada processo (as menos usadas saem primeiro).
+MAX_URLS_EM_MEMORIA = 5000
+
+
+class StorageMedido(Storage):
+    """
+    Storage de mídia que repassa tudo para o storage real (sistema de arquivos local ou
+    Google Cloud Storage) e mede cada chamada no Server-Timing ('storage').
+
+    As URLs geradas ficam na memória do processo: no GCS, gerar uma URL assinada custa
+    uma assinatura (às vezes uma chamada de rede) por imagem, a cada renderização. Com
+    `resolver_urls()`, as URLs de uma página inteira são geradas de uma vez, em paralelo.
+
+    Configurado em settings.STORAGES['default'], com o storage real em OPTIONS['backend']
+    e as opções dele em OPTIONS['opcoes'].
+
+    O storage real (e, no GCS, o cliente do Google Cloud) só é importado e criado no primeiro
+    uso, e `descartar_backend()` o recria depois de um fork: conexões de rede não podem ser
+    compartilhadas entre o processo mestre do Gunicorn e os workers.
+    """
+
+    def __init__(self, backend='django.core.files.storage.FileSystemStorage', opcoes=None, tempo_url=None, paralelismo=8):
+        self.backend = backend
+        self.opcoes = opcoes or {}
+        self.tempo_url = tempo_url
+        self.paralelismo = paralelismo
+        self._interno = None
+        self._urls = OrderedDict()  # nome -> (url, válida até)
+        self._lock = threading.Lock()
+
+    @property
+    def interno(self):
+        if self._interno is None:
+            with self._lock:
+                if self._interno is None:
+                    self._interno = import_string(self.backend)(**self.opcoes)
+        return self._interno
+
+    def descartar_backend(self) -> None:
+        """
+        Esquece o storage real (será recriado no próximo uso). As URLs guardadas continuam.
+        """
+        self._interno = None
+
+    def _tempo_url(self) -> float:
+        if self.tempo_url is not None:
+            return self.tempo_url
+        expiracao = getattr(self.interno, 'expiration', None)
+        if getattr(self.interno, 'querystring_auth', False) and expiracao:
+            segundos = expiracao.total_seconds() if isinstance(expiracao, timedelta) else expiracao
+            return segundos * FRACAO_VALIDADE_URL_ASSINADA
+        return TEMPO_URL_PUBLICA
+
+    def _url_guardada(self, name):
+        with self._lock:
+            guardada = self._urls.get(name)
+            if guardada is None:
+                return None
+            if guardada[1] <= time.monotonic():
+                del self._urls[name]
+                return None
+            self._urls.move_to_end(name)
+            return guardada[0]
+
+    def _guardar_urls(self, urls: dict) -> None:
+        validade = time.monotonic() + self._tempo_url()
+        with self._lock:
+            for name, url in urls.items():
+                self._urls[name] = (url, validade)
+                self._urls.move_to_end(name)
+            while len(self._urls) > MAX_URLS_EM_MEMORIA:
+                self._urls.popitem(last=False)
+
+    def _esquecer_url(self, name) -> None:
+        with self._lock:
+            self._urls.pop(name, None)
+
+    def limpar_urls(self) -> None:
+        with self._lock:
+            self._urls.clear()
+
+    def resolver_urls(self, names) -> dict:
+        """
+        Gera de uma vez as URLs de vários arquivos (as que ainda não estão na memória),
+        em paralelo, e retorna {nome: url}.
+        """
+        urls = {}
+        faltando = []
+        for name in dict.fromkeys(names):
+            url = self._url_guardada(name)
+            if url is None:
+                faltando.append(name)
+            else:
+                urls[name] = url
+        if faltando:
+            with medir('storage'):
+                if len(faltando) == 1 or self.paralelismo <= 1:
+                    novas = {name: self.interno.url(name) for name in faltando}
+                else:
+                    with ThreadPoolExecutor(max_workers=min(self.paralelismo, len(faltando))) as executor:
+                        novas = dict(zip(faltando, executor.map(self.interno.url, faltando)))
+            self._guardar_urls(novas)
+            urls.update(novas)
+        return urls
+
+    def _open(self, name, mode='rb'):
+        with medir('storage'):
+            return self.interno.open(name, mode)
+
+    def save(self, name, content, max_length=None):
+        with medir('storage'):
+            name = self.interno.save(name, content, max_length=max_length)
+        self._esquecer_url(name)
+        return name
+
+    def _save(self, name, content):
+        return self.interno._save(name, content)
+
+    def get_valid_name(self, name):
+        return self.interno.get_valid_name(name)
+
+    def get_available_name(self, name, max_length=None):
+        return self.interno.get_available_name(name, max_length=max_length)
+
+    def generate_filename(self, filename):
+        return self.interno.generate_filename(filename)
+
+    def path(self, name):
+        return self.interno.path(name)
+
+    def delete(self, name):
+        self._esquecer_url(name)
+        with medir('storage'):
+            return self.interno.delete(name)
+
+    def exists(self, name):
+        with medir('storage'):
+            return self.interno.exists(name)
+
+    def listdir(self, path):
+        with medir('storage'):
+            return self.interno.listdir(path)
+
+    def size(self, name):
+        with medir('storage'):
+            return self.interno.size(name)
+
+    def url(self, name):
+        url = self._url_guardada(name)
+        if url is None:
+            with medir('storage'):
+                url = self.interno.url(name)
+            self._guardar_urls({name: url})
+        return url
+
+    def get_accessed_time(self, name):
+        return self.interno.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.interno.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.interno.get_modified_time(name)
+
+
+class StorageAssinadoFalso(FileSystemStorage):
+    """
+    Storage local que imita o GCS com URLs assinadas (querystring_auth): grava no disco,
+    mas cada URL leva uma validade e uma assinatura, e pode demorar `latencia` segundos
+    para ser gerada. Conta as URLs geradas em `urls_geradas`. Para testes e desenvolvimento
+    sem acesso ao GCS: MEDIA_STORAGE_BACKEND=core.storage.StorageAssinadoFalso.
+    """
+    querystring_auth = True
+
+    def __init__(self, expiration=timedelta(hours=1), latencia=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.expiration = expiration
+        self.latencia = latencia
+        self.urls_geradas = 0
+        self._lock = threading.Lock()
+
+    def url(self, name):
+        with self._lock:
+            self.urls_geradas += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+        expira = int(time.time() + self.expiration.total_seconds())
+        assinatura = hmac.new(settings.SECRET_KEY.encode(), f'{name}:{expira}'.encode(), hashlib.sha256).hexdigest()[:16]
+        return f'{super().url(name)}?Expires={expira}&Signature={assinatura}'
+
+
+class EstaticosComManifest(CompressedManifestStaticFilesStorage):
+    """
+    CompressedManifestStaticFilesStorage do Whitenoise que, enquanto o collectstatic não
+    foi rodado (sem manifesto: testes, ambiente local), usa o nome original dos arquivos
+    em vez de falhar. Com o manifesto presente, um arquivo ausente continua sendo erro.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            if self.hashed_files:
+                raise
+            return name
@@ -0,0 +1,34 @@
+# core/templatetags/assets.py
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from ..assets import SPRITE_ICONES, assets_construidos as _assets_construidos, icones_do_sprite
+
+register = template.Library()
+
+
+@register.simple_tag
+def assets_construidos() -> bool:
+    """
+    Uso: {% assets_construidos as assets_locais %}{% if assets_locais %}...{% endif %}
+    """
+    return _assets_construidos()
+
+
+@register.simple_tag
+def icone(nome, classe=''):
+    """
+    Renderiza um ícone do Lucide. Com os assets gerados, usa o sprite local; senão (ou se
+    o ícone não está no sprite, ex: escolhido no admin depois do último 'construir_assets'),
+    o <i data-lucide> que o script do Lucide (CDN) troca pelo SVG.
+
+    Uso: {% icone "menu" "h-7 w-7" %}
+    """
+    if not _assets_construidos() or nome not in icones_do_sprite():
+        return format_html('<i data-lucide="{}" class="{}"></i>', nome, classe)
+    return format_html(
+        '<svg class="lucide lucide-{} {}" width="24" height="24" aria-hidden="true"><use href="{}#{}"></use></svg>',
+        nome, classe, static(SPRITE_ICONES), nome,
+    )
@@ -0,0 +1,114 @@
+# core/templatetags/imagens.py
+
+from django import template
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from ..imagens import (
+    FORMATOS_MODERNOS,
+    LARGURAS_DERIVADOS,
+    formato_fallback,
+    formatos_derivados,
+    largura_mais_proxima,
+    larguras_da_imagem,
+    nome_derivado,
+)
+
+register = template.Library()
+
+
+def _url(campo, largura: int, extensao: str) -> str:
+    return campo.storage.url(nome_derivado(campo.name, largura, extensao))
+
+
+def _srcset(campo, larguras, extensao: str) -> str:
+    return ', '.join(f'{_url(campo, largura, extensao)} {largura}w' for largura in larguras)
+
+
+def _css_url(url: str) -> str:
+    # Dentro de <style> o HTML não é "desescapado", então a URL é escapada para CSS.
+    escapada = url.replace('\\', '\\\\').replace('"', '\\"').replace('<', '\\3c ').replace('\n', '')
+    return f'url("{escapada}")'
+
+
+@register.simple_tag
+def imagem_responsiva(campo, alt='', classe='', sizes='100vw', loading='lazy'):
+    """
+    Renderiza um <picture> com AVIF/WebP/JPEG em várias larguras (srcset/sizes).
+
+    Uso: {% imagem_responsiva semente.imagem alt=semente.nome classe="w-full h-48" sizes="25vw" %}
+    """
+    if not campo:
+        return ''
+    larguras = larguras_da_imagem(campo)
+    if not larguras:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="{}">', campo.url, alt, classe, loading)
+
+    fontes = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        ((mime, _srcset(campo, larguras, extensao), sizes) for extensao, _, mime in FORMATOS_MODERNOS),
+    )
+    extensao = formato_fallback(campo.name)[0]
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}" decoding="async"></picture>',
+        fontes,
+        _url(campo, largura_mais_proxima(larguras, LARGURAS_DERIVADOS[1]), extensao),
+        _srcset(campo, larguras, extensao),
+        sizes,
+        alt,
+        classe,
+        loading,
+    )
+
+
+@register.simple_tag
+def url_derivado(campo, largura):
+    """
+    URL de um único derivado (no formato de fallback), útil para <img> simples como os logos.
+    """
+    if not campo:
+        return ''
+    larguras = larguras_da_imagem(campo)
+    if not larguras:
+        return campo.url
+    return _url(campo, largura_mais_proxima(larguras, int(largura)), formato_fallback(campo.name)[0])
+
+
+@register.simple_tag
+def fundo_responsivo(campo, *partes_id, sobreposicao=''):
+    """
+    Gera regras CSS de background-image responsivo para o elemento `#<partes_id>`.
+
+    Usa image-set() para escolher entre AVIF/WebP/JPEG e media queries para escolher a
+    largura, considerando telas de alta densidade (a imagem tem ~2x a largura da tela).
+    `sobreposicao` é uma camada desenhada por cima da imagem (ex: um linear-gradient).
+
+    Uso (dentro de <style>): {% fundo_responsivo slide.imagem "hero-slide" slide.pk %}
+    """
+    if not campo:
+        return ''
+    seletor = '#' + '-'.join(str(parte) for parte in partes_id)
+    camada = f'{sobreposicao}, ' if sobreposicao else ''
+
+    larguras = larguras_da_imagem(campo)
+    if not larguras:
+        return mark_safe(f'{seletor} {{ background-image: {camada}{_css_url(campo.url)}; }}')
+
+    regras = []
+    extensao_fallback = formato_fallback(campo.name)[0]
+    limites = (0,) + LARGURAS_DERIVADOS[:-2]
+    for limite, largura in zip(limites, LARGURAS_DERIVADOS[1:]):
+        largura = largura_mais_proxima(larguras, largura)
+        opcoes = ', '.join(
+            f'{_css_url(_url(campo, largura, extensao))} type("{mime}")'
+            for extensao, _, mime in formatos_derivados(campo.name)
+        )
+        regra = (
+            f'{seletor} {{ background-image: {camada}{_css_url(_url(campo, largura, extensao_fallback))}; '
+            f'background-image: {camada}image-set({opcoes}); }}'
+        )
+        if limite:
+            regra = f'@media (min-width: {limite + 1}px) {{ {regra} }}'
+        regras.append(regra)
+    return mark_safe('\n'.join(regras))
@@ -1,3 +1,1418 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import runpy
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from .assets import fontes_locais, icones_do_sprite, icones_usados, montar_sprite
+from .cache import (
+    CHAVE_VERSAO_CONTEUDO, _expirou_ou_antecipou, cache_de_paginas, incrementar_versao_conteudo, limpar_caches,
+)
+from .catalogo import ErroImportacao, importar_catalogo
+from .cdn import obter_purgador
+from .compressao import escolher_codificacao
+from .conteudo import obter_configuracoes, obter_textos
+from .benchmark import PREFIXO, comparar_com_baseline, medir_em_processo, popular_banco, remover_dados
+from .cotacoes import MAX_TENTATIVAS, processar_lote
+from . import exportacao
+from .limites import LIMITE_COTACAO_POR_IP, ip_do_cliente, memoria_local
+from .inicializacao import aquecer_processo, ler_importtime, tempo_por_pacote
+from .imagens import LARGURAS_DERIVADOS, formatos_derivados, nome_derivado
+from .models import (
+    FAQ,
+    CaracteristicaCultivo,
+    ConfiguracoesGerais,
+    ConteudoTexto,
+    DerivadosImagem,
+    Diferencial,
+    HeroSlide,
+    Semente,
+    SolicitacaoCotacao,
+)
+from .plano_plantio import ErroPlanoPlantio, FalsoBackend, ProxyPlanoPlantio, limpar_html, obter_proxy
+from .recomendacao import obter_indice
+from .roteamento import BANCO_REPLICA
+from .storage import StorageMedido
+from .views import FRAGMENTOS_DA_HOME
+
+# Os limites de uso da API (core/limites.py) guardam estado entre os testes e recusariam
+# os POSTs repetidos: ficam desligados, menos em LimitesDeUsoTests.
+_sem_limites = override_settings(LIMITES_ATIVOS=False)
+
+
+def setUpModule():
+    _sem_limites.enable()
+
+
+def tearDownModule():
+    _sem_limites.disable()
+
+
+def criar_conteudo_basico():
+    """
+    Cria um conjunto mínimo de conteúdo para renderizar a home.
+    Os arquivos de imagem não precisam existir: só o nome é usado para montar a URL.
+    """
+    ConfiguracoesGerais.objects.create(
+        imagem_fundo_dicas='config/fundo.jpg',
+        mapa_url='https://www.google.com/maps/embed?pb=teste',
+    )
+    HeroSlide.objects.create(titulo='Slide', subtitulo='Subtítulo', imagem='hero_slides/slide.jpg')
+    ConteudoTexto.objects.create(chave='hero_titulo', valor='Qualidade que dá lucro')
+    FAQ.objects.create(pergunta='Qual o prazo de entrega?', resposta='Até 10 dias.')
+    return Semente.objects.create(
+        nome='Mombaça',
+        tipo='Panicum',
+        nome_cientifico='Panicum maximum',
+        imagem='sementes/mombaca.jpg',
+        paragrafo_descricao='Alta produção de forragem.',
+        tolerancia_seca='Média',
+        aparece_na_comparacao=True,
+    )
+
+
+class CachePaginaInicialTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        criar_conteudo_basico()
+
+    def test_segunda_requisicao_nao_consulta_o_banco(self):
+        primeira = self.client.get('/')
+        self.assertEqual(primeira.status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            segunda = self.client.get('/')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(segunda.content, primeira.content)
+
+    def test_edicao_no_admin_invalida_a_pagina(self):
+        self.client.get('/')
+        texto = ConteudoTexto.objects.get(chave='hero_titulo')
+        texto.valor = 'Novo título da home'
+        texto.save()
+
+        response = self.client.get('/')
+        self.assertContains(response, 'Novo título da home')
+
+    def test_exclusao_invalida_a_pagina(self):
+        self.assertContains(self.client.get('/fragmentos/faq/'), 'Qual o prazo de entrega?')
+        FAQ.objects.all().delete()
+        self.assertNotContains(self.client.get('/fragmentos/faq/'), 'Qual o prazo de entrega?')
+
+
+class GetCondicionalTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        self.semente = criar_conteudo_basico()
+
+    def test_home_repetida_responde_304_sem_consultas(self):
+        primeira = self.client.get('/')
+        self.assertIn('ETag', primeira)
+        # Sem Last-Modified: duas edições no mesmo segundo teriam a mesma data.
+        self.assertNotIn('Last-Modified', primeira)
+
+        with CaptureQueriesContext(connection) as queries:
+            segunda = self.client.get('/', HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(segunda.status_code, 304)
+        self.assertEqual(segunda.content, b'')
+        self.assertEqual(len(queries), 0)
+
+    def test_api_semente_repetida_responde_304_sem_consultas(self):
+        url = f'/api/semente/{self.semente.pk}/'
+        primeira = self.client.get(url)
+        self.assertEqual(primeira.json()['nome'], 'Mombaça')
+
+        with CaptureQueriesContext(connection) as queries:
+            segunda = self.client.get(url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(segunda.status_code, 304)
+        self.assertEqual(segunda.content, b'')
+        self.assertEqual(len(queries), 0)
+
+    def test_views_async_leem_a_versao_pela_api_async_do_cache(self):
+        urls = ('/', '/fragmentos/faq/', f'/api/semente/{self.semente.pk}/')
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        # Com as páginas já no cache, nada na requisição (fora das threads) lê a versão
+        # pela API síncrona.
+        with mock.patch('core.cache.obter_versao_conteudo', side_effect=AssertionError('API síncrona')):
+            for url in urls:
+                with self.subTest(url=url):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                    self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etags[url]).status_code, 304)
+
+    def test_etag_muda_quando_o_conteudo_muda(self):
+        url = f'/api/semente/{self.semente.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.semente.tolerancia_seca = 'Alta'
+        self.semente.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['tolerancia_seca'], 'Alta')
+
+
+class CatalogoSementesApiTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        self.mombaca = criar_conteudo_basico()
+        self.marandu = Semente.objects.create(
+            nome='Marandu',
+            tipo='Brachiaria',
+            nome_cientifico='Brachiaria brizantha',
+            imagem='sementes/marandu.jpg',
+            paragrafo_descricao='Boa cobertura de solo.',
+        )
+
+    def test_catalogo_usa_o_mesmo_formato_da_api_individual(self):
+        catalogo = self.client.get('/api/sementes/').json()['sementes']
+        individual = self.client.get(f'/api/semente/{self.mombaca.pk}/').json()
+        self.assertEqual([semente['nome'] for semente in catalogo], ['Marandu', 'Mombaça'])
+        self.assertIn(individual, catalogo)
+
+    def test_projecao_de_campos_e_selecao_por_ids(self):
+        response = self.client.get('/api/sementes/', {'fields': 'id,nome', 'ids': str(self.marandu.pk)})
+        self.assertEqual(response.json(), {'sementes': [{'id': self.marandu.pk, 'nome': 'Marandu'}]})
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get('/api/sementes/', {'fields': 'senha'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/sementes/', {'ids': '1,abc'}).status_code, 400)
+
+    def test_query_strings_ficam_no_cache_de_consultas(self):
+        self.client.get('/api/sementes/')
+        self.client.get('/api/sementes/', {'ids': str(self.marandu.pk)})
+        with self.assertNumQueries(0):
+            # Parâmetros que a view não usa caem na mesma entrada da página sem filtros.
+            self.client.get('/api/sementes/', {'utm_source': 'email', 'x': '123'})
+            self.client.get('/api/sementes/', {'ids': f' {self.marandu.pk} '})
+        # Esvaziar as consultas (ex: um visitante enchendo o cache de ?ids=...) não despeja a página.
+        cache_de_paginas(com_query=True).clear()
+        with self.assertNumQueries(0):
+            self.client.get('/api/sementes/')
+
+    def test_catalogo_comprimido_e_em_cache(self):
+        self.client.get('/api/sementes/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/sementes/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+
+class DerivadosDeImagemTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def criar_imagem(self, nome, tamanho=(2400, 1200)):
+        buffer = BytesIO()
+        Image.new('RGB', tamanho, 'green').save(buffer, 'JPEG')
+        return SimpleUploadedFile(nome, buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_gera_todas_as_larguras_e_formatos(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            slide = HeroSlide.objects.create(titulo='Slide', subtitulo='Sub', imagem=self.criar_imagem('campo.jpg'))
+        storage = slide.imagem.storage
+        # Nada é codificado dentro da transação do admin, só depois do commit.
+        self.assertFalse(storage.exists(nome_derivado(slide.imagem.name, 480, 'jpg')))
+        for callback in callbacks:
+            callback()
+        for largura in LARGURAS_DERIVADOS:
+            for extensao, _, _ in formatos_derivados(slide.imagem.name):
+                nome = nome_derivado(slide.imagem.name, largura, extensao)
+                self.assertTrue(storage.exists(nome), nome)
+
+        with storage.open(nome_derivado(slide.imagem.name, 960, 'webp')) as arquivo:
+            self.assertEqual(Image.open(arquivo).size, (960, 480))
+
+    def test_template_usa_srcset_e_image_set(self):
+        semente = criar_conteudo_basico()
+        with self.captureOnCommitCallbacks(execute=True):
+            semente.imagem = self.criar_imagem('mombaca.jpg', (600, 400))
+            semente.save()
+            HeroSlide.objects.update(imagem=self.criar_imagem('slide.jpg'))
+            slide = HeroSlide.objects.get()
+            slide.imagem = self.criar_imagem('slide.jpg')
+            slide.save()
+
+        html = self.client.get('/fragmentos/produtos/').content.decode()
+        self.assertIn('<source type="image/webp" srcset="', html)
+        # Só as larguras que existem: 480 e a própria largura original (600), sem ampliar.
+        self.assertIn(f'{nome_derivado(semente.imagem.name, 480, "jpg")} 480w', html)
+        self.assertIn(f'{nome_derivado(semente.imagem.name, 600, "jpg")} 600w', html)
+        self.assertNotIn('-960w', html)
+        self.assertIn('image-set(', self.client.get('/').content.decode())
+
+    def test_imagem_sem_derivados_usa_o_original(self):
+        criar_conteudo_basico()
+        html = self.client.get('/fragmentos/produtos/').content.decode()
+        self.assertIn('sementes/mombaca.jpg" alt="Mombaça"', html)
+        self.assertNotIn('srcset', html)
+
+    def test_novo_arquivo_com_o_mesmo_nome_regera_os_derivados(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            slide = HeroSlide.objects.create(titulo='Slide', subtitulo='Sub', imagem=self.criar_imagem('campo.jpg'))
+        storage = slide.imagem.storage
+        nome = slide.imagem.name
+        # Um storage que sobrescreve arquivos com o mesmo nome, como o GCS por padrão.
+        with mock.patch.object(storage.interno, '_allow_overwrite', True), self.captureOnCommitCallbacks(execute=True):
+            slide.imagem = self.criar_imagem('campo.jpg', (800, 400))
+            slide.save()
+        self.assertEqual(slide.imagem.name, nome)
+        self.assertEqual(DerivadosImagem.objects.get(nome=nome).larguras, [480, 800])
+        with storage.open(nome_derivado(nome, 480, 'jpg')) as arquivo:
+            self.assertEqual(Image.open(arquivo).size, (480, 240))
+        # As larguras que a imagem nova não tem foram apagadas.
+        self.assertFalse(storage.exists(nome_derivado(nome, 1440, 'jpg')))
+
+        # Salvar sem trocar a imagem não codifica nada de novo.
+        with mock.patch('core.imagens.Image.open') as abrir, self.captureOnCommitCallbacks(execute=True):
+            slide.save()
+        abrir.assert_not_called()
+
+    def test_derivados_apagados_com_o_registro(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            slide = HeroSlide.objects.create(titulo='Slide', subtitulo='Sub', imagem=self.criar_imagem('campo.jpg'))
+        nome = nome_derivado(slide.imagem.name, 480, 'webp')
+        self.assertTrue(slide.imagem.storage.exists(nome))
+        with self.captureOnCommitCallbacks(execute=True):
+            slide.delete()
+        self.assertFalse(slide.imagem.storage.exists(nome))
+        self.assertFalse(DerivadosImagem.objects.exists())
+
+    def test_comando_gera_derivados_das_imagens_existentes(self):
+        with self.settings(IMAGENS_RESPONSIVAS=False):
+            slide = HeroSlide.objects.create(titulo='Slide', subtitulo='Sub', imagem=self.criar_imagem('antiga.jpg'))
+        nome = nome_derivado(slide.imagem.name, 480, 'jpg')
+        self.assertFalse(slide.imagem.storage.exists(nome))
+
+        call_command('gerar_derivados', stdout=StringIO())
+        self.assertTrue(slide.imagem.storage.exists(nome))
+
+
+class BackendComFalha:
+    def enviar(self, solicitacao):
+        raise ConnectionError('SMTP fora do ar')
+
+
+class FilaDeCotacoesTests(TestCase):
+    def setUp(self):
+        self.arquivo = os.path.join(tempfile.mkdtemp(), 'cotacoes.jsonl')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.arquivo))
+
+    def enviar_cotacao(self, **dados):
+        corpo = {'nome': 'João', 'contato': 'joao@fazenda.com', 'produto': 'Sementes de Pastagem', 'mensagem': '10 sacos'}
+        corpo.update(dados)
+        return self.client.post('/api/solicitar-cotacao/', json.dumps(corpo), content_type='application/json')
+
+    def test_view_grava_a_solicitacao_sem_enviar(self):
+        with self.settings(COTACAO_BACKEND='core.tests.BackendComFalha'):
+            response = self.enviar_cotacao()
+        self.assertEqual(response.status_code, 200)
+        solicitacao = SolicitacaoCotacao.objects.get()
+        self.assertEqual(solicitacao.status, SolicitacaoCotacao.Status.PENDENTE)
+        self.assertEqual(solicitacao.mensagem, '10 sacos')
+
+    def test_view_rejeita_dados_invalidos(self):
+        self.assertEqual(self.enviar_cotacao(nome='').status_code, 400)
+        response = self.client.post('/api/solicitar-cotacao/', 'não é json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SolicitacaoCotacao.objects.exists())
+
+    def test_worker_envia_em_lote_pelo_backend_de_arquivo(self):
+        self.enviar_cotacao()
+        self.enviar_cotacao(nome='Maria')
+        with self.settings(COTACAO_BACKEND='core.cotacoes.ArquivoBackend', COTACAO_ARQUIVO=self.arquivo):
+            call_command('processar_cotacoes', '--uma-vez', stdout=StringIO())
+
+        with open(self.arquivo, encoding='utf-8') as arquivo:
+            nomes = sorted(json.loads(linha)['nome'] for linha in arquivo)
+        self.assertEqual(nomes, ['João', 'Maria'])
+        self.assertFalse(SolicitacaoCotacao.objects.exclude(status=SolicitacaoCotacao.Status.ENVIADA).exists())
+
+    def test_email_sem_destino_nao_inicia_o_worker(self):
+        self.enviar_cotacao()
+        with self.settings(COTACAO_BACKEND='core.cotacoes.EmailBackend', COTACAO_EMAIL_DESTINO=''):
+            with self.assertRaisesMessage(CommandError, 'COTACAO_EMAIL_DESTINO'):
+                call_command('processar_cotacoes', '--uma-vez', stdout=StringIO())
+        # A solicitação continua na fila, sem tentativas gastas.
+        self.assertEqual(SolicitacaoCotacao.objects.get().tentativas, 0)
+
+    def test_falha_reagenda_com_espera_crescente(self):
+        self.enviar_cotacao()
+        with self.assertLogs('core.cotacoes', 'WARNING'):
+            self.assertEqual(processar_lote(backend=BackendComFalha()), (0, 1))
+        solicitacao = SolicitacaoCotacao.objects.get()
+        self.assertEqual(solicitacao.tentativas, 1)
+        self.assertEqual(solicitacao.status, SolicitacaoCotacao.Status.PENDENTE)
+        self.assertIn('SMTP fora do ar', solicitacao.ultimo_erro)
+        self.assertGreater(solicitacao.proxima_tentativa_em, timezone.now())
+
+        # Ainda não chegou a hora da próxima tentativa.
+        self.assertEqual(processar_lote(backend=BackendComFalha()), (0, 0))
+
+        SolicitacaoCotacao.objects.update(proxima_tentativa_em=timezone.now(), tentativas=MAX_TENTATIVAS - 1)
+        with self.assertLogs('core.cotacoes', 'WARNING'):
+            processar_lote(backend=BackendComFalha())
+        self.assertEqual(SolicitacaoCotacao.objects.get().status, SolicitacaoCotacao.Status.FALHOU)
+
+
+class RecomendacaoSementesTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        caracteristicas = {c.slug: c for c in CaracteristicaCultivo.objects.all()}
+
+        def semente(nome, *slugs):
+            nova = Semente.objects.create(
+                nome=nome, tipo='Brachiaria', nome_cientifico=nome, imagem=f'sementes/{nome}.jpg',
+                paragrafo_descricao='...', utilizacao='Pastejo',
+            )
+            nova.caracteristicas.set([caracteristicas[slug] for slug in slugs])
+            return nova
+
+        self.marandu = semente('Marandu', 'tropical', 'argiloso', 'pastoreio')
+        self.mombaca = semente('Mombaça', 'tropical', 'argiloso', 'silagem')
+        self.piata = semente('Piatã', 'subtropical', 'arenoso', 'pastoreio')
+
+    def recomendar(self, **criterios):
+        response = self.client.get('/api/sementes/recomendar/', criterios)
+        self.assertEqual(response.status_code, 200)
+        return [(s['nome'], s['pontuacao']) for s in response.json()['sementes']]
+
+    def test_ordena_pela_quantidade_de_criterios_atendidos(self):
+        self.assertEqual(
+            self.recomendar(clima='tropical', objetivo='pastoreio'),
+            [('Marandu', 2), ('Mombaça', 1), ('Piatã', 1)],
+        )
+        self.assertEqual(self.recomendar(solo='arenoso', clima='todos'), [('Piatã', 1)])
+
+    def test_sem_criterios_retorna_todas(self):
+        self.assertEqual([nome for nome, _ in self.recomendar()], ['Marandu', 'Mombaça', 'Piatã'])
+
+    def test_indice_em_memoria_nao_consulta_o_banco(self):
+        obter_indice()
+        with CaptureQueriesContext(connection) as queries:
+            obter_indice().recomendar({'clima': 'tropical'})
+        self.assertEqual(len(queries), 0)
+
+    def test_indice_reconstruido_quando_as_caracteristicas_mudam(self):
+        self.assertEqual(self.recomendar(solo='arenoso'), [('Piatã', 1)])
+        self.marandu.caracteristicas.add(CaracteristicaCultivo.objects.get(slug='arenoso'))
+        self.assertEqual(self.recomendar(solo='arenoso'), [('Marandu', 1), ('Piatã', 1)])
+
+    def test_criterio_inexistente(self):
+        response = self.client.get('/api/sementes/recomendar/', {'clima': 'polar'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_limite_negativo_vale_como_um(self):
+        self.assertEqual(self.recomendar(clima='tropical', limite='-1'), [('Marandu', 1)])
+
+    def test_seletor_da_home_lista_as_caracteristicas_do_banco(self):
+        criar_conteudo_basico()
+        self.assertContains(self.client.get('/'), '<option value="semiarido">Semiárido</option>')
+
+
+class BuscaSementesTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        Semente.objects.create(
+            nome='Marandu', tipo='Brachiaria', nome_cientifico='Brachiaria brizantha cv. Marandu',
+            imagem='sementes/marandu.jpg', paragrafo_descricao='Resistente à cigarrinha-das-pastagens.',
+        )
+        Semente.objects.create(
+            nome='Mombaça', tipo='Panicum', nome_cientifico='Panicum maximum',
+            imagem='sementes/mombaca.jpg', paragrafo_descricao='Alta produção; vai bem com Brachiaria em consórcio.',
+            pragas='Cigarrinha',
+        )
+        Semente.objects.create(
+            nome='Estilosantes', tipo='Leguminosa', nome_cientifico='Stylosanthes',
+            imagem='sementes/estilosantes.jpg', paragrafo_descricao='Fixa nitrogênio.',
+        )
+
+    def buscar(self, q):
+        response = self.client.get('/api/sementes/buscar/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [semente['nome'] for semente in response.json()['sementes']]
+
+    def test_ignora_acentos_e_aceita_prefixo(self):
+        self.assertEqual(self.buscar('momba'), ['Mombaça'])
+        self.assertEqual(self.buscar('MOMBAÇA'), ['Mombaça'])
+        self.assertEqual(self.buscar('nitrogenio'), ['Estilosantes'])
+
+    def test_nome_pesa_mais_que_a_descricao(self):
+        self.assertEqual(self.buscar('brach'), ['Marandu', 'Mombaça'])
+
+    def test_todos_os_termos_precisam_aparecer(self):
+        self.assertEqual(self.buscar('cigarrinha panicum'), ['Mombaça'])
+
+    def test_tolera_erro_de_digitacao(self):
+        self.assertEqual(self.buscar('stylosantes'), ['Estilosantes'])
+
+    def test_consulta_curta_nao_busca(self):
+        self.assertEqual(self.buscar('m'), [])
+
+    def test_limite_fora_da_faixa_e_ajustado(self):
+        for limite in ('-1', '0'):
+            response = self.client.get('/api/sementes/buscar/', {'q': 'brach', 'limite': limite})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([s['nome'] for s in response.json()['sementes']], ['Marandu'])
+
+    def test_resultado_em_cache_e_atualizado_no_save(self):
+        self.buscar('estilo')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.buscar('estilo'), ['Estilosantes'])
+        self.assertEqual(len(queries), 0)
+
+        semente = Semente.objects.get(nome='Estilosantes')
+        semente.nome = 'Campo Grande'
+        semente.save()
+        self.assertEqual(self.buscar('estilo'), [])
+        self.assertEqual(self.buscar('campo gra'), ['Campo Grande'])
+
+
+class BenchmarkTests(TestCase):
+    def test_popular_e_remover_dados(self):
+        popular_banco(sementes=10, slides=2, faqs=3, textos=3)
+        self.assertEqual(Semente.objects.filter(nome__startswith=PREFIXO).count(), 10)
+        self.assertTrue(Semente.objects.filter(busca_principal__contains='benchmark').exists())
+        remover_dados()
+        self.assertFalse(Semente.objects.exists())
+        self.assertFalse(FAQ.objects.exists())
+        self.assertFalse(ConfiguracoesGerais.objects.exists())
+
+    def test_home_sem_consultas_com_cache_quente(self):
+        popular_banco(sementes=10, slides=2, faqs=3, textos=3)
+        resultado = medir_em_processo('GET', '/', repeticoes=2)
+        self.assertGreater(resultado['consultas_frio'], 0)
+        self.assertEqual(resultado['consultas_quente'], 0)
+
+    def test_cache_frio_nao_esvazia_os_caches_do_ambiente(self):
+        popular_banco(sementes=10, slides=2, faqs=3, textos=3)
+        cache.set('core:teste', 'mantido')
+        cache_de_paginas().set('core:teste', 'mantido')
+        resultado = medir_em_processo('GET', '/', repeticoes=2)
+        self.assertGreater(resultado['consultas_frio'], 0)
+        self.assertEqual(cache.get('core:teste'), 'mantido')
+        self.assertEqual(cache_de_paginas().get('core:teste'), 'mantido')
+
+    def test_comparar_com_baseline(self):
+        baseline = {'cenarios': {'index_view': {'consultas_quente': 0, 'p95_ms': 10.0}}}
+        self.assertEqual(comparar_com_baseline({'cenarios': {'index_view': {'consultas_quente': 0, 'p95_ms': 12.0}}}, baseline), [])
+        regressoes = comparar_com_baseline({'cenarios': {'index_view': {'consultas_quente': 1, 'p95_ms': 20.0}}}, baseline)
+        self.assertEqual(len(regressoes), 2)
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        default_storage.limpar_urls()
+        criar_conteudo_basico()
+
+    def test_cabecalho_com_banco_template_storage_e_total(self):
+        response = self.client.get('/')
+        server_timing = response['Server-Timing']
+        for categoria in ('db;dur=', 'template;dur=', 'storage;dur=', 'total;dur='):
+            self.assertIn(categoria, server_timing)
+
+        # Com a página em cache, não há consultas nem renderização.
+        server_timing = self.client.get('/')['Server-Timing']
+        self.assertNotIn('db;', server_timing)
+        self.assertNotIn('template;', server_timing)
+
+    @override_settings(DESEMPENHO_LIMITE_LENTO_MS=0)
+    def test_requisicao_lenta_registra_as_consultas(self):
+        with self.assertLogs('core.desempenho', 'WARNING') as logs:
+            self.client.get('/')
+        dados = json.loads(logs.records[0].getMessage().split(' ', 1)[1])
+        self.assertEqual(dados['caminho'], '/')
+        self.assertEqual(len(dados['consultas']), dados['db_chamadas'])
+        self.assertIn('SELECT', dados['consultas'][0]['sql'])
+
+
+class AssetsLocaisTests(TestCase):
+    def renderizar_icone(self):
+        return Template('{% load assets %}{% icone "menu" "h-7 w-7" %}').render(Context())
+
+    def test_icone_usa_cdn_enquanto_os_assets_nao_foram_gerados(self):
+        with mock.patch('core.templatetags.assets._assets_construidos', return_value=False):
+            self.assertEqual(self.renderizar_icone(), '<i data-lucide="menu" class="h-7 w-7"></i>')
+
+    def test_icone_usa_o_sprite_local(self):
+        with mock.patch('core.templatetags.assets._assets_construidos', return_value=True), \
+                mock.patch('core.templatetags.assets.icones_do_sprite', return_value=frozenset({'menu'})):
+            html = self.renderizar_icone()
+        self.assertIn('class="lucide lucide-menu h-7 w-7"', html)
+        self.assertIn('<use href="/static/icones/sprite.svg#menu">', html)
+
+    def test_icone_fora_do_sprite_usa_a_cdn(self):
+        # Ex: escolhido em um Diferencial depois do último 'construir_assets'.
+        with mock.patch('core.templatetags.assets._assets_construidos', return_value=True), \
+                mock.patch('core.templatetags.assets.icones_do_sprite', return_value=frozenset({'sprout'})):
+            self.assertEqual(self.renderizar_icone(), '<i data-lucide="menu" class="h-7 w-7"></i>')
+
+    @override_settings(DEBUG=True)
+    def test_icones_do_sprite_lidos_do_arquivo_gerado(self):
+        sprite = montar_sprite({'menu': '<svg><line x1="4" /></svg>', 'eye': '<svg><circle r="3" /></svg>'})
+        with mock.patch('core.assets.finders.find', return_value=None):
+            icones_do_sprite.cache_clear()
+            self.assertEqual(icones_do_sprite(), frozenset())
+        caminho = os.path.join(tempfile.mkdtemp(), 'sprite.svg')
+        self.addCleanup(os.remove, caminho)
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(sprite)
+        with mock.patch('core.assets.finders.find', return_value=caminho):
+            icones_do_sprite.cache_clear()
+            self.assertEqual(icones_do_sprite(), frozenset({'menu', 'eye'}))
+        icones_do_sprite.cache_clear()
+
+    def test_sprite_so_com_os_icones_em_uso(self):
+        Diferencial.objects.create(titulo='Pureza', descricao='...', icone='flask-conical')
+        icones = icones_usados()
+        self.assertIn('menu', icones)
+        self.assertIn('flask-conical', icones)
+        self.assertNotIn('activity', icones)
+
+        sprite = montar_sprite({'menu': '<svg xmlns="http://www.w3.org/2000/svg" class="lucide"><line x1="4" x2="20" y1="12" y2="12" /></svg>'})
+        self.assertIn('<symbol id="menu" viewBox="0 0 24 24"', sprite)
+        self.assertIn('<line x1="4" x2="20" y1="12" y2="12" /></symbol>', sprite)
+
+    def test_fontes_locais_so_com_latin(self):
+        css_google = """
+/* cyrillic */
+@font-face { font-family: 'Inter'; src: url(https://fonts.gstatic.com/inter-cyr.woff2) format('woff2'); }
+/* latin-ext */
+@font-face { font-family: 'Inter'; font-weight: 400; src: url(https://fonts.gstatic.com/inter-ext.woff2) format('woff2'); }
+/* latin */
+@font-face { font-family: 'Inter'; font-weight: 400; src: url(https://fonts.gstatic.com/inter.woff2) format('woff2'); }
+/* latin */
+@font-face { font-family: 'Inter'; font-weight: 700; src: url(https://fonts.gstatic.com/inter.woff2) format('woff2'); }
+"""
+        css, arquivos = fontes_locais(css_google)
+        self.assertEqual(arquivos, {
+            'inter-latin-ext.woff2': 'https://fonts.gstatic.com/inter-ext.woff2',
+            'inter-latin.woff2': 'https://fonts.gstatic.com/inter.woff2',
+        })
+        self.assertNotIn('gstatic', css)
+        self.assertEqual(css.count('url(../fontes/inter-latin.woff2)'), 2)
+
+
+class ConteudoEmMemoriaTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        obter_textos.limpar()
+        obter_configuracoes.limpar()
+        criar_conteudo_basico()
+
+    def test_textos_e_configuracoes_ficam_em_memoria_ate_a_edicao(self):
+        self.assertEqual(obter_textos()['hero_titulo'], 'Qualidade que dá lucro')
+        self.assertIsNotNone(obter_configuracoes())
+        with CaptureQueriesContext(connection) as queries:
+            obter_textos()
+            list(obter_configuracoes().imagens_sobre_nos.all())
+        self.assertEqual(len(queries), 0)
+
+        ConteudoTexto.objects.filter(chave='hero_titulo').get().delete()
+        self.assertNotIn('hero_titulo', obter_textos())
+
+    def test_ttl_refaz_o_valor_mesmo_sem_nova_versao(self):
+        obter_textos()
+        # Alteração por fora do admin (sem sinais): só aparece depois do TTL.
+        ConteudoTexto.objects.filter(chave='hero_titulo').update(valor='Novo título')
+        self.assertEqual(obter_textos()['hero_titulo'], 'Qualidade que dá lucro')
+        with mock.patch('core.cache.time.monotonic', return_value=time.monotonic() + 3600):
+            self.assertEqual(obter_textos()['hero_titulo'], 'Novo título')
+
+    def test_home_usa_textos_e_config_do_context_processor(self):
+        response = self.client.get('/')
+        self.assertContains(response, 'Qualidade que dá lucro')
+        self.assertContains(response, 'https://www.google.com/maps/embed?pb=teste')
+
+
+class ProtecaoContraEstouroTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        criar_conteudo_basico()
+
+    def test_serve_a_versao_anterior_enquanto_outro_worker_remonta(self):
+        antiga = self.client.get('/')
+        incrementar_versao_conteudo()
+        cache_de_paginas().add('core:pagina:home:reconstruindo', 1)  # outro worker está remontando
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(response.content, antiga.content)
+        # A ETag é a da versão antiga: o navegador não confunde a página antiga com a nova.
+        self.assertEqual(response['ETag'], antiga['ETag'])
+        self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=antiga['ETag']).status_code, 200)
+
+        cache_de_paginas().delete('core:pagina:home:reconstruindo')
+        response = self.client.get('/')
+        self.assertNotEqual(response['ETag'], antiga['ETag'])
+
+    def test_edicao_confirmada_aquece_a_home(self):
+        self.client.get('/')
+        with self.captureOnCommitCallbacks(execute=True):
+            FAQ.objects.create(pergunta='Qual a taxa de semeadura?', resposta='Depende da espécie.')
+            FAQ.objects.create(pergunta='Entregam em todo o Brasil?', resposta='Sim.')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/')
+            response = self.client.get('/fragmentos/faq/')
+        self.assertEqual(len(queries), 0)
+        self.assertContains(response, 'Qual a taxa de semeadura?')
+        self.assertContains(response, 'Entregam em todo o Brasil?')
+
+    def test_varias_alteracoes_na_mesma_transacao_aquecem_uma_vez(self):
+        with mock.patch('core.cache.aquecer_cache') as aquecer:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                FAQ.objects.create(pergunta='A?', resposta='...')
+                FAQ.objects.create(pergunta='B?', resposta='...')
+        self.assertEqual(len(callbacks), 2)
+        aquecer.assert_called_once()
+
+    def test_refresh_antecipado(self):
+        self.assertTrue(_expirou_ou_antecipou(time.time() - 1, duracao=0.1))
+        self.assertFalse(_expirou_ou_antecipou(time.time() + 3600, duracao=0.1))
+
+
+@override_settings(STORAGES={
+    **settings.STORAGES,
+    'default': {
+        'BACKEND': 'core.storage.StorageMedido',
+        'OPTIONS': {'backend': 'core.storage.StorageAssinadoFalso', 'opcoes': {'expiration': timedelta(minutes=10)}},
+    },
+})
+class UrlsDeMidiaTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        obter_configuracoes.limpar()
+        # O storage é o mesmo em todos os testes da classe: começa cada um do zero.
+        default_storage.limpar_urls()
+        default_storage.interno.urls_geradas = 0
+        criar_conteudo_basico()
+        Semente.objects.create(nome='Marandu', imagem='sementes/marandu.jpg')
+        DerivadosImagem.objects.create(nome='sementes/marandu.jpg', larguras=list(LARGURAS_DERIVADOS))
+
+    def test_urls_da_home_geradas_uma_vez_em_lote(self):
+        self.client.get('/fragmentos/produtos/')
+        geradas = default_storage.interno.urls_geradas
+        self.assertGreater(geradas, 0)
+
+        # Nova renderização da seção (sem o cache de página): nenhuma URL nova é assinada.
+        limpar_caches()
+        response = self.client.get('/fragmentos/produtos/')
+        self.assertEqual(default_storage.interno.urls_geradas, geradas)
+        self.assertContains(response, 'sementes/marandu-960w.jpg?Expires=')
+
+    def test_url_assinada_renovada_antes_de_expirar(self):
+        url = default_storage.url('sementes/marandu.jpg')
+        self.assertEqual(default_storage.url('sementes/marandu.jpg'), url)
+        self.assertEqual(default_storage.interno.urls_geradas, 1)
+        # Guardada por metade da validade (5 de 10 minutos).
+        with mock.patch('core.storage.time.monotonic', return_value=time.monotonic() + 5 * 60 + 1):
+            default_storage.url('sementes/marandu.jpg')
+        self.assertEqual(default_storage.interno.urls_geradas, 2)
+
+    def test_catalogo_resolve_as_urls_em_lote(self):
+        with mock.patch.object(default_storage, 'resolver_urls', wraps=default_storage.resolver_urls) as resolver:
+            response = self.client.get('/api/sementes/?fields=nome,imagem_url')
+        resolver.assert_called_once()
+        self.assertEqual(default_storage.interno.urls_geradas, 2)
+        self.assertIn('?Expires=', response.json()['sementes'][0]['imagem_url'])
+
+    def test_comparativo_resolve_as_urls_em_lote(self):
+        Semente.objects.update(aparece_na_comparacao=True)
+        with mock.patch.object(default_storage, 'resolver_urls', wraps=default_storage.resolver_urls) as resolver:
+            response = self.client.get('/fragmentos/comparativo/')
+        resolver.assert_called_once()
+        self.assertContains(response, 'Marandu')
+
+
+class PlanosDeConsultaTests(TestCase):
+    """
+    Roda EXPLAIN em cada consulta da home. Uma leitura da tabela inteira (Seq Scan) ou uma
+    ordenação sem índice falha o teste: com o catálogo crescendo, elas ficariam lentas.
+    """
+
+    # Tabelas lidas inteiras de propósito, sem ordenação (textos, configuração, índices em memória).
+    LEITURAS_COMPLETAS = {
+        'core_conteudotexto', 'core_configuracoesgerais', 'core_semente_caracteristicas', 'core_derivadosimagem',
+    }
+
+    def problemas_no_plano(self, sql: str) -> list:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Com tabelas pequenas o Postgres prefere Seq Scan mesmo com índice: desligá-lo
+                # mostra se existe um índice que atenda a consulta.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('EXPLAIN ' + sql)
+                plano = [linha[0] for linha in cursor.fetchall()]
+                return [
+                    linha for linha in plano
+                    if 'Seq Scan on' in linha and linha.split('Seq Scan on ')[1].split()[0] not in self.LEITURAS_COMPLETAS
+                ]
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            plano = [linha[-1] for linha in cursor.fetchall()]
+        return [
+            linha for linha in plano
+            if 'TEMP B-TREE FOR ORDER BY' in linha
+            or (linha.startswith('SCAN ') and ' USING ' not in linha and linha.split()[1] not in self.LEITURAS_COMPLETAS)
+        ]
+
+    def test_consultas_da_home_usam_indices(self):
+        limpar_caches()
+        obter_textos.limpar()
+        obter_configuracoes.limpar()
+        obter_indice.limpar()
+        criar_conteudo_basico()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/')
+            # As seções sob demanda fazem parte da home (ex: o índice parcial do comparativo).
+            for nome in FRAGMENTOS_DA_HOME:
+                self.client.get(f'/fragmentos/{nome}/')
+        consultas = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertGreaterEqual(len(consultas), 12)
+        self.assertTrue(any('aparece_na_comparacao' in sql for sql in consultas))
+        for sql in consultas:
+            with self.subTest(sql=sql[:120]):
+                self.assertEqual(self.problemas_no_plano(sql), [])
+
+
+class ComparacaoSementesTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        self.mombaca = criar_conteudo_basico()
+        Semente.objects.filter(pk=self.mombaca.pk).update(tolerancia_seca='Alta', altura='1,5 m')
+        self.marandu = Semente.objects.create(nome='Marandu', tolerancia_seca='Média', aparece_na_comparacao=True)
+        self.piata = Semente.objects.create(nome='Piatã', tolerancia_seca='Alta')
+
+    def test_secao_da_home_monta_a_tabela_com_as_marcadas(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/fragmentos/comparativo/')
+        self.assertEqual([query['sql'] for query in queries if 'core_semente' in query['sql']][0].count('aparece_na_comparacao'), 2)
+        self.assertContains(response, '<th scope="col" class="px-6 py-3 text-center">Marandu</th>')
+        self.assertContains(response, '<td class="px-6 py-4 text-center">Média</td>')
+        self.assertNotContains(response, '<th scope="col" class="px-6 py-3 text-center">Piatã</th>')
+
+    def test_api_padrao_usa_as_sementes_marcadas(self):
+        dados = self.client.get('/api/sementes/comparar/').json()
+        self.assertEqual([semente['nome'] for semente in dados['sementes']], ['Marandu', 'Mombaça'])
+        self.assertEqual(dados['linhas'][0], {'campo': 'tolerancia_seca', 'rotulo': 'Tolerância à Seca', 'valores': ['Média', 'Alta']})
+
+    def test_api_compara_ids_e_atributos_escolhidos(self):
+        response = self.client.get(f'/api/sementes/comparar/?ids={self.piata.pk},{self.mombaca.pk}&atributos=altura')
+        dados = response.json()
+        self.assertEqual([semente['nome'] for semente in dados['sementes']], ['Piatã', 'Mombaça'])
+        self.assertEqual(dados['linhas'], [{'campo': 'altura', 'rotulo': 'Altura', 'valores': ['', '1,5 m']}])
+
+    def test_api_valida_parametros(self):
+        self.assertEqual(self.client.get('/api/sementes/comparar/?atributos=senha').status_code, 400)
+        self.assertEqual(self.client.get('/api/sementes/comparar/?ids=1,a').status_code, 400)
+        self.assertEqual(self.client.get('/api/sementes/comparar/?ids=1,2,3,4,5,6,7').status_code, 400)
+
+
+class ViewsAssincronasTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        default_storage.limpar_urls()
+        self.semente = criar_conteudo_basico()
+
+    async def test_home_pelo_asgi_com_server_timing(self):
+        response = await self.async_client.get('/fragmentos/produtos/')
+        self.assertContains(response, 'Mombaça')
+        response = await self.async_client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'data-fragmento="/fragmentos/produtos/"')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('template;dur=', response['Server-Timing'])
+
+        # Segunda requisição: sai do cache pela API async, sem consultas.
+        response = await self.async_client.get('/')
+        self.assertNotIn('db;', response['Server-Timing'])
+        self.assertNotIn('template;', response['Server-Timing'])
+
+    async def test_semente_e_cotacao_pelo_asgi(self):
+        response = await self.async_client.get(f'/api/semente/{self.semente.pk}/')
+        self.assertEqual(response.json()['nome'], 'Mombaça')
+        self.assertEqual((await self.async_client.get('/api/semente/999999/')).status_code, 404)
+
+        response = await self.async_client.post(
+            '/api/solicitar-cotacao/', {'nome': 'Ana', 'contato': 'ana@exemplo.com'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(await SolicitacaoCotacao.objects.filter(nome='Ana').aexists())
+
+    def test_views_async_tambem_atendem_pelo_wsgi(self):
+        self.assertEqual(self.client.get('/').status_code, 200)
+        self.assertEqual(self.client.get(f'/api/semente/{self.semente.pk}/').status_code, 200)
+
+
+class InicializacaoTests(TestCase):
+    def test_ler_importtime(self):
+        saida = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       800 |       1200 |     PIL.Image\n'
+            'import time:       300 |       1500 |   core.imagens\n'
+            'import time:      2000 |       9000 | araguaya_project.wsgi\n'
+        )
+        modulos = ler_importtime(saida)
+        self.assertEqual([item['modulo'] for item in modulos], ['PIL.Image', 'core.imagens', 'araguaya_project.wsgi'])
+        self.assertEqual([item['nivel'] for item in modulos], [2, 1, 0])
+        self.assertEqual(modulos[0]['proprio_ms'], 0.8)
+        self.assertEqual(list(tempo_por_pacote(modulos)), ['araguaya_project', 'PIL', 'core'])
+
+    def test_aquecimento_deixa_a_home_pronta(self):
+        limpar_caches()
+        criar_conteudo_basico()
+        aquecer_processo()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/').status_code, 200)
+            response = self.client.get('/fragmentos/produtos/')
+        self.assertContains(response, 'Mombaça')
+
+    def test_storage_real_criado_so_no_primeiro_uso(self):
+        storage = StorageMedido(backend='core.storage.StorageAssinadoFalso', opcoes={'location': tempfile.gettempdir()})
+        self.assertIsNone(storage._interno)
+        url = storage.url('sementes/a.jpg')
+        interno = storage.interno
+        storage.descartar_backend()
+        self.assertIsNot(storage.interno, interno)
+        # A URL guardada sobrevive à troca do storage real.
+        self.assertEqual(storage.url('sementes/a.jpg'), url)
+        self.assertEqual(storage.interno.urls_geradas, 0)
+
+    def test_pool_de_conexoes_fechado_antes_do_fork(self):
+        # Com DB_POOL, o aquecimento no processo mestre abre o pool do psycopg; os workers
+        # não podem herdar os sockets dele.
+        when_ready = runpy.run_path(os.path.join(settings.BASE_DIR, 'gunicorn.conf.py'))['when_ready']
+        com_pool = mock.Mock(settings_dict={'OPTIONS': {'pool': {'min_size': 1, 'max_size': settings.DB_POOL_MAX}}})
+        with mock.patch('core.inicializacao.aquecer_processo'), mock.patch.object(connections, 'all', return_value=[com_pool]):
+            when_ready(mock.Mock())
+        com_pool.close.assert_called_once()
+        com_pool.close_pool.assert_called_once()
+
+
+class ReplicaDeLeituraTests(TestCase):
+    """
+    Usa dois bancos SQLite: o de teste como principal e um arquivo temporário como réplica,
+    com dados diferentes para saber de onde cada leitura veio. A réplica só existe durante
+    esta classe ('__all__' inclui os bancos registrados antes do setUpClass).
+    """
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pasta_replica = tempfile.mkdtemp()
+        bancos = {
+            'default': connections.settings['default'],
+            BANCO_REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(cls.pasta_replica, 'replica.sqlite3')},
+        }
+        connections.settings[BANCO_REPLICA] = connections.configure_settings(bancos)[BANCO_REPLICA]
+        with connections[BANCO_REPLICA].schema_editor() as editor:
+            editor.create_model(Semente)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[BANCO_REPLICA].close()
+        del connections[BANCO_REPLICA]
+        del connections.settings[BANCO_REPLICA]
+        shutil.rmtree(cls.pasta_replica, ignore_errors=True)
+
+    def setUp(self):
+        limpar_caches()
+        self.semente = Semente.objects.create(nome='Mombaça')
+        Semente.objects.using(BANCO_REPLICA).bulk_create([Semente(pk=self.semente.pk, nome='Mombaça (réplica)')])
+        # Última edição há um minuto: a réplica já está em dia.
+        cache.set(CHAVE_VERSAO_CONTEUDO, int((time.time() - 60) * 1000), timeout=None)
+
+    def test_views_publicas_leem_da_replica(self):
+        self.assertEqual(self.client.get(f'/api/semente/{self.semente.pk}/').json()['nome'], 'Mombaça (réplica)')
+        dados = self.client.get('/api/sementes/?fields=nome').json()
+        self.assertEqual(dados['sementes'], [{'nome': 'Mombaça (réplica)'}])
+
+    def test_leituras_no_principal_logo_apos_uma_edicao(self):
+        incrementar_versao_conteudo()
+        self.assertEqual(self.client.get(f'/api/semente/{self.semente.pk}/').json()['nome'], 'Mombaça')
+
+    def test_escritas_e_admin_ficam_no_principal(self):
+        response = self.client.post(
+            '/api/solicitar-cotacao/', {'nome': 'Ana', 'contato': 'ana@exemplo.com'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SolicitacaoCotacao.objects.using('default').count(), 1)
+        # Fora das views públicas as leituras não vão para a réplica.
+        self.assertEqual(Semente.objects.get(pk=self.semente.pk).nome, 'Mombaça')
+
+
+class HomeExportadaTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        default_storage.limpar_urls()
+        criar_conteudo_basico()
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, ignore_errors=True)
+        exportacao._exportada = None
+        configuracoes = override_settings(EXPORTACAO_DIR=self.pasta, HOME_EXPORTADA=True)
+        configuracoes.enable()
+        self.addCleanup(configuracoes.disable)
+
+    def test_exporta_html_comprimido_com_impressao_digital(self):
+        manifesto = exportacao.exportar_home()
+        html = open(os.path.join(self.pasta, manifesto['arquivo']), 'rb').read()
+        self.assertIn('Qualidade que dá lucro</h1>'.encode(), html)
+        self.assertEqual(open(os.path.join(self.pasta, 'index.html'), 'rb').read(), html)
+        with gzip.open(os.path.join(self.pasta, manifesto['arquivo'] + '.gz')) as arquivo:
+            self.assertEqual(arquivo.read(), html)
+        # Sem mudança no conteúdo, nada é regravado.
+        self.assertEqual(exportacao.exportar_home(), manifesto)
+
+    def test_secoes_sob_demanda_embutidas_na_home_exportada(self):
+        manifesto = exportacao.exportar_home()
+        html = open(os.path.join(self.pasta, manifesto['arquivo']), encoding='utf-8').read()
+        self.assertNotIn('data-fragmento=', html)
+        self.assertIn('Qual o prazo de entrega?', html)
+        self.assertIn('Mombaça', html)
+
+    def test_home_servida_dos_arquivos_sem_consultas(self):
+        manifesto = exportacao.exportar_home()
+        with self.assertNumQueries(0):
+            response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Qualidade que dá lucro</h1>'.encode(), gzip.decompress(response.content))
+
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=f'"home-{manifesto["hash"]}"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_home_exportada_respeita_os_pesos_do_accept_encoding(self):
+        exportacao.exportar_home()
+        for aceitas in ('gzip;q=0', 'identity', 'xgzip'):
+            with self.subTest(aceitas=aceitas):
+                response = self.client.get('/', HTTP_ACCEPT_ENCODING=aceitas)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertIn('Qualidade que dá lucro</h1>'.encode(), response.content)
+
+    @override_settings(HOME_EXPORTADA=False)
+    def test_exportacao_publicada_em_outro_host_tambem_e_regravada(self):
+        anterior = exportacao.exportar_home()
+        with self.captureOnCommitCallbacks(execute=True):
+            Diferencial.objects.create(titulo='Entregamos no Pará', descricao='Em até 10 dias.', icone='truck')
+        self.assertNotEqual(exportacao.ler_manifesto()['hash'], anterior['hash'])
+
+    def test_edicao_regrava_a_home_exportada(self):
+        anterior = exportacao.exportar_home()
+        with self.captureOnCommitCallbacks(execute=True):
+            Diferencial.objects.create(titulo='Entregamos no Pará', descricao='Em até 10 dias.', icone='truck')
+        self.assertNotEqual(exportacao.ler_manifesto()['hash'], anterior['hash'])
+        self.assertContains(self.client.get('/'), 'Entregamos no Pará')
+
+
+@override_settings(PLANO_BACKEND='core.plano_plantio.FalsoBackend')
+class PlanoPlantioTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        obter_proxy.cache_clear()
+        self.addCleanup(obter_proxy.cache_clear)
+        self.semente = Semente.objects.create(nome='Mombaça')
+        CaracteristicaCultivo.objects.get_or_create(categoria='clima', slug='tropical', defaults={'nome': 'Tropical'})
+
+    def pedir(self, **dados):
+        dados = {'semente': self.semente.pk, 'clima': 'tropical', 'solo': 'todos', 'objetivo': '', **dados}
+        return self.client.post('/api/plano-plantio/', dados, content_type='application/json')
+
+    def test_plano_repetido_sai_do_cache(self):
+        primeira = self.pedir()
+        self.assertEqual(primeira.status_code, 200)
+        self.assertIn('<h5>1. Preparo do Solo</h5>', primeira.json()['plano'])
+        self.assertIn('Mombaça', primeira.json()['plano'])
+        # O mesmo pedido, escrito de outro jeito, cai na mesma entrada do cache.
+        self.assertEqual(self.pedir(clima=' Tropical', objetivo='todos').json(), primeira.json())
+        self.assertEqual(obter_proxy().backend.chamadas, 1)
+
+    def test_semente_renomeada_gera_plano_novo(self):
+        self.assertIn('Mombaça', self.pedir().json()['plano'])
+        self.semente.nome = 'Mombaça Gigante'
+        self.semente.save()
+        self.assertIn('Mombaça Gigante', self.pedir().json()['plano'])
+        self.assertEqual(obter_proxy().backend.chamadas, 2)
+
+    def test_valida_o_pedido(self):
+        self.assertEqual(self.pedir(clima='polar').status_code, 400)
+        self.assertEqual(self.pedir(semente='abc').status_code, 400)
+        self.assertEqual(self.pedir(semente=999999).status_code, 404)
+        self.assertEqual(self.client.get('/api/plano-plantio/').status_code, 405)
+
+    def test_falha_da_api_de_ia(self):
+        with mock.patch.object(FalsoBackend, 'gerar', side_effect=ErroPlanoPlantio('fora do ar')):
+            with self.assertLogs('core.views', 'WARNING'):
+                self.assertEqual(self.pedir().status_code, 502)
+
+    @override_settings(PLANO_BACKEND='')
+    def test_sem_backend_configurado_responde_503(self):
+        with self.assertLogs('core.views', 'WARNING'):
+            self.assertEqual(self.pedir().status_code, 503)
+
+    def test_espera_pelo_pedido_identico_esgotada_responde_503(self):
+        backend = FalsoBackend(latencia=0.5)
+        proxy = ProxyPlanoPlantio(backend, tamanho=10, ttl=60)
+        with mock.patch('core.plano_plantio.montar_prompt', return_value="a semente 'Mombaça'."), \
+                mock.patch('core.plano_plantio.ESPERA_MAXIMA_PLANO', 0.05), \
+                mock.patch('core.views.obter_proxy', return_value=proxy):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                primeiro = executor.submit(proxy.gerar, self.semente.pk, 'tropical', 'todos', 'todos')
+                while not proxy._em_andamento:
+                    time.sleep(0.01)
+                with self.assertLogs('core.views', 'WARNING'):
+                    self.assertEqual(self.pedir().status_code, 503)
+                self.assertIn('Mombaça', primeiro.result())
+
+    def test_pedidos_identicos_simultaneos_fazem_uma_chamada(self):
+        backend = FalsoBackend(latencia=0.2)
+        proxy = ProxyPlanoPlantio(backend, tamanho=10, ttl=60)
+        with mock.patch('core.plano_plantio.montar_prompt', return_value="a semente 'Mombaça'."):
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                planos = list(executor.map(lambda _: proxy.gerar(1, 'tropical', 'todos', 'todos'), range(5)))
+        self.assertEqual(len(set(planos)), 1)
+        self.assertEqual(backend.chamadas, 1)
+
+    def test_limpar_html(self):
+        self.assertEqual(
+            limpar_html('```html\n<h5>Etapa</h5><p onclick="x()">Texto</p><script>alert(1)</script>\n```'),
+            '<h5>Etapa</h5>&lt;p onclick="x()"&gt;Texto</p>&lt;script&gt;alert(1)&lt;/script&gt;',
+        )
+
+
+@override_settings(LIMITES_ATIVOS=True, PROXIES_REVERSOS=0)
+class LimitesDeUsoTests(TestCase):
+    def setUp(self):
+        caches['limites'].clear()
+        memoria_local.clear()
+
+    def cotar(self, nome, **extra):
+        corpo = json.dumps({'nome': nome, 'contato': 'ana@exemplo.com'})
+        return self.client.post('/api/solicitar-cotacao/', corpo, content_type='application/json', **extra)
+
+    def test_limite_por_ip_recusa_com_429_antes_do_banco(self):
+        capacidade = LIMITE_COTACAO_POR_IP[0]
+        for i in range(capacidade):
+            self.assertEqual(self.cotar(f'Cliente {i}').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.cotar('Mais um')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['status'], 'erro')
+        self.assertGreater(int(response['Retry-After']), 0)
+        # Outro IP tem o próprio balde.
+        self.assertEqual(self.cotar('Outro IP', REMOTE_ADDR='10.0.0.2').status_code, 200)
+        self.assertEqual(SolicitacaoCotacao.objects.count(), capacidade + 1)
+
+    def test_envio_repetido_e_corpo_grande(self):
+        self.assertEqual(self.cotar('Ana').status_code, 200)
+        self.assertEqual(self.cotar('Ana').status_code, 409)
+        self.assertEqual(self.cotar('Ana ' + 'x' * 10000).status_code, 413)
+        self.assertEqual(SolicitacaoCotacao.objects.count(), 1)
+
+    def test_envio_recusado_pode_ser_repetido(self):
+        corpo = json.dumps({'nome': 'Ana'})
+        for _ in range(2):
+            response = self.client.post('/api/solicitar-cotacao/', corpo, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        with mock.patch.object(SolicitacaoCotacao.objects, 'acreate', side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                self.cotar('Ana')
+        self.assertEqual(self.cotar('Ana').status_code, 200)
+        self.assertEqual(self.cotar('Ana').status_code, 409)
+
+    def test_view_async_usa_a_api_async_do_cache(self):
+        limites = caches['limites']
+        with mock.patch.object(limites, 'aadd', wraps=limites.aadd) as aadd, \
+                mock.patch.object(limites, 'aget', wraps=limites.aget) as aget:
+            self.assertEqual(self.cotar('Ana').status_code, 200)
+        aadd.assert_called_once()
+        self.assertEqual(aget.call_count, 2)  # baldes por IP e total
+
+    def test_cache_fora_do_ar_usa_a_memoria_local(self):
+        with mock.patch.object(caches['limites'], 'get', side_effect=ConnectionError), \
+                self.assertLogs('core.limites', 'WARNING'):
+            self.assertEqual(self.cotar('Ana').status_code, 200)
+            self.assertEqual(self.cotar('Ana').status_code, 409)
+
+    @override_settings(PROXIES_REVERSOS=1)
+    def test_ip_do_cliente_atras_do_proxy(self):
+        request = mock.Mock(META={'REMOTE_ADDR': '10.0.0.1', 'HTTP_X_FORWARDED_FOR': '1.1.1.1, 200.1.2.3'})
+        self.assertEqual(ip_do_cliente(request), '200.1.2.3')
+        request.META = {'REMOTE_ADDR': '10.0.0.1'}
+        self.assertEqual(ip_do_cliente(request), '10.0.0.1')
+
+
+@override_settings(CDN_PURGADOR='core.cdn.RegistroPurgador', CDN_S_MAXAGE=3600)
+class CacheNaBordaTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        obter_purgador.cache_clear()
+        self.addCleanup(obter_purgador.cache_clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.semente = criar_conteudo_basico()
+        obter_purgador().purgados.clear()
+
+    def test_cabecalhos_de_cache_e_chaves(self):
+        response = self.client.get(f'/api/semente/{self.semente.pk}/')
+        self.assertIn('s-maxage=3600', response['Cache-Control'])
+        self.assertIn('stale-while-revalidate=', response['Cache-Control'])
+        self.assertIn('max-age=0', response['Cache-Control'])
+        self.assertEqual(response['Surrogate-Key'], f'semente-{self.semente.pk} caracteristicas site')
+        self.assertEqual(response['Cache-Tag'], f'semente-{self.semente.pk},caracteristicas,site')
+        # O 304 também leva os cabeçalhos, para a CDN renovar a cópia que tem.
+        revalidada = self.client.get(f'/api/semente/{self.semente.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidada.status_code, 304)
+        self.assertIn('s-maxage=3600', revalidada['Cache-Control'])
+        self.assertIn('home', self.client.get('/')['Surrogate-Key'].split())
+
+    def test_erros_e_post_nao_sao_cacheados(self):
+        self.assertFalse(self.client.get('/api/semente/999999/').has_header('Surrogate-Key'))
+        self.assertFalse(self.client.post('/api/solicitar-cotacao/', '{}', content_type='application/json').has_header('Cache-Control'))
+
+    def test_edicao_purga_as_chaves_afetadas_depois_do_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.semente.nome = 'Mombaça Nova'
+            self.semente.save()
+            self.assertEqual(obter_purgador().purgados, [])
+        self.assertEqual(obter_purgador().purgados, [[f'semente-{self.semente.pk}', 'sementes']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FAQ.objects.all().delete()
+        self.assertEqual(obter_purgador().purgados[-1], ['home'])
+
+    def test_edicao_de_semente_purga_a_home_exportada(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        exportacao._exportada = None
+        self.addCleanup(setattr, exportacao, '_exportada', None)
+        with override_settings(EXPORTACAO_DIR=pasta, HOME_EXPORTADA=True):
+            exportacao.exportar_home()
+            chaves_da_home = set(self.client.get('/')['Surrogate-Key'].split())
+            with self.captureOnCommitCallbacks(execute=True):
+                self.semente.nome = 'Mombaça Nova'
+                self.semente.save()
+        self.assertTrue(chaves_da_home & set(obter_purgador().purgados[-1]))
+
+    def test_falha_na_purga_nao_impede_a_edicao(self):
+        with mock.patch('core.cdn.RegistroPurgador.purgar', side_effect=ConnectionError), \
+                self.assertLogs('core.cdn', 'WARNING'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.semente.save()
+        self.assertTrue(Semente.objects.filter(pk=self.semente.pk).exists())
+
+
+class FragmentosDaHomeTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        criar_conteudo_basico()
+
+    def test_home_nao_carrega_as_secoes_abaixo_da_dobra(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/')
+        # Só o índice de recomendação (id, nome, imagem, utilização) lê as sementes.
+        self.assertFalse([query for query in queries if '"core_semente"."paragrafo_descricao"' in query['sql'] or 'core_faq' in query['sql']])
+        for nome in ('produtos', 'comparativo', 'quemsomos', 'faq'):
+            self.assertContains(response, f'data-fragmento="/fragmentos/{nome}/"')
+        self.assertNotContains(response, 'Qual o prazo de entrega?')
+
+    def test_cada_secao_tem_o_proprio_cache(self):
+        primeira = self.client.get('/fragmentos/faq/')
+        self.assertContains(primeira, 'Qual o prazo de entrega?')
+        self.assertNotContains(primeira, '<html')
+        with self.assertNumQueries(0):
+            segunda = self.client.get('/fragmentos/faq/')
+            self.assertEqual(self.client.get('/fragmentos/faq/', HTTP_IF_NONE_MATCH=primeira['ETag']).status_code, 304)
+        self.assertEqual(segunda.content, primeira.content)
+        self.assertNotEqual(self.client.get('/fragmentos/produtos/')['ETag'], primeira['ETag'])
+
+    def test_secao_inexistente(self):
+        self.assertEqual(self.client.get('/fragmentos/admin/').status_code, 404)
+
+
+class CompressaoTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        self.semente = criar_conteudo_basico()
+        self.semente.caracteristicas.add(CaracteristicaCultivo.objects.get(categoria='clima', slug='semiarido'))
+
+    def test_negociacao_do_accept_encoding(self):
+        self.assertEqual(escolher_codificacao('deflate, gzip;q=0.5'), 'gzip')
+        self.assertIsNone(escolher_codificacao('gzip;q=0'))
+        self.assertIsNone(escolher_codificacao(''))
+
+    def test_home_comprimida_com_vary_e_etag_fraca(self):
+        original = self.client.get('/')
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), original.content)
+        self.assertTrue(response['ETag'].startswith('W/'))
+        repetida = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repetida.status_code, 304)
+
+    def test_pagina_em_cache_nao_e_comprimida_de_novo(self):
+        self.client.get('/fragmentos/produtos/')
+        with mock.patch('core.middleware.comprimir') as comprimir, self.assertNumQueries(0):
+            response = self.client.get('/fragmentos/produtos/', HTTP_ACCEPT_ENCODING='gzip')
+        comprimir.assert_not_called()
+        self.assertIn('Mombaça', gzip.decompress(response.content).decode())
+
+    def test_exportacao_do_catalogo_em_partes(self):
+        response = self.client.get('/api/sementes/exportar/', {'formato': 'csv'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        linhas = list(csv.DictReader(StringIO(gzip.decompress(b''.join(response.streaming_content)).decode())))
+        self.assertEqual(len(linhas), 1)
+        self.assertEqual(linhas[0]['nome'], 'Mombaça')
+        self.assertEqual(linhas[0]['imagem'], 'sementes/mombaca.jpg')
+        self.assertEqual(linhas[0]['caracteristicas'], 'clima:semiarido')
+
+        self.assertEqual(self.client.get('/api/sementes/exportar/', {'formato': 'xls'}).status_code, 400)
+
+    async def test_exportacao_pelo_asgi(self):
+        response = await self.async_client.get('/api/sementes/exportar/', {'formato': 'jsonl'})
+        self.assertTrue(response.is_async)
+        linhas = [json.loads(linha) async for linha in response.streaming_content]
+        self.assertEqual([linha['nome'] for linha in linhas], ['Mombaça'])
+
+
+class ImportacaoCatalogoTests(TestCase):
+    def setUp(self):
+        limpar_caches()
+        self.mombaca = criar_conteudo_basico()
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta)
+        # Storage de mídia com a imagem da Mombaça: caminhos da coluna `imagem` precisam existir.
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        os.makedirs(os.path.join(self.media, 'sementes'))
+        Image.new('RGB', (1000, 600), 'green').save(os.path.join(self.media, 'sementes', 'mombaca.jpg'), 'JPEG')
+        configuracoes = override_settings(MEDIA_ROOT=self.media)
+        configuracoes.enable()
+        self.addCleanup(configuracoes.disable)
+
+    def exportar(self, formato='csv'):
+        caminho = os.path.join(self.pasta, f'catalogo.{formato}')
+        call_command('exportar_catalogo', caminho, stdout=StringIO())
+        with open(caminho, encoding='utf-8', newline='') as arquivo:
+            return arquivo.read()
+
+    def test_exportar_e_importar_de_volta_atualiza_e_cria_em_lotes(self):
+        linhas = list(csv.DictReader(StringIO(self.exportar())))
+        linhas[0]['proteina_bruta'] = '12%'
+        linhas[0]['caracteristicas'] = 'clima:semiarido'
+        for i in range(25):
+            linhas.append({**linhas[0], 'id': '', 'nome': f'Nova {i:02d}', 'caracteristicas': ''})
+        arquivo = StringIO()
+        escritor = csv.DictWriter(arquivo, fieldnames=linhas[0].keys())
+        escritor.writeheader()
+        escritor.writerows(linhas)
+        arquivo.seek(0)
+
+        with mock.patch('core.catalogo.registrar_alteracao_de_conteudo') as registrar, \
+                mock.patch('core.signals.registrar_alteracao_de_conteudo') as sinal, \
+                CaptureQueriesContext(connection) as queries:
+            resultado = importar_catalogo(arquivo, 'csv', tamanho_lote=10)
+        self.assertEqual(resultado, {'criadas': 25, 'atualizadas': 1, 'imagens': 0})
+        # Uma única invalidação no fim, sem sinais por semente, e poucas consultas por lote.
+        registrar.assert_called_once_with(('sementes', f'semente-{self.mombaca.pk}'))
+        sinal.assert_not_called()
+        self.assertLess(len(queries), 25)
+
+        self.mombaca.refresh_from_db()
+        self.assertEqual(self.mombaca.proteina_bruta, '12%')
+        self.assertEqual(list(self.mombaca.caracteristicas.values_list('slug', flat=True)), ['semiarido'])
+        nova = Semente.objects.get(nome='Nova 07')
+        self.assertEqual(nova.busca_principal, 'nova 07 panicum maximum panicum')
+        self.assertEqual(nova.imagem.name, 'sementes/mombaca.jpg')
+
+    def test_linha_invalida_nao_grava_nada(self):
+        arquivo = StringIO(
+            json.dumps({'nome': 'Sem tipo', 'imagem': 'sementes/x.jpg'}) + '\n'
+            + json.dumps({'id': self.mombaca.pk, 'aparece_na_comparacao': 'talvez'}) + '\n'
+            + json.dumps({'nome': 'Piatã', 'tipo': 'Brachiaria', 'nome_cientifico': 'B. brizantha',
+                          'imagem': 'sementes/piata.jpg', 'paragrafo_descricao': 'Boa.', 'caracteristicas': 'clima:lua'}) + '\n'
+        )
+        with self.assertRaises(ErroImportacao) as contexto:
+            importar_catalogo(arquivo, 'jsonl', tamanho_lote=1)
+        self.assertEqual(sorted({linha for linha, _ in contexto.exception.erros}), [1, 2, 3])
+        self.assertTrue(any('tipo' in mensagem for linha, mensagem in contexto.exception.erros if linha == 1))
+        self.assertEqual(Semente.objects.count(), 1)
+
+    def test_mesma_semente_em_duas_linhas(self):
+        for segunda in ({'id': self.mombaca.pk}, {'nome': 'Mombaça'}):
+            with self.subTest(segunda=segunda):
+                arquivo = StringIO(
+                    json.dumps({'id': self.mombaca.pk, 'altura': '1 m'}) + '\n'
+                    + json.dumps({**segunda, 'altura': '2 m'}) + '\n'
+                )
+                with self.assertRaises(ErroImportacao) as contexto:
+                    importar_catalogo(arquivo, 'jsonl')
+                self.assertEqual(contexto.exception.erros, [(2, f'A semente {self.mombaca.pk} aparece mais de uma vez no arquivo.')])
+
+    @override_settings(IMAGENS_RESPONSIVAS=True)
+    def test_imagens_de_uma_pasta_local_e_derivados_depois_do_commit(self):
+        Image.new('RGB', (1000, 600), 'green').save(os.path.join(self.pasta, 'piata.jpg'), 'JPEG')
+        linha = {'nome': 'Piatã', 'tipo': 'Brachiaria', 'nome_cientifico': 'B. brizantha',
+                 'imagem': 'piata.jpg', 'paragrafo_descricao': 'Boa.'}
+        with self.captureOnCommitCallbacks(execute=True):
+            resultado = importar_catalogo(StringIO(json.dumps(linha)), 'jsonl', pasta_imagens=self.pasta)
+            piata = Semente.objects.get(nome='Piatã')
+            self.assertEqual(resultado['imagens'], 1)
+            self.assertEqual(piata.imagem.name, 'sementes/piata.jpg')
+        self.assertTrue(os.path.exists(os.path.join(self.media, nome_derivado(piata.imagem.name, 480, 'jpg'))))
+
+    @override_settings(IMAGENS_RESPONSIVAS=True)
+    def test_caminho_do_storage_gera_derivados_e_precisa_existir(self):
+        Image.new('RGB', (1000, 600), 'blue').save(os.path.join(self.media, 'sementes', 'piata.jpg'), 'JPEG')
+        linha = {'id': self.mombaca.pk, 'imagem': 'sementes/piata.jpg'}
+        with self.captureOnCommitCallbacks(execute=True):
+            importar_catalogo(StringIO(json.dumps(linha)), 'jsonl')
+        self.assertTrue(os.path.exists(os.path.join(self.media, nome_derivado('sementes/piata.jpg', 480, 'jpg'))))
+        self.assertTrue(DerivadosImagem.objects.filter(nome='sementes/piata.jpg').exists())
+
+        linha['imagem'] = 'sementes/nao-existe.jpg'
+        with self.assertRaises(ErroImportacao) as contexto:
+            importar_catalogo(StringIO(json.dumps(linha)), 'jsonl')
+        self.assertIn('nao-existe.jpg', contexto.exception.erros[0][1])
+        self.mombaca.refresh_from_db()
+        self.assertEqual(self.mombaca.imagem.name, 'sementes/piata.jpg')
+
+    def test_importacao_e_exportacao_pelo_admin(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@exemplo.com', 'senha'))
+        response = self.client.post('/admin/core/semente/', {'action': 'exportar_jsonl', '_selected_action': [self.mombaca.pk]})
+        exportado = b''.join(response.streaming_content).decode().replace('Mombaça', 'Mombaça Gigante')
+
+        arquivo = SimpleUploadedFile('catalogo.jsonl', exportado.encode())
+        response = self.client.post('/admin/core/semente/importar/', {'arquivo': arquivo, 'formato': 'jsonl'})
+        self.assertRedirects(response, '/admin/core/semente/')
+        self.mombaca.refresh_from_db()
+        self.assertEqual(self.mombaca.nome, 'Mombaça Gigante')
@@ -0,0 +1,21 @@
+# core/texto.py
+
+import re
+import unicodedata
+
+_NAO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+def normalizar(*partes) -> str:
+    """
+    Junta os textos, remove acentos e pontuação e passa tudo para minúsculas.
+    Ex: normalizar('Mombaça', 'Panicum maximum') -> 'mombaca panicum maximum'
+    """
+    texto = ' '.join(parte for parte in partes if parte)
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(caractere for caractere in texto if not unicodedata.combining(caractere))
+    return _NAO_ALFANUMERICO.sub(' ', texto).strip()
+
+
+def tokenizar(*partes) -> list:
+    return normalizar(*partes).split()
@@ -4,8 +4,15 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path('', views.index_view, name='home'),
+    path('', views.home_view, name='home'),
+    path('fragmentos/<slug:nome>/', views.fragmento_view, name='fragmento'),
     # Adicione a linha abaixo:
     path('api/semente/<int:semente_id>/', views.semente_api_view, name='semente_api'),
+    path('api/sementes/', views.sementes_api_view, name='sementes_api'),
+    path('api/sementes/exportar/', views.exportar_catalogo_view, name='exportar_catalogo_api'),
+    path('api/sementes/comparar/', views.comparar_sementes_api_view, name='comparar_sementes_api'),
+    path('api/sementes/recomendar/', views.recomendar_sementes_api_view, name='recomendar_sementes_api'),
+    path('api/sementes/buscar/', views.buscar_sementes_api_view, name='buscar_sementes_api'),
+    path('api/plano-plantio/', views.plano_plantio_api_view, name='plano_plantio_api'),
     path('api/solicitar-cotacao/', views.solicitar_cotacao_api_view, name='solicitar_cotacao_api'),
 ]
\ No newline at end of file
@@ -1,99 +1,362 @@
 # core/views.py
 
-from django.shortcuts import render, get_object_or_404
-from django.http import HttpRequest, HttpResponse, JsonResponse
-from .models import ConteudoTexto, HeroSlide, Semente, Diferencial, FAQ, ConfiguracoesGerais, ItemNavegacao
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.shortcuts import render, aget_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from .models import HeroSlide, Semente, Diferencial, FAQ, ItemNavegacao, SolicitacaoCotacao
+from .catalogo import EXPORTADORES, FORMATOS_CATALOGO, partes_em_thread
+from .cdn import cache_na_borda
+from .cache import aquecer_apos_alteracao, cache_por_versao, condicional_por_versao, requisicao_interna
+from .serializers import CAMPOS_SEMENTE, serializar_semente
+from .recomendacao import CATEGORIAS, obter_indice
+from .busca import buscar_sementes
+from .comparacao import ATRIBUTOS_COMPARACAO, MAX_SEMENTES_COMPARACAO, atributos_por_campo, montar_matriz
+from .conteudo import obter_configuracoes
+from .exportacao import exportar_home, ler_manifesto, servir_home_exportada
+from .imagens import resolver_urls
+from .limites import (
+    LIMITE_COTACAO_POR_IP, LIMITE_COTACAO_TOTAL, LIMITE_EXPORTACAO_POR_IP, LIMITE_LEITURA_POR_IP,
+    LIMITE_PLANO_POR_IP, LIMITE_PLANO_TOTAL, TAMANHO_MAXIMO_CORPO, limitar,
+)
+from .plano_plantio import ErroPlanoPlantio, PlanoIndisponivel, normalizar_pedido, obter_proxy
+from .roteamento import ler_da_replica
 
 import json
+import logging
 from django.views.decorators.csrf import csrf_exempt
 
-def index_view(request: HttpRequest) -> HttpResponse:
-    """
-    Busca todos os objetos de conteúdo do banco de dados e renderiza a página inicial.
+logger = logging.getLogger(__name__)
+
+@condicional_por_versao('home')
+@cache_por_versao('home')
+@ler_da_replica
+async def index_view(request: HttpRequest) -> HttpResponse:
     """
-    # Tenta buscar as configurações gerais. Se não existir, retorna None.
-    try:
-        configuracoes = ConfiguracoesGerais.objects.get()
-    except ConfiguracoesGerais.DoesNotExist:
-        configuracoes = None
+    Busca os objetos de conteúdo do início da página e renderiza a página inicial.
+    As seções abaixo da dobra (produtos, comparativo, Sobre Nós e FAQ) vêm depois, pela
+    fragmento_view. O HTML fica em cache até a próxima alteração de conteúdo feita no admin.
+    `config` e `textos` vêm do context processor core.context_processors.conteudo_do_site.
 
-    slides_qs = HeroSlide.objects.all()
-    for i, slide in enumerate(slides_qs):
+    View assíncrona: as consultas usam o ORM async e o que só existe em versão síncrona
+    (configurações, índice de recomendação, URLs do storage, template) roda em thread.
+    """
+    slides = [slide async for slide in HeroSlide.objects.all()]
+    for i, slide in enumerate(slides):
         slide.animation_delay = i * 4
 
-    diferenciais = Diferencial.objects.all()
-    sementes = Semente.objects.all()
-    sementes_comparacao = Semente.objects.filter(aparece_na_comparacao=True)
-    faqs = FAQ.objects.all()
-    itens_navegacao = ItemNavegacao.objects.all()
-    
-    textos_qs = ConteudoTexto.objects.all()
-    textos = {item.chave: item.valor for item in textos_qs}
-    
+    diferenciais = [diferencial async for diferencial in Diferencial.objects.all()]
+    itens_navegacao = [item async for item in ItemNavegacao.objects.all()]
+
+    # Gera as URLs de todas as imagens da página de uma vez (em lote no GCS).
+    config = await sync_to_async(obter_configuracoes)()
+    imagens = [slide.imagem for slide in slides]
+    if config:
+        imagens += [config.logo_principal, config.logo_secundario, config.imagem_fundo_dicas]
+    await sync_to_async(resolver_urls)(imagens)
+
     context = {
-        'config': configuracoes, # Nome curto para facilitar no template
-        'slides': slides_qs,
+        'opcoes_recomendacao': (await sync_to_async(obter_indice)()).caracteristicas,
+        'slides': slides,
         'diferenciais': diferenciais,
-        'sementes': sementes,
-        'sementes_comparacao': sementes_comparacao,
-        'faqs': faqs,
         'itens_navegacao': itens_navegacao,
-        'textos': textos,
     }
     
-    return render(request, 'index.html', context)
+    return await sync_to_async(render)(request, 'index.html', context)
+
+# Rota da home: serve os arquivos gerados pelo 'exportar_home' quando HOME_EXPORTADA está
+# ligado e, senão (ou enquanto nada foi exportado), a index_view. A home exportada traz os
+# produtos e o comparativo embutidos, então a edição de uma semente também a purga da CDN.
+home_view = cache_na_borda('home', 'caracteristicas', 'sementes')(servir_home_exportada(index_view))
+
+# --- SEÇÕES DA HOME CARREGADAS SOB DEMANDA ---
+# Cada função monta o contexto de um template de templates/fragmentos/.
+
+async def _contexto_produtos() -> dict:
+    sementes = [semente async for semente in Semente.objects.all()]
+    await sync_to_async(resolver_urls)([semente.imagem for semente in sementes])
+    return {'sementes': sementes}
+
+
+async def _contexto_comparativo() -> dict:
+    sementes = [semente async for semente in Semente.objects.filter(aparece_na_comparacao=True)]
+    await sync_to_async(resolver_urls)([semente.imagem for semente in sementes], com_derivados=False)
+    # montar_matriz lê imagem.url (storage) e por isso roda fora do loop de eventos.
+    return {'comparacao': await sync_to_async(montar_matriz)(sementes)}
+
+
+async def _contexto_quemsomos() -> dict:
+    config = await sync_to_async(obter_configuracoes)()
+    if config:
+        await sync_to_async(resolver_urls)([img.imagem for img in config.imagens_sobre_nos.all()])
+    return {}
+
+
+async def _contexto_faq() -> dict:
+    return {'faqs': [faq async for faq in FAQ.objects.all()]}
+
+
+FRAGMENTOS_DA_HOME = {
+    'produtos': _contexto_produtos,
+    'comparativo': _contexto_comparativo,
+    'quemsomos': _contexto_quemsomos,
+    'faq': _contexto_faq,
+}
 
-def semente_api_view(request: HttpRequest, semente_id: int) -> JsonResponse:
+
+@cache_na_borda('home', 'sementes')
+@condicional_por_versao('fragmento')
+@cache_por_versao('fragmento')
+@ler_da_replica
+async def fragmento_view(request: HttpRequest, nome: str) -> HttpResponse:
+    """
+    Renderiza só uma seção da home (ver FRAGMENTOS_DA_HOME), buscada pela página quando o
+    visitante se aproxima dela. Cada seção tem a própria entrada no cache e a própria ETag.
+    """
+    montar_contexto = FRAGMENTOS_DA_HOME.get(nome)
+    if montar_contexto is None:
+        raise Http404('Seção não encontrada.')
+    return await sync_to_async(render)(request, f'fragmentos/{nome}.html', await montar_contexto())
+
+@limitar('leitura', por_ip=LIMITE_LEITURA_POR_IP)
+@cache_na_borda('semente-{semente_id}', 'caracteristicas')
+@condicional_por_versao('semente')
+@cache_por_versao('semente')
+@ler_da_replica
+async def semente_api_view(request: HttpRequest, semente_id: int) -> JsonResponse:
     """
     Busca uma única semente pelo seu ID e retorna seus dados em formato JSON.
     """
-    semente = get_object_or_404(Semente, pk=semente_id)
-    
-    # Monta um dicionário com os dados que o JavaScript precisa
-    data = {
-        'id': semente.id,
-        'nome': semente.nome,
-        'nome_cientifico': semente.nome_cientifico,
-        'paragrafo_descricao': semente.paragrafo_descricao,
-        'imagem_url': semente.imagem.url,
-        'origem': semente.origem,
-        'forma_crescimento': semente.forma_crescimento,
-        'altura': semente.altura,
-        'utilizacao': semente.utilizacao,
-        'digestibilidade': semente.digestibilidade,
-        'palatabilidade': semente.palatabilidade,
-        'tolerancia_seca': semente.tolerancia_seca,
-        'tolerancia_frio': semente.tolerancia_frio,
-        'proteina_bruta': semente.proteina_bruta,
-        'producao_materia_seca': semente.producao_materia_seca,
-        'consorciacao': semente.consorciacao,
-        'pragas': semente.pragas,
-        'adubacao_formacao': semente.adubacao_formacao,
+    semente = await aget_object_or_404(Semente, pk=semente_id)
+    # A URL da imagem pode exigir uma assinatura do GCS: é gerada fora do event loop.
+    return JsonResponse(await sync_to_async(serializar_semente)(semente))
+
+@limitar('leitura', por_ip=LIMITE_LEITURA_POR_IP)
+@cache_na_borda('sementes', 'caracteristicas')
+@condicional_por_versao('catalogo')
+@cache_por_versao('catalogo', variar_por_query=('fields', 'ids'))
+@ler_da_replica
+def sementes_api_view(request: HttpRequest) -> JsonResponse:
+    """
+    Retorna o catálogo de sementes em um único JSON, para o front-end carregar tudo de uma vez.
+
+    Parâmetros opcionais:
+    - ?fields=nome,imagem_url  -> devolve apenas esses campos de cada semente;
+    - ?ids=1,5,7               -> devolve apenas essas sementes.
+    """
+    campos = CAMPOS_SEMENTE
+    if request.GET.get('fields'):
+        campos = tuple(campo.strip() for campo in request.GET['fields'].split(',') if campo.strip())
+        invalidos = [campo for campo in campos if campo not in CAMPOS_SEMENTE]
+        if invalidos:
+            return JsonResponse({'status': 'erro', 'mensagem': f"Campos inválidos: {', '.join(invalidos)}."}, status=400)
+
+    sementes = Semente.objects.all()
+    if request.GET.get('ids'):
+        try:
+            ids = [int(valor) for valor in request.GET['ids'].split(',') if valor.strip()]
+        except ValueError:
+            return JsonResponse({'status': 'erro', 'mensagem': 'Lista de IDs inválida.'}, status=400)
+        sementes = sementes.filter(pk__in=ids)
+
+    sementes = list(sementes)
+    if 'imagem_url' in campos:
+        resolver_urls((semente.imagem for semente in sementes), com_derivados=False)
+    return JsonResponse({'sementes': [serializar_semente(semente, campos) for semente in sementes]})
+
+@limitar('leitura', por_ip=LIMITE_LEITURA_POR_IP)
+@cache_na_borda('sementes', 'caracteristicas')
+@condicional_por_versao('comparar')
+@cache_por_versao('comparar', variar_por_query=('ids', 'atributos'))
+@ler_da_replica
+def comparar_sementes_api_view(request: HttpRequest) -> JsonResponse:
+    """
+    Tabela de comparação entre sementes, no mesmo formato usado pela home.
+
+    Parâmetros opcionais:
+    - ?ids=1,5,7 -> sementes comparadas, nessa ordem (padrão: as marcadas para comparação);
+    - ?atributos=tolerancia_seca,altura -> linhas da tabela (padrão: as da home).
+    """
+    atributos = ATRIBUTOS_COMPARACAO
+    if request.GET.get('atributos'):
+        try:
+            atributos = atributos_por_campo(campo.strip() for campo in request.GET['atributos'].split(',') if campo.strip())
+        except KeyError as erro:
+            return JsonResponse({'status': 'erro', 'mensagem': f"Atributo inválido: {erro.args[0]}."}, status=400)
+
+    if not request.GET.get('ids'):
+        return JsonResponse(montar_matriz(Semente.objects.filter(aparece_na_comparacao=True), atributos))
+
+    try:
+        ids = list(dict.fromkeys(int(valor) for valor in request.GET['ids'].split(',') if valor.strip()))
+    except ValueError:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Lista de IDs inválida.'}, status=400)
+    if len(ids) > MAX_SEMENTES_COMPARACAO:
+        return JsonResponse({'status': 'erro', 'mensagem': f'Compare no máximo {MAX_SEMENTES_COMPARACAO} sementes.'}, status=400)
+
+    por_id = Semente.objects.in_bulk(ids)
+    return JsonResponse(montar_matriz((por_id[pk] for pk in ids if pk in por_id), atributos))
+
+@limitar('leitura', por_ip=LIMITE_LEITURA_POR_IP)
+@cache_na_borda('sementes', 'caracteristicas')
+@condicional_por_versao('recomendar')
+@ler_da_replica
+def recomendar_sementes_api_view(request: HttpRequest) -> JsonResponse:
+    """
+    Recomenda sementes para as condições da propriedade, usando o índice em memória.
+
+    Parâmetros: ?clima=tropical&solo=argiloso&objetivo=feno (cada um opcional; 'todos'
+    equivale a não filtrar) e ?limite=N. As sementes que atendem mais critérios vêm primeiro.
+    """
+    criterios = {
+        categoria: request.GET[categoria]
+        for categoria in CATEGORIAS
+        if request.GET.get(categoria, 'todos') not in ('', 'todos')
     }
-    return JsonResponse(data)
+    try:
+        limite = int(request.GET.get('limite', 0))
+    except ValueError:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Limite inválido.'}, status=400)
+    # 0 (ou ausente) é sem limite; negativos cortariam o fim da lista em vez de limitá-la.
+    limite = max(1, limite) if limite else None
+
+    try:
+        recomendadas = obter_indice().recomendar(criterios, limite)
+    except KeyError:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Critério de busca inválido.'}, status=400)
+
+    campos = ('id', 'nome', 'utilizacao', 'imagem_url')
+    return JsonResponse({
+        'criterios': len(criterios),
+        'sementes': [
+            {**serializar_semente(semente, campos), 'pontuacao': pontuacao}
+            for semente, pontuacao in recomendadas
+        ],
+    })
+
+@limitar('leitura', por_ip=LIMITE_LEITURA_POR_IP)
+@cache_na_borda('sementes', 'caracteristicas')
+@condicional_por_versao('busca')
+@ler_da_replica
+def buscar_sementes_api_view(request: HttpRequest) -> JsonResponse:
+    """
+    Busca de sementes para a caixa de pesquisa (type-ahead): ?q=brach&limite=10.
+    Consultas com menos de 2 letras retornam uma lista vazia.
+    """
+    consulta = request.GET.get('q', '')[:100]
+    try:
+        limite = max(1, min(int(request.GET.get('limite', 10)), 50))
+    except ValueError:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Limite inválido.'}, status=400)
+    return JsonResponse({'q': consulta, 'sementes': buscar_sementes(consulta, limite)})
+
+@limitar('exportacao', por_ip=LIMITE_EXPORTACAO_POR_IP)
+@cache_na_borda('sementes', 'caracteristicas')
+@condicional_por_versao('exportacao')
+def exportar_catalogo_view(request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Exporta o catálogo inteiro de sementes (?formato=csv ou ?formato=jsonl), com as
+    colunas de core.catalogo.CAMPOS_CATALOGO.
+
+    A resposta é enviada em partes, um lote de sementes por vez, sem montar o arquivo
+    inteiro na memória; o CompressaoMiddleware comprime cada parte conforme ela sai.
+    """
+    formato = request.GET.get('formato', 'csv')
+    if formato not in EXPORTADORES:
+        return JsonResponse({'status': 'erro', 'mensagem': f"Formato inválido. Use: {', '.join(EXPORTADORES)}."}, status=400)
+
+    partes = EXPORTADORES[formato]()
+    if isinstance(request, ASGIRequest):
+        partes = partes_em_thread(partes)
+    response = StreamingHttpResponse(partes, content_type=FORMATOS_CATALOGO[formato])
+    response['Content-Disposition'] = f'attachment; filename="catalogo-sementes.{formato}"'
+    return response
 
 @csrf_exempt # Usado para simplificar o POST via API. Em produção, use um método de autenticação mais robusto.
-def solicitar_cotacao_api_view(request: HttpRequest) -> JsonResponse:
+@limitar(
+    'cotacao', por_ip=LIMITE_COTACAO_POR_IP, total=LIMITE_COTACAO_TOTAL,
+    tamanho_maximo=TAMANHO_MAXIMO_CORPO, deduplicar=60 * 5,
+)
+async def solicitar_cotacao_api_view(request: HttpRequest) -> JsonResponse:
+    """
+    Registra a solicitação de cotação e responde na hora.
+    O envio para a equipe comercial é feito depois, pelo worker 'processar_cotacoes'.
+    """
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            nome = data.get('nome')
-            contato = data.get('contato')
-            produto = data.get('produto')
-            mensagem = data.get('mensagem')
-
-            # --- AÇÃO COMERCIAL ACONTECE AQUI ---
-            # Por enquanto, vamos apenas imprimir no console para confirmar o recebimento.
-            print("--- NOVA SOLICITAÇÃO DE COTAÇÃO ---")
-            print(f"Nome: {nome}")
-            print(f"Contato: {contato}")
-            print(f"Produto: {produto}")
-            print(f"Mensagem: {mensagem}")
-            print("------------------------------------")
-            # Em um projeto real, aqui você enviaria um e-mail para a equipe de vendas.
-
-            return JsonResponse({'status': 'sucesso', 'mensagem': 'Sua solicitação foi enviada com sucesso!'}, status=200)
         except json.JSONDecodeError:
             return JsonResponse({'status': 'erro', 'mensagem': 'Dados inválidos.'}, status=400)
-    
+
+        if not isinstance(data, dict) or not data.get('nome') or not data.get('contato'):
+            return JsonResponse({'status': 'erro', 'mensagem': 'Informe seu nome e um contato.'}, status=400)
+
+        await SolicitacaoCotacao.objects.acreate(
+            nome=str(data['nome'])[:200],
+            contato=str(data['contato'])[:200],
+            produto=str(data.get('produto') or '')[:200],
+            mensagem=str(data.get('mensagem') or ''),
+        )
+        return JsonResponse({'status': 'sucesso', 'mensagem': 'Sua solicitação foi enviada com sucesso!'}, status=200)
+
     return JsonResponse({'status': 'erro', 'mensagem': 'Método não permitido.'}, status=405)
+
+
+@csrf_exempt
+@limitar('plano', por_ip=LIMITE_PLANO_POR_IP, total=LIMITE_PLANO_TOTAL, tamanho_maximo=TAMANHO_MAXIMO_CORPO)
+def plano_plantio_api_view(request: HttpRequest) -> JsonResponse:
+    """
+    Gera o plano de plantio ("✨ Gerar Plano de Plantio") com a API de IA, pelo servidor.
+    Recebe {'semente': id, 'clima', 'solo', 'objetivo'} (slugs do seletor ou 'todos').
+    Planos já gerados para a mesma combinação voltam na hora, do cache.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'erro', 'mensagem': 'Método não permitido.'}, status=405)
+    try:
+        data = json.loads(request.body)
+        chave = normalizar_pedido(data if isinstance(data, dict) else {})
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Dados inválidos.'}, status=400)
+    except ValueError as erro:
+        return JsonResponse({'status': 'erro', 'mensagem': str(erro)}, status=400)
+
+    try:
+        plano = obter_proxy().gerar(*chave)
+    except Semente.DoesNotExist:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Semente não encontrada.'}, status=404)
+    except PlanoIndisponivel as erro:
+        logger.warning('Plano de plantio %s indisponível: %s', chave, erro)
+        return JsonResponse({'status': 'erro', 'mensagem': 'Plano de plantio indisponível no momento.'}, status=503)
+    except ErroPlanoPlantio:
+        logger.warning('Falha ao gerar o plano de plantio %s', chave, exc_info=True)
+        return JsonResponse({'status': 'erro', 'mensagem': 'Não foi possível gerar o plano agora. Tente novamente mais tarde.'}, status=502)
+    return JsonResponse({'status': 'sucesso', 'plano': plano})
+
+# --- AQUECIMENTO DO CACHE ---
+# Depois de cada edição no admin, a home e o catálogo de sementes são remontados pelo
+# próprio processo do admin, antes que os visitantes (e os outros workers) precisem deles.
+
+@aquecer_apos_alteracao
+def aquecer_home() -> None:
+    async_to_sync(index_view)(requisicao_interna('/'))
+
+
+@aquecer_apos_alteracao
+def aquecer_fragmentos() -> None:
+    for nome in FRAGMENTOS_DA_HOME:
+        async_to_sync(fragmento_view)(requisicao_interna(f'/fragmentos/{nome}/'), nome=nome)
+
+
+@aquecer_apos_alteracao
+def aquecer_catalogo() -> None:
+    sementes_api_view(requisicao_interna('/api/sementes/'))
+
+
+@aquecer_apos_alteracao
+def regenerar_home_exportada() -> None:
+    # Registrado depois do aquecer_home: a home já está no cache e não é montada de novo.
+    # Regrava também quando a exportação só é publicada em um host estático (há um
+    # manifesto na pasta, mas o site não a serve).
+    if settings.HOME_EXPORTADA or ler_manifesto() is not None:
+        exportar_home()
@@ -0,0 +1,53 @@
+# gunicorn.conf.py
+# Lido automaticamente pelo Gunicorn quando iniciado na raiz do projeto (ver Procfile).
+
+import os
+
+# Modo de execução dos workers:
+# - 'wsgi' (padrão): workers síncronos, uma requisição por vez em cada worker;
+# - 'asgi': workers do uvicorn (uvicorn-worker), com as views async atendendo várias
+#   requisições ao mesmo tempo em cada worker enquanto esperam banco, cache ou rede.
+MODO = os.getenv('SERVIDOR_MODO', 'wsgi').lower()
+
+if MODO == 'asgi':
+    wsgi_app = 'araguaya_project.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'araguaya_project.wsgi:application'
+
+# A aplicação é carregada uma vez no processo mestre e aquecida (core.inicializacao):
+# cada worker nasce por fork já com os módulos importados, os templates compilados e o
+# conteúdo em memória, e atende a primeira requisição sem pagar a inicialização.
+# Desative com GUNICORN_PRELOAD=False (ex: para recarregar o código a cada worker).
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from django.db import connections
+
+    from core.inicializacao import aquecer_processo
+
+    try:
+        aquecer_processo()
+    except Exception:
+        server.log.warning('Falha ao aquecer a aplicação antes do fork.', exc_info=True)
+    finally:
+        # Conexões abertas pelo aquecimento não podem ser herdadas pelos workers.
+        connections.close_all()
+        # Com DB_POOL (padrão no modo ASGI), close_all() só devolve a conexão ao pool do
+        # psycopg, que segue aberto: fechado aqui, cada worker abre o próprio após o fork.
+        for conexao in connections.all(initialized_only=True):
+            if hasattr(conexao, 'close_pool'):
+                conexao.close_pool()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from django.core.files.storage import default_storage
+
+    # Cada worker cria o próprio cliente do storage de mídia (ex: GCS).
+    if hasattr(default_storage, 'descartar_backend'):
+        default_storage.descartar_backend()